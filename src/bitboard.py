@@ -0,0 +1,434 @@
+from board import Board
+from board import CELL_INDICES, LINE_DIRECTIONS, NEIGHBOURS, OFF_BOARD
+from exceptions import CannotMoveException
+from enums import PieceType
+from enums import MoveDirection
+from enums import InitialBoardState
+from enums import HeuristicWeight
+
+
+# Number of tiles on the board, and a mask with a bit set for each of them
+CELL_COUNT = len(CELL_INDICES)
+FULL_MASK = (1 << CELL_COUNT) - 1
+
+# Number of marbles each team starts with
+STARTING_MARBLES = 14
+
+# The reverse of each MoveDirection
+OPPOSITE_DIRECTIONS = {direction: MoveDirection((-direction.value[0], -direction.value[1]))
+                       for direction in MoveDirection}
+
+
+def popcount(bits):
+    """
+    Counts the number of set bits in a bitboard
+    :param bits: a bitboard as an int
+    :return: the number of marbles in the bitboard
+    """
+    return bin(bits).count("1")
+
+
+def iterate_bits(bits):
+    """
+    A generator method which yields every set bit of a bitboard as its own single bit mask
+    :param bits: a bitboard as an int
+    :return: an int with a single bit set
+    """
+    while bits:
+        low_bit = bits & -bits
+        yield low_bit
+        bits ^= low_bit
+
+
+def _build_shift_table(direction):
+    """
+    Groups the cells of the board by how far their cell id moves when stepping in a direction.
+    Because the rows of the board have different lengths, every row can have a different offset.
+    :param direction: a MoveDirection enum
+    :return: a Tuple of (source mask, offset) pairs. Cells that step off the board are in no mask.
+    """
+    groups = {}
+    for cell, neighbour in enumerate(NEIGHBOURS[direction]):
+        if neighbour != OFF_BOARD:
+            groups[neighbour - cell] = groups.get(neighbour - cell, 0) | (1 << cell)
+    return tuple((mask, offset) for offset, mask in groups.items())
+
+
+# (source mask, offset) pairs used to shift a whole bitboard one step in a direction
+SHIFT_TABLE = {direction: _build_shift_table(direction) for direction in MoveDirection}
+
+# Single bit neighbour of every cell in every direction
+NEIGHBOUR_BITS = {direction: [1 << neighbour if neighbour != OFF_BOARD else 0 for neighbour in NEIGHBOURS[direction]]
+                  for direction in MoveDirection}
+
+# Cells whose neighbour in a direction is off the board. A marble pushed from here is pushed off.
+EDGE_MASKS = {direction: FULL_MASK & ~sum(mask for mask, offset in SHIFT_TABLE[direction])
+              for direction in MoveDirection}
+
+
+def _build_weight_masks(tile_weights):
+    """
+    Converts a tiles array of heuristic weights into a mask of cells per distinct weight.
+    :param tile_weights: a 2D array shaped like the tiles array containing an int weight for each tile
+    :return: a Tuple of (weight, mask) pairs
+    """
+    masks = {}
+    for cell, index in enumerate(CELL_INDICES):
+        weight = tile_weights[index[0]][index[1]]
+        masks[weight] = masks.get(weight, 0) | (1 << cell)
+    return tuple((weight, mask) for weight, mask in masks.items() if weight != 0)
+
+
+# Masks of cells sharing a centre distance weight for the ally and enemy heuristics
+DISTANCE_MASKS = _build_weight_masks(HeuristicWeight.DISTANCE_TILE_ARRAY.value)
+ENEMY_DISTANCE_MASKS = _build_weight_masks(HeuristicWeight.ENEMY_DISTANCE_TILE_ARRAY.value)
+
+
+class BitBoard:
+    """
+    A class to represent a Board in the game of Abalone as a pair of bitboards.
+
+    Each of the 61 tiles is given a cell id (see CELL_INDICES in board) and each team is stored as a single int with one bit per
+    cell. Moving marbles, finding groups, validating sumitos and detecting push-offs are all done with shifts and masks,
+    so a BitBoard is cheap to copy and cheap to search. Use from_board() and to_board() to convert to and from a Board.
+
+    Moves are represented as a Tuple of (group mask, MoveDirection enum, pushed mask), where the group mask holds the
+    marbles being moved and the pushed mask holds the enemy marbles pushed by a sumito (0 if none).
+    """
+
+    def __init__(self, white=0, black=0):
+        """
+        Constructs a bitboard.
+        :param white: The white marbles as a bitboard
+        :param black: The black marbles as a bitboard
+        """
+        self.white = white
+        self.black = black
+
+    @staticmethod
+    def from_board(board):
+        """
+        Creates a bitboard from a Board object
+        :param board: a Board object
+        :return: a BitBoard set up like the board
+        """
+        tile_values = board.get_tiles_values()
+        white = 0
+        black = 0
+        for cell, index in enumerate(CELL_INDICES):
+            value = tile_values[index[0]][index[1]]
+            if value:
+                white |= 1 << cell
+            elif value is False:
+                black |= 1 << cell
+        return BitBoard(white, black)
+
+    def to_board(self):
+        """
+        Creates a Board object from this bitboard
+        :return: a Board set up like this bitboard
+        """
+        board = Board()
+        for cell, index in enumerate(CELL_INDICES):
+            if self.white >> cell & 1:
+                board.set_tile_value(PieceType.WHITE.value, index)
+            elif self.black >> cell & 1:
+                board.set_tile_value(PieceType.BLACK.value, index)
+        board.update_marble_counts()
+        return board
+
+    def copy(self):
+        """
+        Creates a copy of this bitboard
+        :return: a BitBoard
+        """
+        return BitBoard(self.white, self.black)
+
+    @property
+    def white_marbles(self):
+        return popcount(self.white)
+
+    @property
+    def black_marbles(self):
+        return popcount(self.black)
+
+    def has_won(self):
+        """
+        Returns a PieceType enum of the team that won, otherwise false.
+        :return: a PieceType enum of the team that won, otherwise false.
+        """
+        if self.black_marbles <= 8:
+            return PieceType.W
+        elif self.white_marbles <= 8:
+            return PieceType.B
+        else:
+            return False
+
+    def get_team_bits(self, team):
+        """
+        Gets the ally and enemy bitboards for a team
+        :param team: a PieceType enum
+        :return: a Tuple of the ally bitboard followed by the enemy bitboard
+        """
+        if team == PieceType.WHITE:
+            return self.white, self.black
+        else:
+            return self.black, self.white
+
+    @staticmethod
+    def shift(bits, direction):
+        """
+        Moves every marble of a bitboard one step in a direction. Marbles that step off the board are dropped.
+        :param bits: a bitboard as an int
+        :param direction: a MoveDirection enum
+        :return: the shifted bitboard
+        """
+        shifted = 0
+        for mask, offset in SHIFT_TABLE[direction]:
+            if offset > 0:
+                shifted |= (bits & mask) << offset
+            else:
+                shifted |= (bits & mask) >> -offset
+        return shifted
+
+    def generate_moves(self, team):
+        """
+        Generates all legal moves for a team. Three marble moves are generated first, then single marble moves and
+        lastly two marble moves, the same order as StateSpaceGenerator.generate_all_legal_moves().
+        :param team: a PieceType enum representing the team to move
+        :return: a List of moves as (group mask, MoveDirection enum, pushed mask) Tuples
+        """
+        shift = BitBoard.shift
+        own, enemy = self.get_team_bits(team)
+        empty = FULL_MASK & ~(own | enemy)
+
+        # Cells with an empty neighbour, per direction
+        empty_ahead = {direction: shift(empty, OPPOSITE_DIRECTIONS[direction]) for direction in MoveDirection}
+
+        three_marble_moves = []
+        two_marble_moves = []
+
+        for direction in MoveDirection:
+            back = OPPOSITE_DIRECTIONS[direction]
+            back_bits = NEIGHBOUR_BITS[back]
+
+            # Heads (front-most marble in the direction) of lines of two and three ally marbles
+            two_heads = own & shift(own, direction)
+            three_heads = two_heads & shift(two_heads, direction)
+
+            # Heads that can push one enemy marble: the enemy has an empty tile or the edge behind it
+            push_one = shift(enemy & (empty_ahead[direction] | EDGE_MASKS[direction]), back)
+            # Heads that can push two enemy marbles (only a line of three can do this)
+            push_two = shift(enemy & shift(enemy & (empty_ahead[direction] | EDGE_MASKS[direction]), back), back)
+
+            inline_two = two_heads & (empty_ahead[direction] | push_one)
+            inline_three = three_heads & (empty_ahead[direction] | push_one | push_two)
+
+            forward_bits = NEIGHBOUR_BITS[direction]
+            for head in iterate_bits(inline_three):
+                cell = head.bit_length() - 1
+                middle = back_bits[cell]
+                group = head | middle | back_bits[middle.bit_length() - 1]
+                three_marble_moves.append((group, direction, BitBoard._pushed(head, enemy, forward_bits)))
+
+            for head in iterate_bits(inline_two):
+                group = head | back_bits[head.bit_length() - 1]
+                two_marble_moves.append((group, direction, BitBoard._pushed(head, enemy, forward_bits)))
+
+        for line in LINE_DIRECTIONS:
+            line_bits = NEIGHBOUR_BITS[line]
+
+            # Tails of lines of two and three ally marbles along this line
+            back = OPPOSITE_DIRECTIONS[line]
+            two_tails = own & shift(own, back)
+            three_tails = two_tails & shift(two_tails, back)
+
+            for direction in MoveDirection:
+                if direction is line or direction is back:
+                    continue
+
+                # Every marble of the group must have an empty tile beside it in the direction of the sidestep
+                free = empty_ahead[direction]
+                free_two = free & shift(free, back)
+                sidestep_two = two_tails & free_two
+                sidestep_three = three_tails & free_two & shift(free_two, back)
+
+                for tail in iterate_bits(sidestep_three):
+                    middle = line_bits[tail.bit_length() - 1]
+                    group = tail | middle | line_bits[middle.bit_length() - 1]
+                    three_marble_moves.append((group, direction, 0))
+
+                for tail in iterate_bits(sidestep_two):
+                    group = tail | line_bits[tail.bit_length() - 1]
+                    two_marble_moves.append((group, direction, 0))
+
+        single_marble_moves = []
+        for direction in MoveDirection:
+            for marble in iterate_bits(own & empty_ahead[direction]):
+                single_marble_moves.append((marble, direction, 0))
+
+        return three_marble_moves + single_marble_moves + two_marble_moves
+
+    @staticmethod
+    def _pushed(head, enemy, forward_bits):
+        """
+        Collects the enemy marbles in front of the head of an inline move
+        :param head: the single bit of the head marble
+        :param enemy: the enemy bitboard
+        :param forward_bits: the NEIGHBOUR_BITS list for the direction of movement
+        :return: a mask of the enemy marbles to push, 0 if none
+        """
+        pushed = 0
+        ahead = forward_bits[head.bit_length() - 1]
+        while ahead & enemy:
+            pushed |= ahead
+            ahead = forward_bits[ahead.bit_length() - 1]
+        return pushed
+
+    @staticmethod
+    def is_push_off(move):
+        """
+        Checks if a move pushes an enemy marble off the board
+        :param move: a move as a (group mask, MoveDirection enum, pushed mask) Tuple
+        :return: True if an enemy marble is pushed off
+        """
+        return move[2] & EDGE_MASKS[move[1]] != 0
+
+    def apply_move(self, move):
+        """
+        Creates the bitboard resulting from a move. This bitboard is left untouched.
+        :param move: a legal move as a (group mask, MoveDirection enum, pushed mask) Tuple
+        :return: a new BitBoard
+        """
+        group, direction, pushed = move
+        if group & self.white:
+            own, enemy = self.white, self.black
+        else:
+            own, enemy = self.black, self.white
+
+        # Lift the marbles off their tiles and put them down one step further. Pushed off marbles drop out.
+        own = (own & ~group) | BitBoard.shift(group, direction)
+        if pushed:
+            enemy = (enemy & ~pushed) | BitBoard.shift(pushed, direction)
+
+        if group & self.white:
+            return BitBoard(own, enemy)
+        else:
+            return BitBoard(enemy, own)
+
+    def move_piece(self, direction, marbles):
+        """
+        Moves a piece or selection of pieces, validating the move. Mirrors Board.move_piece().
+
+        Throws a CannotMoveException if the move is invalid.
+        :param direction: The destination of the pieces movement as a MoveDirection enum
+        :param marbles: A list of coordinates for each piece, with each coordinate as a tuple of string, integer
+                        corresponding to the row and column. eg. ("A", 1)
+        :return: PieceType enum of the marble pushed off
+        """
+        group = 0
+        for marble in marbles:
+            group |= 1 << Board.index_to_cell(Board.position_to_index(marble))
+
+        team = PieceType.WHITE if group & self.white else PieceType.BLACK
+        for move in self.generate_moves(team):
+            if move[0] == group and move[1] is direction:
+                result = self.apply_move(move)
+                pushed_off = None
+                if BitBoard.is_push_off(move):
+                    pushed_off = PieceType.BLACK.value if team == PieceType.WHITE else PieceType.WHITE.value
+                self.white = result.white
+                self.black = result.black
+                return PieceType(pushed_off)
+
+        raise CannotMoveException()
+
+    @staticmethod
+    def move_to_notation(move):
+        """
+        Converts a move into the move notation used by StateSpaceGenerator and Board.move_piece()
+        :param move: a move as a (group mask, MoveDirection enum, pushed mask) Tuple
+        :return: a Tuple of board positions (e.g ('A', 1)) followed by the MoveDirection enum
+        """
+        positions = [Board.index_to_position(CELL_INDICES[marble.bit_length() - 1])
+                     for marble in iterate_bits(move[0])]
+        return tuple(positions) + (move[1],)
+
+    def evaluate(self, team):
+        """
+        Evaluates the bitboard's heuristic score. Gives the same score as StateSpaceGenerator.evaluate().
+        :param team: The team to evaluate for as a PieceType enum
+        :return: The heuristic score
+        """
+        own, enemy = self.get_team_bits(team)
+        return self.points_for_groups(own) + BitBoard.points_for_spaces_from_center(own) \
+            + self.points_for_pieces(team) + BitBoard.points_for_spaces_from_center_enemy(enemy)
+
+    @staticmethod
+    def points_for_groups(own):
+        """
+        Scores the groups of two and three marbles of a team, see StateSpaceGenerator.points_for_groups().
+        :param own: the bitboard of the team to evaluate
+        :return: The points given for groups of pieces
+        """
+        group_values = HeuristicWeight.GROUP_WEIGHT.value
+        doubles = 0
+        triples = 0
+        for line in LINE_DIRECTIONS:
+            two_tails = own & BitBoard.shift(own, OPPOSITE_DIRECTIONS[line])
+            doubles += popcount(two_tails)
+            triples += popcount(two_tails & BitBoard.shift(two_tails, OPPOSITE_DIRECTIONS[line]))
+        return triples * group_values[2] + doubles * group_values[1]
+
+    @staticmethod
+    def points_for_spaces_from_center(own):
+        """
+        Scores how far a team's marbles are from the centre, see StateSpaceGenerator.points_for_spaces_from_center().
+        :param own: the bitboard of the team to evaluate
+        :return: The points given for the distance of the pieces from the centre
+        """
+        return sum(weight * popcount(own & mask) for weight, mask in DISTANCE_MASKS)
+
+    @staticmethod
+    def points_for_spaces_from_center_enemy(enemy):
+        """
+        Scores how far the enemy's marbles are from the centre,
+        see StateSpaceGenerator.points_for_spaces_from_center_enemy().
+        :param enemy: the bitboard of the enemy of the team to evaluate
+        :return: The points given for the distance of the enemy pieces from the centre
+        """
+        return sum(weight * popcount(enemy & mask) for weight, mask in ENEMY_DISTANCE_MASKS)
+
+    def points_for_pieces(self, team):
+        """
+        Scores the number of marbles on the board, see StateSpaceGenerator.points_for_pieces().
+        :param team: The team to evaluate for as a PieceType enum
+        :return: The points given for the number of pieces
+        """
+        own, enemy = self.get_team_bits(team)
+        own_marbles = popcount(own)
+        opponent_marbles = popcount(enemy)
+        if opponent_marbles <= 8:
+            return HeuristicWeight.WIN_WEIGHT.value
+        piece_weight = HeuristicWeight.PIECE_WEIGHT.value
+        return (STARTING_MARBLES - opponent_marbles) * piece_weight \
+            - (STARTING_MARBLES - own_marbles) * (piece_weight * 10)
+
+    def __eq__(self, other):
+        return isinstance(other, BitBoard) and self.white == other.white and self.black == other.black
+
+    def __hash__(self):
+        return hash((self.white, self.black))
+
+    def __str__(self):
+        """
+        Returns a string representation of the board.
+        """
+        return str(self.to_board())
+
+
+if __name__ == "__main__":
+    bitboard = BitBoard.from_board(Board(InitialBoardState.BELGIAN))
+    print(bitboard)
+    for legal_move in bitboard.generate_moves(PieceType.BLACK):
+        print(BitBoard.move_to_notation(legal_move))
@@ -2,8 +2,53 @@ from exceptions import CannotMoveException
 from exceptions import InvalidParameterException
 from enums import PieceType
 from enums import InitialBoardState
+from enums import HeuristicWeight
 from enums import MoveDirection
 import copy
+import random
+
+
+# Tiles array index of every tile on the board. A tile's cell id is the position of its index in this list.
+CELL_INDICES = [(y, x) for y, row in enumerate(InitialBoardState.EMPTY.value) for x in range(len(row))]
+
+# Cell id of every tiles array index
+CELL_IDS = {index: cell for cell, index in enumerate(CELL_INDICES)}
+
+# Cell id of the first tile in each row of the tiles array
+ROW_OFFSETS = [CELL_IDS[(y, 0)] for y in range(len(InitialBoardState.EMPTY.value))]
+
+# Sentinel cell id for a neighbour off the board, and the tiles array index used for it
+OFF_BOARD = -1
+OFF_BOARD_INDEX = (-1, -1)
+
+# Neighbouring cell id of each cell in each direction as NEIGHBOURS[direction][cell]. Built once after the Board class.
+NEIGHBOURS = {}
+
+# Same as NEIGHBOURS, but with the tiles array index of the neighbour (or OFF_BOARD_INDEX)
+NEIGHBOUR_INDICES = {}
+
+# The three directions that describe every line on the board, one per unordered orientation
+LINE_DIRECTIONS = (MoveDirection.RIGHT, MoveDirection.UP_RIGHT, MoveDirection.UP_LEFT)
+
+# Every line of two and three tiles on the board, listed under the cell id of the tile the line starts from. Each line
+# is stored once, as a tuple of tiles array indices running in one of the LINE_DIRECTIONS.
+LINES_OF_TWO = [[] for cell in CELL_INDICES]
+LINES_OF_THREE = [[] for cell in CELL_INDICES]
+
+
+# Random bit strings for Zobrist hashing, as ZOBRIST_KEYS[cell][PieceType value]. Index 0 (False) is black and 1 (True)
+# is white. Seeded so that every process hashes the same board to the same value.
+_zobrist_random = random.Random(0xABA10E)
+ZOBRIST_KEYS = [(_zobrist_random.getrandbits(64), _zobrist_random.getrandbits(64)) for cell in CELL_INDICES]
+
+# Bit string combined into the hash when it is white's turn to move
+ZOBRIST_WHITE_TO_MOVE = _zobrist_random.getrandbits(64)
+
+# Evaluation points of a marble on each cell, by cell id, for the terms of StateSpaceGenerator.evaluate() that the board
+# keeps up to date as marbles move. DISTANCE_POINTS scores a team's own marbles by how close they are to the centre,
+# ENEMY_DISTANCE_POINTS scores the other team's marbles by how close they are to the edge.
+DISTANCE_POINTS = [points for row in HeuristicWeight.DISTANCE_TILE_ARRAY.value for points in row]
+ENEMY_DISTANCE_POINTS = [points for row in HeuristicWeight.ENEMY_DISTANCE_TILE_ARRAY.value for points in row]
 
 
 # noinspection SpellCheckingInspection
@@ -17,6 +62,13 @@ class Board:
     The board stores the raw values from the PieceType enum for maximum efficiency. To take advantage of this
     efficiency, uses the functions which end in value (eg. foo_value, bar_values). This avoids converting the contents
     of the board to an enum for abstraction.
+
+    The board keeps a Zobrist hash of its tiles up to date as tiles are set and marbles are moved. Use
+    get_transposition_key() to combine it with the team to move for use as a transposition table key.
+
+    The board also keeps the sums of DISTANCE_POINTS and ENEMY_DISTANCE_POINTS over each team's marbles up to date the
+    same way, as distance_points[PieceType value] and enemy_distance_points[PieceType value], so those terms of the
+    evaluation never have to look at every tile.
     """
 
     # The size of the Y axis for the tiles array
@@ -31,10 +83,16 @@ class Board:
         :param board: The board object to set this as a copy of
         """
 
+        # List of (index, previous value) pairs recorded by set_tile_value() while make_move() applies a move
+        self._undo_log = None
+
         if board is not None:
             self._tiles = copy.deepcopy(board.get_tiles_values())
             self.white_marbles = board.white_marbles
             self.black_marbles = board.black_marbles
+            self.zobrist_hash = board.zobrist_hash
+            self.distance_points = list(board.distance_points)
+            self.enemy_distance_points = list(board.enemy_distance_points)
         else:
             if layout is None and tiles is None:  # If no tiles or layout passed in, just set as empty
                 self._tiles = copy.deepcopy(InitialBoardState.EMPTY.value)
@@ -62,6 +120,44 @@ class Board:
             else:
                 self.black_marbles = black_marbles
 
+            self.zobrist_hash = self.calculate_hash()
+            self.calculate_distance_points()
+
+    def calculate_hash(self):
+        """
+        Calculates the Zobrist hash of the tiles from scratch.
+        :return: The hash as an int
+        """
+        zobrist_hash = 0
+        for y, row in enumerate(self._tiles):
+            for x, value in enumerate(row):
+                if value is not None:
+                    zobrist_hash ^= ZOBRIST_KEYS[ROW_OFFSETS[y] + x][value]
+        return zobrist_hash
+
+    def calculate_distance_points(self):
+        """
+        Sums the distance points of each team's marbles from scratch, see distance_points and enemy_distance_points.
+        """
+        # Indexed by the PieceType value, False (0) for black and True (1) for white
+        self.distance_points = [0, 0]
+        self.enemy_distance_points = [0, 0]
+        for y, row in enumerate(self._tiles):
+            for x, value in enumerate(row):
+                if value is not None:
+                    self.distance_points[value] += DISTANCE_POINTS[ROW_OFFSETS[y] + x]
+                    self.enemy_distance_points[value] += ENEMY_DISTANCE_POINTS[ROW_OFFSETS[y] + x]
+
+    def get_transposition_key(self, team):
+        """
+        Combines the Zobrist hash with the team to move
+        :param team: The team to move as a PieceType enum
+        :return: The key as an int
+        """
+        if team == PieceType.WHITE:
+            return self.zobrist_hash ^ ZOBRIST_WHITE_TO_MOVE
+        return self.zobrist_hash
+
     def update_marble_counts(self):
         self.white_marbles = 0
         self.black_marbles = 0
@@ -96,6 +192,9 @@ class Board:
         Makes all tiles None to clear the board
         """
         self._tiles = [[None for tile in row] for row in self._tiles]
+        self.zobrist_hash = 0
+        self.distance_points = [0, 0]
+        self.enemy_distance_points = [0, 0]
 
     def set_tiles(self, tiles):
         """
@@ -103,6 +202,8 @@ class Board:
         :param tiles: The tiles array of PieceType enums
         """
         self._tiles = [[tile.value for tile in row] for row in tiles]
+        self.zobrist_hash = self.calculate_hash()
+        self.calculate_distance_points()
 
     def get_tiles(self):
         """
@@ -140,9 +241,7 @@ class Board:
         :param position: A sequence containing a character between A-I followed by a number 1-9.
             Must be a valid board position.
         """
-        y, x = Board.position_to_index(position)
-
-        self._tiles[y][x] = piece.value
+        self.set_tile_value(piece.value, Board.position_to_index(position))
 
     def get_tile_value(self, index):
         """
@@ -163,7 +262,24 @@ class Board:
         :param value: A value from the PieceType enums
         :param index: Position coordinates converted using position_to_index()
         """
-        self._tiles[index[0]][index[1]] = value
+        row = self._tiles[index[0]]
+        old_value = row[index[1]]
+        row[index[1]] = value
+
+        # Record the previous value so make_move() can be undone
+        if self._undo_log is not None:
+            self._undo_log.append((index, old_value))
+
+        # Update the Zobrist hash and distance points by removing the old piece and adding the new one
+        cell = ROW_OFFSETS[index[0]] + index[1]
+        if old_value is not None:
+            self.zobrist_hash ^= ZOBRIST_KEYS[cell][old_value]
+            self.distance_points[old_value] -= DISTANCE_POINTS[cell]
+            self.enemy_distance_points[old_value] -= ENEMY_DISTANCE_POINTS[cell]
+        if value is not None:
+            self.zobrist_hash ^= ZOBRIST_KEYS[cell][value]
+            self.distance_points[value] += DISTANCE_POINTS[cell]
+            self.enemy_distance_points[value] += ENEMY_DISTANCE_POINTS[cell]
 
     def move_piece(self, direction, marbles):
         """
@@ -184,6 +300,60 @@ class Board:
 
         return PieceType(marble_pushed_off_value)
 
+    def make_move(self, move):
+        """
+        Applies a move and returns a record that unmake_move() uses to restore the board exactly as it was.
+
+        Lets a search walk the game tree on a single board instead of building a new board for every node.
+        Throws a CannotMoveException if the move is invalid, leaving the board unchanged.
+        :param move: A move in move notation, a tuple of positions followed by a MoveDirection enum.
+                     eg. (("C", 3), ("B", 2), MoveDirection.UP_RIGHT)
+        :return: The undo record as a tuple of the tiles changed, the marble counts, the hash and the distance points
+                 before the move
+        """
+        return self.make_index_move(move[-1], [Board.position_to_index(marble) for marble in move[:-1]])
+
+    def make_index_move(self, direction, marbles):
+        """
+        Works like make_move(), but takes the marbles as tiles array indices so no positions are converted.
+        See moveencoding.MOVE_TABLE for the direction and indices of an encoded move.
+        :param direction: The destination of the pieces movement as a MoveDirection enum
+        :param marbles: A sequence of tiles array indices for each marble to move
+        :return: The undo record as a tuple of the tiles changed, the marble counts, the hash and the distance points
+                 before the move
+        """
+        undo_log = []
+        record = (undo_log, self.white_marbles, self.black_marbles, self.zobrist_hash, tuple(self.distance_points),
+                  tuple(self.enemy_distance_points))
+
+        self._undo_log = undo_log
+        try:
+            self._move(direction, marbles, False)
+        except CannotMoveException:
+            self.unmake_move(record)
+            raise
+        finally:
+            self._undo_log = None
+
+        return record
+
+    def unmake_move(self, record):
+        """
+        Undoes a move applied by make_move(), including any marble pushed off the board.
+        Moves must be undone in the reverse order they were made.
+        :param record: The undo record returned by make_move()
+        """
+        undo_log, self.white_marbles, self.black_marbles, self.zobrist_hash, distance_points, \
+            enemy_distance_points = record
+        self.distance_points = list(distance_points)
+        self.enemy_distance_points = list(enemy_distance_points)
+
+        # Put back every tile in reverse order. The hash and distance points are restored as a whole above.
+        tiles = self._tiles
+        for i in range(len(undo_log) - 1, -1, -1):
+            index, value = undo_log[i]
+            tiles[index[0]][index[1]] = value
+
     def _move(self, direction, marbles, is_push):
         """
         Moves a piece or selection of pieces. Use move_piece() for external use.
@@ -207,7 +377,7 @@ class Board:
             self.set_tile_value(None, current_index)  # Remove the piece
 
             # If the marble is not inbounds, dont put it back on the board. Decrement the marble count
-            if not Board.is_inbounds(new_index):
+            if new_index == OFF_BOARD_INDEX:
                 if piece_type:
                     self.white_marbles -= 1
                 else:
@@ -239,7 +409,7 @@ class Board:
 
             for index in new_indices:
                 # If the marble is not inbounds, dont put it back on the board. Decrement the marble count
-                if not Board.is_inbounds(index):
+                if index == OFF_BOARD_INDEX:
                     if piece_type:
                         marble_pushed_off = True
                         self.white_marbles -= 1
@@ -277,7 +447,7 @@ class Board:
             search_index = Board.add_direction(search_index, direction)
 
             # Position is out of bounds after pushed
-            if not self.is_inbounds(search_index):
+            if search_index == OFF_BOARD_INDEX:
                 break
 
             marble_at_index = self.get_tile_value(search_index)
@@ -329,6 +499,9 @@ class Board:
                 # Check that the new position has an opponents marble
                 for index in new_indices:
                     if not valid_move:
+                        # Tile ahead is off the board
+                        if index == OFF_BOARD_INDEX:
+                            raise CannotMoveException()  # Cannot move a marble out of bounds!
 
                         new_tile_value = self.get_tile_value(index)
                         # Tile ahead has an opponent piece
@@ -347,7 +520,7 @@ class Board:
         # Marbles are not inline, its a sidestep. Validate sidestep
         else:
             for index in new_indices:
-                if self.get_tile_value(index) is not None:
+                if index == OFF_BOARD_INDEX or self.get_tile_value(index) is not None:
                     raise CannotMoveException()  # Marble in the way of sidestep
 
         return new_indices, marbles_to_sumito
@@ -365,7 +538,7 @@ class Board:
         current_index = marble  # The current position of the piece
         new_index = Board.add_direction(current_index, direction)  # The new position for the piece
 
-        if not Board.is_inbounds(new_index):
+        if new_index == OFF_BOARD_INDEX:
             if not is_push:
                 raise CannotMoveException()  # Cannot move a marble out of bounds!
             else:
@@ -414,8 +587,25 @@ class Board:
         :param index: The index of the tiles array as a two int tuple
         :return: True if valid index in the array
         """
-        x_offset = index[0] if index[0] < 5 else Board.max_y - index[0]  # Shifting of X values due to board shape
-        return 0 <= index[0] <= Board.max_y and 0 <= index[1] <= 4 + x_offset
+        return (index[0], index[1]) in CELL_IDS
+
+    @staticmethod
+    def index_to_cell(index):
+        """
+        Converts a tiles array index to a cell id
+        :param index: Position coordinates converted using position_to_index(). Must be on the board.
+        :return: The cell id as an int between 0 and 60
+        """
+        return ROW_OFFSETS[index[0]] + index[1]
+
+    @staticmethod
+    def cell_to_index(cell):
+        """
+        Converts a cell id to a tiles array index
+        :param cell: The cell id as an int between 0 and 60
+        :return: Position coordinates as returned by position_to_index()
+        """
+        return CELL_INDICES[cell]
 
     @staticmethod
     def position_to_index(position):
@@ -471,35 +661,12 @@ class Board:
     @staticmethod
     def add_direction(index, direction):
         """
-        Adds the direction vector to the coordinate
-        :param index: Position coordinates converted using position_to_index()
+        Adds the direction vector to the coordinate using the precomputed NEIGHBOURS table
+        :param index: Position coordinates converted using position_to_index(). Must be on the board.
         :param direction: A MoveDirection enum
-        :return: The new coordinate adjusted by adding the direction
-        """
-        movement = direction.value
-
-        # Old code: Expensive but trustworthy
-        # current_position = list(Board.index_to_position(index))
-        # # Apply movement to the Letter and Number
-        # current_position[0] = chr(ord(current_position[0]) + movement[0])
-        # current_position[1] = current_position[1] + movement[1]
-        # # Get the index of the new position and build a new piece
-        # return Board.position_to_index(current_position)
-
-        prev_y = index[0]
-        prev_x = index[1]
-        delta_y = movement[0]
-        delta_x = movement[1]
-
-        y = prev_y - delta_y
-        # Subtract the movement in the y direction to account for x value drifting between E and I
-        if prev_y == 3 and y == 4:
-            # Special case: If the new Y is in the middle, and we're coming from the row above, we need to subtract one
-            x = prev_x + delta_x - delta_y
-        else:
-            x = prev_x + delta_x if y >= 4 else prev_x + delta_x - delta_y
-
-        return y, x
+        :return: The new coordinate adjusted by adding the direction, OFF_BOARD_INDEX if it is off the board
+        """
+        return NEIGHBOUR_INDICES[direction][ROW_OFFSETS[index[0]] + index[1]]
 
     @staticmethod
     def is_inline(a, b, direction):
@@ -598,6 +765,36 @@ class Board:
         return True
 
 
+def _build_neighbour_tables():
+    """
+    Fills in the NEIGHBOURS, NEIGHBOUR_INDICES, LINES_OF_TWO and LINES_OF_THREE tables. Neighbours are found by adding
+    the direction to the letter and number of each position, so there is no special casing of the rows between E and I.
+    """
+    for direction in MoveDirection:
+        neighbours = []
+        for index in CELL_INDICES:
+            position = Board.index_to_position(index)
+            new_position = (chr(ord(position[0]) + direction.value[0]), position[1] + direction.value[1])
+            neighbours.append(CELL_IDS.get(Board.position_to_index(new_position), OFF_BOARD))
+        NEIGHBOURS[direction] = neighbours
+        NEIGHBOUR_INDICES[direction] = [CELL_INDICES[cell] if cell != OFF_BOARD else OFF_BOARD_INDEX
+                                        for cell in neighbours]
+
+    for cell in range(len(CELL_INDICES)):
+        for direction in LINE_DIRECTIONS:
+            second = NEIGHBOURS[direction][cell]
+            if second == OFF_BOARD:
+                continue
+            LINES_OF_TWO[cell].append((CELL_INDICES[cell], CELL_INDICES[second]))
+
+            third = NEIGHBOURS[direction][second]
+            if third != OFF_BOARD:
+                LINES_OF_THREE[cell].append((CELL_INDICES[cell], CELL_INDICES[second], CELL_INDICES[third]))
+
+
+_build_neighbour_tables()
+
+
 if __name__ == "__main__":
     board = Board()
 
@@ -0,0 +1,324 @@
+from concurrent.futures import ProcessPoolExecutor
+import math
+import multiprocessing
+import time
+
+from board import Board
+from enums import PieceType
+from enums import SearchMode
+from moveencoding import MOVE_TABLE
+from statespacegenerator import StateSpaceGenerator
+from transpositiontable import NO_MOVE
+
+
+# Runs searches away from the caller's thread, so a GUI can keep handling events while the engine thinks.
+#
+# Searches run in a worker process rather than a thread, since a thread searching would hold the GIL and still slow
+# the Tk mainloop down. The worker is kept alive between searches, so its transposition table stays warm from one
+# move to the next.
+
+# Id of the search the worker should be running, shared with the worker. Starting or cancelling a search changes it,
+# which stops any search started with another id.
+_worker_search_id = None
+# Time (from time.time()) the running search must stop by, shared with the worker so a ponder search can be given a
+# deadline once the guess turns out right
+_worker_deadline = None
+# Move code of the reply a ponder search guessed, NO_MOVE until it has guessed
+_worker_ponder_move = None
+
+
+class _SearchStopFlag:
+    """
+    Stop flag for StateSpaceGenerator._stop_flag that is set once the engine has moved on from the search, or the
+    shared deadline has passed.
+    """
+
+    def __init__(self, search_id):
+        """
+        :param search_id: the id the search was started with as an int
+        """
+        self._search_id = search_id
+
+    @property
+    def value(self):
+        """
+        Property to get whether the search should stop
+        :return: a bool
+        """
+        return _worker_search_id.value != self._search_id or time.time() >= _worker_deadline.value
+
+
+def _init_engine_worker(search_id, deadline, ponder_move):
+    """
+    Sets up the engine's worker process.
+    :param search_id: a multiprocessing Value holding the id of the search to run
+    :param deadline: a multiprocessing Value holding the time the running search must stop by
+    :param ponder_move: a multiprocessing Value the worker stores the reply guessed by a ponder search in
+    """
+    global _worker_search_id, _worker_deadline, _worker_ponder_move
+    _worker_search_id = search_id
+    _worker_deadline = deadline
+    _worker_ponder_move = ponder_move
+
+
+def _run_search(board, team, search_id, depth, time_given, search_mode, settings, limits, lines):
+    """
+    Runs a search in the engine's worker process.
+    :param board: a Board representing the board state to search
+    :param team: a PieceType enum representing the team to move
+    :param search_id: the id of this search as an int
+    :param depth: the maximum depth to search the tree as an int, None to keep deepening until time runs out
+    :param time_given: int representing the number of seconds given to search for move
+    :param search_mode: a SearchMode enum for the search algorithm to use
+    :param settings: a Tuple of the quiescence, null move and late move reduction flags
+    :param limits: a Tuple of the node limit and latency target, see StateSpaceGenerator.find_best_move()
+    :param lines: the number of moves to find as an int, more than 1 for a multi-PV analysis
+    :return: a Move Notation representing the best move, or the analysis from StateSpaceGenerator.find_best_moves()
+             if more than one line was asked for. None if the search was cancelled before it started
+    """
+    # Skip searches that were cancelled while waiting for the worker
+    if _worker_search_id.value != search_id:
+        return None
+
+    state_space_gen = StateSpaceGenerator.build_state_space_generator(board, team)
+    state_space_gen.quiescence_enabled, state_space_gen.null_move_enabled, \
+        state_space_gen.late_move_reductions_enabled = settings
+    state_space_gen._stop_flag = _SearchStopFlag(search_id)
+    node_limit, latency = limits
+    if lines > 1:
+        return state_space_gen.find_best_moves(lines, depth, time_given, search_mode, node_limit, latency)
+    return state_space_gen.find_best_move(depth, time_given, search_mode, node_limit, latency)
+
+
+def _run_ponder(board, team, search_id, search_mode, settings, lines):
+    """
+    Guesses the other team's reply and searches the board after it, in the engine's worker process. The search runs
+    until it is cancelled or the shared deadline passes.
+    :param board: a Board representing the board state after the engine's move, with the other team to move
+    :param team: a PieceType enum representing the engine's team
+    :param search_id: the id of this search as an int
+    :param search_mode: a SearchMode enum for the search algorithm to use
+    :param settings: a Tuple of the quiescence, null move and late move reduction flags
+    :param lines: the number of moves to find as an int, more than 1 for a multi-PV analysis
+    :return: a Move Notation representing the best move after the guessed reply, or the analysis if more than one
+             line was asked for. None if there was nothing to search
+    """
+    if _worker_search_id.value != search_id:
+        return None
+
+    # Guess the reply the last search expected: the best move stored for this board, which that search keyed by the
+    # other team to move and scored for this team. Fall back to the first move generated (a sumito if there is one).
+    other_team = PieceType.BLACK if team == PieceType.WHITE else PieceType.WHITE
+    move_codes = StateSpaceGenerator.build_state_space_generator(board, other_team).generate_move_codes()
+    if not move_codes:
+        return None
+    # Key the board the way that search did, it had the same quiescence setting as this one
+    key_state_space_gen = StateSpaceGenerator.build_state_space_generator(board, team)
+    key_state_space_gen.quiescence_enabled = settings[0]
+    entry = StateSpaceGenerator.TRANSPOSITION_TABLE.probe(key_state_space_gen._transposition_key(board, other_team))
+    reply = entry[3] if entry is not None and entry[3] in move_codes else move_codes[0]
+    _worker_ponder_move.value = reply
+    board.make_index_move(*MOVE_TABLE[reply])
+
+    state_space_gen = StateSpaceGenerator.build_state_space_generator(board, team)
+    if not state_space_gen.generate_move_codes():
+        return None
+    state_space_gen.quiescence_enabled, state_space_gen.null_move_enabled, \
+        state_space_gen.late_move_reductions_enabled = settings
+    state_space_gen._stop_flag = _SearchStopFlag(search_id)
+    if lines > 1:
+        return state_space_gen.find_best_moves(lines, None, math.inf, search_mode)
+    return state_space_gen.find_best_move(None, math.inf, search_mode)
+
+
+class SearchEngine:
+    """
+    Front end to the StateSpaceGenerator that searches in a worker process and returns a Future for the result,
+    instead of blocking until the search is done.
+
+    Only one search runs at a time: starting a search cancels the one before it. A cancelled search stops within a few
+    hundred nodes, and its Future gives the best move found so far (or None if it never started).
+
+    The engine can also ponder: once it has moved, it guesses the other team's reply and searches the board after it
+    while the other team thinks. If the next search asked for is that board, the ponder search carries on with a
+    deadline instead of starting over. Otherwise it starts over, with the transposition table the ponder search
+    filled still in the worker.
+    """
+
+    def __init__(self, state_space_generator=None):
+        """
+        Creates the engine and starts its worker process.
+        :param state_space_generator: a StateSpaceGenerator whose search settings (quiescence, null move pruning and
+                                      late move reductions) are used, the defaults if None
+        """
+        self._state_space_generator = state_space_generator or StateSpaceGenerator()
+        # Spawn the worker so it does not inherit the GUI's state
+        context = multiprocessing.get_context("spawn")
+        self._search_id = context.Value('i', 0, lock=False)
+        self._deadline = context.Value('d', math.inf, lock=False)
+        self._ponder_move = context.Value('i', NO_MOVE, lock=False)
+        self._executor = ProcessPoolExecutor(max_workers=1, mp_context=context, initializer=_init_engine_worker,
+                                             initargs=(self._search_id, self._deadline, self._ponder_move))
+        self._future = None
+        # Board, team, search mode and number of lines of the running ponder search, None if the engine is not
+        # pondering
+        self._ponder_board = None
+        self._ponder_team = None
+        self._ponder_mode = None
+        self._ponder_lines = None
+
+    @property
+    def state_space_generator(self):
+        """
+        Property to get the StateSpaceGenerator holding the search settings
+        :return: a StateSpaceGenerator
+        """
+        return self._state_space_generator
+
+    @property
+    def pondering(self):
+        """
+        Property to get whether a ponder search is running
+        :return: a bool
+        """
+        return self._ponder_board is not None and self.searching
+
+    @property
+    def searching(self):
+        """
+        Property to get whether a search is running or waiting to run
+        :return: a bool
+        """
+        return self._future is not None and not self._future.done()
+
+    def start_search(self, board, team, depth, time_given, search_mode=SearchMode.MINIMAX, node_limit=None,
+                     latency=None, lines=1):
+        """
+        Starts searching for the best move, cancelling any search already running. If the engine is pondering on this
+        board, the ponder search is kept and given the time instead, unless the search has other limits.
+        :param board: a Board representing the board state to search, copied so it can change once this returns
+        :param team: a PieceType enum representing the team to move
+        :param depth: the maximum depth to search the tree as an int, None for no depth limit
+        :param time_given: int representing the number of seconds given to search for move, None for no time limit
+        :param search_mode: a SearchMode enum for the search algorithm to use
+        :param node_limit: the most nodes to search as an int, None for no node limit
+        :param latency: the most milliseconds to search for as a number, None for no latency target
+        :param lines: the number of moves to find as an int, more than 1 for a multi-PV analysis
+        :return: a Future for the Move Notation of the best move, or for the analysis from
+                 StateSpaceGenerator.find_best_moves() if more than one line was asked for
+        """
+        if depth is None and node_limit is None and latency is None and time_given is not None \
+                and lines == self._ponder_lines and self._is_ponder_hit(board, team, search_mode):
+            # Take a buffer off of time given, as find_best_move() does
+            self._deadline.value = time.time() + time_given - StateSpaceGenerator.time_buffer(time_given)
+            self._ponder_board = None
+            return self._future
+
+        self._start_job()
+        # Submit a copy, the board is only pickled for the worker once the executor gets to it
+        self._future = self._executor.submit(_run_search, Board(board=board), team, self._search_id.value, depth,
+                                             time_given, search_mode, self._settings(), (node_limit, latency), lines)
+        return self._future
+
+    def start_ponder(self, board, team, search_mode=SearchMode.MINIMAX, lines=1):
+        """
+        Starts pondering after the engine's move, cancelling any search already running.
+        :param board: a Board representing the board state after the engine's move, with the other team to move,
+                      copied so it can change once this returns
+        :param team: a PieceType enum representing the engine's team
+        :param search_mode: a SearchMode enum for the search algorithm to use, start_search() only keeps the ponder
+                            search if it is asked for the same one
+        :param lines: the number of moves to find as an int, start_search() only keeps the ponder search if it is
+                      asked for the same number
+        :return: a Future for the Move Notation of the best move after the guessed reply, or for the analysis if
+                 more than one line was asked for
+        """
+        self._start_job()
+        self._ponder_board = Board(board=board)
+        self._ponder_team = team
+        self._ponder_mode = search_mode
+        self._ponder_lines = lines
+        self._future = self._executor.submit(_run_ponder, Board(board=board), team, self._search_id.value,
+                                             search_mode, self._settings(), lines)
+        return self._future
+
+    def _is_ponder_hit(self, board, team, search_mode):
+        """
+        Checks if the running ponder search is searching the board given.
+        :param board: a Board representing the board state to search
+        :param team: a PieceType enum representing the team to move
+        :param search_mode: a SearchMode enum for the search algorithm to use
+        :return: True if the ponder search can be kept, False otherwise
+        """
+        if not self.pondering or team != self._ponder_team or search_mode != self._ponder_mode:
+            return False
+        reply = self._ponder_move.value
+        if reply == NO_MOVE:
+            return False
+        ponder_board = Board(board=self._ponder_board)
+        ponder_board.make_index_move(*MOVE_TABLE[reply])
+        return ponder_board.zobrist_hash == board.zobrist_hash
+
+    def _start_job(self):
+        """
+        Stops the running search and resets the values shared with the worker, to start another search.
+        """
+        self._search_id.value += 1
+        self._deadline.value = math.inf
+        self._ponder_move.value = NO_MOVE
+        self._ponder_board = None
+
+    def _settings(self):
+        """
+        Gets the search settings to pass to the worker.
+        :return: a Tuple of the quiescence, null move and late move reduction flags
+        """
+        state_space_gen = self._state_space_generator
+        return (state_space_gen.quiescence_enabled, state_space_gen.null_move_enabled,
+                state_space_gen.late_move_reductions_enabled)
+
+    def cancel(self):
+        """
+        Cancels the running search, if there is one.
+        """
+        if self._future is not None:
+            self._search_id.value += 1
+            self._ponder_board = None
+            self._future.cancel()
+            self._future = None
+
+    def shutdown(self):
+        """
+        Cancels the running search and stops the worker process.
+        """
+        self.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+if __name__ == "__main__":
+    from enums import InitialBoardState
+    from moveencoding import encode_notation
+
+    engine = SearchEngine()
+    future = engine.start_search(Board(InitialBoardState.BELGIAN), PieceType.BLACK, None, 5,
+                                 SearchMode.PRINCIPAL_VARIATION)
+    while not future.done():
+        print("Waiting for the engine...")
+        time.sleep(0.5)
+    print(future.result())
+
+    # Ponder on white's reply, then make the guessed reply so the ponder search is kept
+    board = Board(InitialBoardState.BELGIAN)
+    board.make_index_move(*MOVE_TABLE[encode_notation(future.result())])
+    engine.start_ponder(board, PieceType.BLACK, SearchMode.PRINCIPAL_VARIATION)
+    time.sleep(3)
+    board.make_index_move(*MOVE_TABLE[engine._ponder_move.value])
+    future = engine.start_search(board, PieceType.BLACK, None, 2, SearchMode.PRINCIPAL_VARIATION)
+    print(f"Ponder hit: {not engine.pondering and engine.searching}")
+    print(future.result())
+
+    # A cancelled search stops early
+    future = engine.start_search(Board(InitialBoardState.GERMAN), PieceType.BLACK, None, 30)
+    time.sleep(1)
+    engine.cancel()
+    engine.shutdown()
@@ -29,6 +29,20 @@ class MoveDirection(Enum):
     UP_RIGHT = UR = (1, 1)
 
 
+class SearchMode(Enum):
+    """
+    The search algorithm used to find the best move
+
+    MINIMAX searches every child with the full alpha-beta window. PRINCIPAL_VARIATION searches the first child fully
+    and proves the rest are worse with null windows, with aspiration windows around the last score at the root.
+    BITBOARD searches like MINIMAX on a BitBoard, without the transposition table, move ordering or quiescence search.
+    Only StateSpaceGenerator.find_best_move() searches on bitboards, the other searches treat it as MINIMAX.
+    """
+    MINIMAX = 1
+    PRINCIPAL_VARIATION = 2
+    BITBOARD = 3
+
+
 class GameMode(Enum):
     HumanVsPC = 1
     PCVsPC = 2
@@ -146,7 +160,7 @@ class HeuristicWeight(Enum):
     """
     WIN_WEIGHT = 4096
     PIECE_WEIGHT = 150
-    GROUP_WEIGHT = (0, 1, 2)
+    GROUP_WEIGHT = (0, 2, 2)
     DISTANCE_WEIGHT = (4, 3, 2, 1, 0)
     DISTANCE_TILE_ARRAY = [
         [DISTANCE_WEIGHT[4], DISTANCE_WEIGHT[4], DISTANCE_WEIGHT[4], DISTANCE_WEIGHT[4], DISTANCE_WEIGHT[4]],
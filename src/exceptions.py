@@ -23,3 +23,12 @@ class CannotMoveException(Exception):
 
     def __init__(self):
         super().__init__()
+
+
+class SearchTimeoutException(Exception):
+    """
+    Exception for if a search runs past its deadline, used to abandon the search
+    """
+
+    def __init__(self):
+        super().__init__()
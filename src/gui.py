@@ -10,7 +10,9 @@ from enums import InitialBoardState
 from enums import MoveDirection
 from enums import GameMode
 from enums import PieceType
-from statespacegenerator import StateSpaceGenerator
+from enums import SearchMode
+from engine import SearchEngine
+from moveencoding import decode_to_notation
 import random
 
 PATH = dirname(__file__)
@@ -51,6 +53,8 @@ class MainWindow(tk.Tk):
         self.countdown_timer = None
         self.best_move = None
         self.game_over_screen = None
+        # Searches for suggested moves in the background, kept for the whole session so its worker process starts once
+        self.search_engine = SearchEngine()
         self.settings = SettingsPage(self)  # This will be shown upon launch
         self.settings.pack(fill="both", expand=True)
 
@@ -93,6 +97,13 @@ class MainWindow(tk.Tk):
         """
         return self._game
 
+    def destroy(self):
+        """
+        Stops the search engine when the window is closed
+        """
+        self.search_engine.shutdown()
+        super().destroy()
+
     def check_for_game_won(self, piece_type):
         """
         Checks if the game has been won by the given piece type, and shows game over frame accordingly
@@ -186,6 +197,9 @@ class GameOver(tk.Frame):
 
 
 class BestMove(tk.Frame):
+    # Milliseconds between checks on whether the search has finished
+    POLL_INTERVAL = 50
+
     def __init__(self, parent):
         super().__init__(bg=bgcolor)
         self.parent = parent
@@ -193,14 +207,109 @@ class BestMove(tk.Frame):
         self.best_move_val = tk.Label(self, text="", bg=bgcolor, fg="purple", font=(None, 20, 'bold'))
         self.best_move_lbl.grid(row=0, column=0, sticky="W")
         self.best_move_val.grid(row=1, column=0, sticky="W")
-        self.statespacegenerator = StateSpaceGenerator()
+        # The next best moves found by the analysis, with their scores
+        self.analysis_val = tk.Label(self, text="", bg=bgcolor, fg="grey30", font=(None, 12), justify="left")
+        self.analysis_val.grid(row=2, column=0, sticky="W")
+        self.search_engine = parent.search_engine
+        self.statespacegenerator = self.search_engine.state_space_generator
+        # Prune with null moves and reduce late moves to search deeper in the time given
+        self.statespacegenerator.null_move_enabled = True
+        self.statespacegenerator.late_move_reductions_enabled = True
+        # True to search on the human's time, see SearchEngine.start_ponder()
+        self.ponder_enabled = True
+        # Number of moves to suggest, the best is shown as the suggested move and the rest below it
+        self.analysis_lines = 3
+        # Search algorithm used to find the suggested moves, see SearchMode
+        self.search_mode = SearchMode.PRINCIPAL_VARIATION
+        # Future of the running search, when it started, and the after() id of the next check on it
+        self._search_future = None
+        self._search_start_time = None
+        self._poll_id = None
+        # Seconds the last suggestion took, or had taken when it was cancelled
+        self.search_time = 0
+
+    def start_search(self, board, team, time_given):
+        """
+        Starts searching for a move to suggest without blocking the GUI, the suggestion is shown once found.
+        Replaces any search already running, unless the engine was pondering on this board.
+        :param board: a Board representing the board state to search
+        :param team: a PieceType enum representing the team to move
+        :param time_given: int representing the number of seconds given to search for move
+        """
+        self._stop_polling()
+        self._search_future = None
+        self.best_move_val.configure(text="Thinking...")
+        self.analysis_val.configure(text="")
+        self._search_start_time = datetime.datetime.now()
+        self._search_future = self.search_engine.start_search(board, team, None, time_given, self.search_mode,
+                                                              lines=self.analysis_lines)
+        self._poll_id = self.after(BestMove.POLL_INTERVAL, self.poll_search)
+
+    def poll_search(self):
+        """
+        Shows the suggested move if the search has finished, otherwise checks again after POLL_INTERVAL.
+        """
+        self._poll_id = None
+        if self._search_future is None:
+            return
+        if not self._search_future.done():
+            self._poll_id = self.after(BestMove.POLL_INTERVAL, self.poll_search)
+            return
+
+        best_move_tuple = self._search_future.result()
+        self._search_future = None
+        self.search_time = (datetime.datetime.now() - self._search_start_time).total_seconds()
+        print(f"elapsed time in seconds {self.search_time}")
+
+        # An analysis gives the best moves with their scores and principal variations, best first
+        if isinstance(best_move_tuple, list):
+            analysis = best_move_tuple
+            best_move_tuple = analysis[0][0] if analysis else None
+            self.show_analysis(analysis[1:])
+        if best_move_tuple is not None:
+            # convert tuple to "C3B2A1 UP_RIGHT" and display it in gui
+            self.best_move_to_string(best_move_tuple)
+
+    def start_ponder(self, board, team):
+        """
+        Starts searching on the human's time, if pondering is enabled. Nothing is shown until the human moves and the
+        search for the computer's move starts.
+        :param board: a Board representing the board state after the computer's move
+        :param team: a PieceType enum representing the computer's team
+        """
+        if self.ponder_enabled:
+            self.search_engine.start_ponder(board, team, self.search_mode, self.analysis_lines)
+
+    def cancel_search(self):
+        """
+        Cancels the running search or ponder search, if there is one, without showing its move.
+        """
+        self._stop_polling()
+        self.search_engine.cancel()
+        if self._search_future is not None:
+            self._search_future = None
+            self.search_time = (datetime.datetime.now() - self._search_start_time).total_seconds()
+            self.best_move_val.configure(text="")
+            self.analysis_val.configure(text="")
+
+    def _stop_polling(self):
+        """
+        Stops checking on the running search.
+        """
+        if self._poll_id is not None:
+            self.after_cancel(self._poll_id)
+            self._poll_id = None
 
     def best_move_to_string(self, best_move_tuple):
         """
         Converts a best movee tuple to a nicely formatted string
-        :param best_move_tuple:
+        :param best_move_tuple: a move in move notation, or a move code from moveencoding
         :return:
         """
+        # Unpack move codes to move notation first
+        if isinstance(best_move_tuple, int):
+            best_move_tuple = decode_to_notation(best_move_tuple)
+
         best_move_str = ""
         count = 0
         for item in best_move_tuple:
@@ -212,6 +321,17 @@ class BestMove(tk.Frame):
         print(best_move_str)
         self.parent.best_move.best_move_val.configure(text=best_move_str)
 
+    def show_analysis(self, analysis):
+        """
+        Shows the next best moves under the suggested move, eg. "2. A4B4 UP_LEFT (135)"
+        :param analysis: a List of Tuples of a Move Notation, its score and its principal variation
+        """
+        analysis_str = ""
+        for number, (move, score, principal_variation) in enumerate(analysis, 2):
+            move_str = "".join("".join(str(i) for i in position) for position in move[:-1])
+            analysis_str += f"{number}. {move_str} {move[-1].name} ({score})\n"
+        self.analysis_val.configure(text=analysis_str.rstrip())
+
     def hide_best_move_val(self):
         self.best_move_val.grid_remove()
 
@@ -580,6 +700,10 @@ class BoardOperation(tk.Frame):
         except IndexError as e:
             print(e)
         else:
+            # The suggestion was for the board before the computer's move. A ponder search running while the human
+            # moved is kept, the next suggestion can use it.
+            if self.game.current_turn_color != self.game.human_piece_type:
+                self.parent.best_move.cancel_search()
             self.parent.check_for_game_won(self.game.current_turn_color)
             self.draw_board()
 
@@ -590,16 +714,17 @@ class BoardOperation(tk.Frame):
             to_pos = marble_tuple_to_string(new_marbles)
             color_human = player_human.piece_type
             color_comp = player_comp.piece_type
-            time_taken = self.update_suggested_move()
             sumito = False
 
             # if it is human's turn
             if self.game.current_turn_color == self.game.human_piece_type:
                 # update score, moves left and history
-                player_human.record_move_to_history(from_pos, to_pos, move_type, time_taken, sumito, color_human)
+                player_human.record_move_to_history(from_pos, to_pos, move_type, None, sumito, color_human)
                 self.parent.output.update_human_output()
             # if it is computer's turn
             else:
+                # The computer's time is the time its suggested move took
+                time_taken = self.parent.best_move.search_time
                 player_comp.record_move_to_history(from_pos, to_pos, move_type, time_taken, sumito, color_comp)
                 self.parent.output.update_comp_output()
 
@@ -632,23 +757,14 @@ class BoardOperation(tk.Frame):
 
     def update_suggested_move(self):
         """
-        Suggests move for the computer to make, and returns the amount of time it took
-        :return: float
+        Starts searching for a move for the computer to make, if it is the computer's turn. The search runs in the
+        background and BestMove shows the move once it is found. On the human's turn, ponders instead.
         """
         if self.game.current_turn_color != self.game.human_piece_type:
-            board = self.game.board
-            self.parent.best_move.statespacegenerator.read_board(board, self.game.current_turn_color)
-            # it returns a tuple: (('C', 3), ('B', 2), ('A', 1), <MoveDirection.UP_RIGHT: (1, 1)>)
             time_given = self.game.get_comp_player().move_time_limit
-            start_time = datetime.datetime.now()
-            best_move_tuple = self.parent.best_move.statespacegenerator.find_best_move(1, time_given)
-            end_time = datetime.datetime.now()
-            elapsed_time = end_time - start_time
-            elapsed_seconds = elapsed_time.total_seconds()
-            print(f"elapsed time in seconds {elapsed_seconds}")
-            # convert tuple to "C3B2A1 UP_RIGHT" and display it in gui
-            self.parent.best_move.best_move_to_string(best_move_tuple)
-            return elapsed_seconds
+            self.parent.best_move.start_search(self.game.board, self.game.current_turn_color, time_given)
+        else:
+            self.parent.best_move.start_ponder(self.game.board, self.game.get_comp_player().piece_type)
 
     def valid_selection_list(self):
         """
@@ -708,6 +824,7 @@ class Operation(tk.Frame):
         Stops the game
         """
         self.parent.countdown_timer.pause_countdown()
+        self.parent.best_move.cancel_search()
         self.parent.game_over_screen.show_draw_stats()
         # Other logic to add?
 
@@ -722,6 +839,7 @@ class Operation(tk.Frame):
         """
         Resets the game
         """
+        self.parent.best_move.cancel_search()
         destroy_widget(self.parent.countdown_timer)
         destroy_widget(self.parent.best_move)
         destroy_widget(self.parent.current_turn_info)
@@ -736,6 +854,8 @@ class Operation(tk.Frame):
         """
         Undos a move
         """
+        # The suggestion is for the board being undone
+        self.parent.best_move.cancel_search()
         self.game.next_turn()  # Switch to previous(next) turn
         self.parent.current_turn_info.update_current_turn()
         try:
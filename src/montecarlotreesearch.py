@@ -0,0 +1,388 @@
+from concurrent.futures import ProcessPoolExecutor
+import math
+import os
+import random
+import time
+
+from board import Board
+from enums import InitialBoardState
+from enums import PieceType
+from moveencoding import MOVE_TABLE, decode_to_notation
+from statespacegenerator import StateSpaceGenerator
+from transpositiontable import NO_MOVE
+
+
+class MonteCarloNode:
+    """
+    A node of the Monte Carlo search tree, standing for the board reached by making its move on its parent's board.
+    """
+    __slots__ = ("move", "parent", "team", "children", "untried_moves", "visits", "wins")
+
+    def __init__(self, move, parent, team, untried_moves):
+        """
+        :param move: the move code made on the parent's board to reach this node, NO_MOVE for the root
+        :param parent: the parent MonteCarloNode, None for the root
+        :param team: a PieceType enum representing the team to move at this node
+        :param untried_moves: a List of the legal move codes that have no child node yet, empty once a game is won
+        """
+        self.move = move
+        self.parent = parent
+        self.team = team
+        self.children = []
+        self.untried_moves = untried_moves
+        # Number of playouts through this node
+        self.visits = 0
+        # Sum of the playout results for the team that made this node's move, 1 for a win and 0 for a loss
+        self.wins = 0.0
+
+    def select_child(self, exploration):
+        """
+        Selects the child to search with UCT, trading off the children's win rates against how little they have
+        been searched.
+        :param exploration: the UCT exploration constant as a float
+        :return: a MonteCarloNode
+        """
+        log_visits = math.log(self.visits)
+        return max(self.children, key=lambda child: child.wins / child.visits
+                   + exploration * math.sqrt(log_visits / child.visits))
+
+
+class MonteCarloTreeSearch:
+    """
+    An engine that finds moves with Monte Carlo tree search (UCT) instead of minimax.
+
+    Every playout walks down the tree choosing children with UCT, adds one new node, then plays PLAYOUT_DEPTH random
+    moves from it and scores the board reached. The playouts favour sumitos, and a board that has not been won is
+    scored with StateSpaceGenerator.evaluate() squashed to a win probability. The move searched the most is the best.
+
+    Used the same way as the StateSpaceGenerator: read_board() then find_best_move(). The tree is kept between moves,
+    so if the next board read is in it (eg. after this engine's move and the other team's reply), the playouts
+    already made below it are kept.
+    """
+    # UCT exploration constant, the square root of 2 in theory
+    EXPLORATION = 1.4
+
+    # Number of random moves made by a playout before scoring the board
+    PLAYOUT_DEPTH = 10
+
+    # Chance of a playout making a sumito when there is one
+    SUMITO_PROBABILITY = 0.5
+
+    # Difference in evaluate() scores that makes a win 73% likely, see _score_board()
+    EVALUATION_SCALE = 50
+
+    # Pool of worker processes for root parallel searches, and its size
+    _executor = None
+    _executor_workers = None
+
+    def __init__(self, seed=None):
+        """
+        :param seed: the seed for the playouts' random moves, None for a random seed
+        """
+        # Root of the search tree, the board at the root and the team to move there
+        self._root = None
+        self._root_board = None
+        self._player_type = None
+        # Number of playouts made by the last search
+        self._playouts = 0
+        self._random = random.Random(seed)
+
+    @property
+    def player(self):
+        """
+        Property to get the team to move at the root
+        :return: a PieceType enum
+        """
+        return self._player_type
+
+    @property
+    def playouts(self):
+        """
+        Property to get the number of playouts made by the last search
+        :return: an int
+        """
+        return self._playouts
+
+    @property
+    def root(self):
+        """
+        Property to get the root of the search tree
+        :return: a MonteCarloNode, None before a board is read
+        """
+        return self._root
+
+    def read_board(self, board, team):
+        """
+        Sets the board to search, keeping the part of the tree below it if it was searched before.
+        :param board: a Board representing the board state to search, copied so it can change once this returns
+        :param team: a PieceType enum representing the team to move
+        """
+        board = Board(board=board)
+        root = self._find_subtree(board, team)
+        if root is None:
+            root = self._create_node(board, NO_MOVE, None, team)
+        root.parent = None
+        root.move = NO_MOVE
+
+        self._root = root
+        self._root_board = board
+        self._player_type = team
+
+    def _find_subtree(self, board, team):
+        """
+        Finds the node for a board in the top two plies of the tree, the boards after one move or a move and a reply.
+        :param board: a Board representing the board state to find
+        :param team: a PieceType enum representing the team to move
+        :return: the MonteCarloNode for the board, None if it is not in the tree
+        """
+        if self._root is None:
+            return None
+        if self._root.team == team and self._root_board.zobrist_hash == board.zobrist_hash:
+            return self._root
+
+        root_board = self._root_board
+        for child in self._root.children:
+            undo_record = root_board.make_index_move(*MOVE_TABLE[child.move])
+            if child.team == team and root_board.zobrist_hash == board.zobrist_hash:
+                root_board.unmake_move(undo_record)
+                return child
+            for grandchild in child.children:
+                reply_record = root_board.make_index_move(*MOVE_TABLE[grandchild.move])
+                found = grandchild.team == team and root_board.zobrist_hash == board.zobrist_hash
+                root_board.unmake_move(reply_record)
+                if found:
+                    root_board.unmake_move(undo_record)
+                    return grandchild
+            root_board.unmake_move(undo_record)
+        return None
+
+    def _create_node(self, board, move, parent, team):
+        """
+        Creates a node for a board, with every legal move untried.
+        :param board: a Board representing the board state of the node
+        :param move: the move code made to reach the node, NO_MOVE for the root
+        :param parent: the parent MonteCarloNode, None for the root
+        :param team: a PieceType enum representing the team to move
+        :return: a MonteCarloNode
+        """
+        if board.has_won():
+            untried_moves = []
+        else:
+            untried_moves = list(StateSpaceGenerator.build_state_space_generator(board, team).generate_move_codes())
+            # Expand the moves in a random order, popping them off the end
+            self._random.shuffle(untried_moves)
+        return MonteCarloNode(move, parent, team, untried_moves)
+
+    def search(self, deadline):
+        """
+        Makes playouts from the root until the deadline.
+        :param deadline: the time (from time.time()) to stop by
+        """
+        board = self._root_board
+        while time.time() < deadline:
+            self._playout(board)
+
+    def _playout(self, board):
+        """
+        Makes one playout: selects a node with UCT, expands it, plays random moves from it and backs up the result.
+        :param board: a Board representing the root board state, left unchanged once done
+        """
+        node = self._root
+        undo_records = []
+
+        # Follow UCT down through the nodes that have every move expanded
+        while not node.untried_moves and node.children:
+            node = node.select_child(MonteCarloTreeSearch.EXPLORATION)
+            undo_records.append(board.make_index_move(*MOVE_TABLE[node.move]))
+
+        # Add a child for one of the moves not tried yet
+        if node.untried_moves:
+            move = node.untried_moves.pop()
+            undo_records.append(board.make_index_move(*MOVE_TABLE[move]))
+            child = self._create_node(board, move, node, MonteCarloTreeSearch._other_team(node.team))
+            node.children.append(child)
+            node = child
+
+        # Score the playout for the team to move at the new node, then for each team in turn back up to the root
+        result = self._simulate(board, node.team)
+        while node is not None:
+            node.visits += 1
+            node.wins += 1 - result
+            result = 1 - result
+            node = node.parent
+
+        for undo_record in reversed(undo_records):
+            board.unmake_move(undo_record)
+        self._playouts += 1
+
+    def _simulate(self, board, team):
+        """
+        Plays random moves from a board, making sumitos when it gets the chance, and scores the board reached.
+        :param board: a Board representing the board state to play from, left unchanged once done
+        :param team: a PieceType enum representing the team to move
+        :return: the result for the team as a float, 1 for a win and 0 for a loss
+        """
+        undo_records = []
+        team_to_move = team
+        for ply in range(MonteCarloTreeSearch.PLAYOUT_DEPTH):
+            if board.has_won():
+                break
+            state_space_gen = StateSpaceGenerator.build_state_space_generator(board, team_to_move)
+            move_codes = state_space_gen.generate_move_codes()
+            if not move_codes:
+                break
+            # Sumitos are generated first
+            if state_space_gen.num_sumito and self._random.random() < MonteCarloTreeSearch.SUMITO_PROBABILITY:
+                move = move_codes[self._random.randrange(state_space_gen.num_sumito)]
+            else:
+                move = self._random.choice(move_codes)
+            undo_records.append(board.make_index_move(*MOVE_TABLE[move]))
+            team_to_move = MonteCarloTreeSearch._other_team(team_to_move)
+
+        result = MonteCarloTreeSearch._score_board(board, team)
+
+        for undo_record in reversed(undo_records):
+            board.unmake_move(undo_record)
+        return result
+
+    @staticmethod
+    def _score_board(board, team):
+        """
+        Scores a board at the end of a playout as the chance the team wins.
+        :param board: a Board representing the board state to score
+        :param team: a PieceType enum representing the team to score for
+        :return: a float from 0 to 1, exactly 0 or 1 once the game is won
+        """
+        winner = board.has_won()
+        if winner:
+            return 1.0 if winner == team else 0.0
+        other_team = MonteCarloTreeSearch._other_team(team)
+        difference = StateSpaceGenerator.evaluate(board, team) - StateSpaceGenerator.evaluate(board, other_team)
+        return 1 / (1 + math.exp(-difference / MonteCarloTreeSearch.EVALUATION_SCALE))
+
+    @staticmethod
+    def _other_team(team):
+        """
+        Gets the team that moves after the team given.
+        :param team: a PieceType enum
+        :return: a PieceType enum
+        """
+        return PieceType.BLACK if team == PieceType.WHITE else PieceType.WHITE
+
+    def root_statistics(self):
+        """
+        Gets the number of visits and wins of every move at the root.
+        :return: a Dictionary of move codes to Lists of their visits and wins
+        """
+        return {child.move: [child.visits, child.wins] for child in self._root.children}
+
+    def find_best_move(self, depth, time_given):
+        """
+        Finds the best move for the board read, making playouts until the time given runs out.
+        :param depth: not used, Monte Carlo tree search has no depth limit. Kept so the engines are called the same way
+        :param time_given: int representing the number of seconds given to search for move
+        :return: a Move Notation representing the best move, None if there are no legal moves
+        """
+        # Take a buffer off of time given, see StateSpaceGenerator.TIME_BUFFER
+        deadline = time.time() + time_given - StateSpaceGenerator.time_buffer(time_given)
+        self._playouts = 0
+        self.search(deadline)
+        return self._choose_move(self.root_statistics())
+
+    def find_best_move_parallel(self, depth, time_given, workers=None):
+        """
+        Finds the best move for the board read with root parallel Monte Carlo tree search. Each worker process grows
+        its own tree from the root, while this process grows the kept tree, and the visits of the root moves are
+        added up across every tree. The pool is kept alive between calls, see shutdown_workers().
+        :param depth: not used, see find_best_move()
+        :param time_given: int representing the number of seconds given to search for move
+        :param workers: the number of worker processes as an int, the number of CPUs if None
+        :return: a Move Notation representing the best move, None if there are no legal moves
+        """
+        # Take a buffer off of time given, see StateSpaceGenerator.TIME_BUFFER
+        deadline = time.time() + time_given - StateSpaceGenerator.time_buffer(time_given)
+        executor = MonteCarloTreeSearch._get_workers(workers)
+        futures = [executor.submit(_run_root_playouts, self._root_board, self._player_type, deadline,
+                                   self._random.getrandbits(32))
+                   for worker in range(MonteCarloTreeSearch._executor_workers)]
+
+        self._playouts = 0
+        self.search(deadline)
+        statistics = self.root_statistics()
+        for future in futures:
+            worker_statistics, worker_playouts = future.result()
+            self._playouts += worker_playouts
+            for move, (visits, wins) in worker_statistics.items():
+                move_statistics = statistics.setdefault(move, [0, 0.0])
+                move_statistics[0] += visits
+                move_statistics[1] += wins
+        return self._choose_move(statistics)
+
+    def _choose_move(self, statistics):
+        """
+        Chooses the root move searched the most.
+        :param statistics: a Dictionary of move codes to Lists of their visits and wins, see root_statistics()
+        :return: a Move Notation representing the best move, None if there are no moves
+        """
+        if not statistics:
+            return None
+        best_move = max(statistics, key=lambda move: statistics[move][0])
+        visits, wins = statistics[best_move]
+        best_move = decode_to_notation(best_move)
+        print(f"The best move is {best_move} at a win rate of {wins / visits:.3f} "
+              f"({visits} visits, {self._playouts} playouts)")
+        return best_move
+
+    @staticmethod
+    def _get_workers(workers):
+        """
+        Gets the pool of worker processes for root parallel searches, starting it if there is none with the number of
+        workers asked for.
+        :param workers: the number of worker processes as an int, the number of CPUs if None
+        :return: a ProcessPoolExecutor
+        """
+        workers = workers or os.cpu_count() or 1
+        if MonteCarloTreeSearch._executor is None or MonteCarloTreeSearch._executor_workers != workers:
+            MonteCarloTreeSearch.shutdown_workers()
+            MonteCarloTreeSearch._executor = ProcessPoolExecutor(max_workers=workers)
+            MonteCarloTreeSearch._executor_workers = workers
+        return MonteCarloTreeSearch._executor
+
+    @staticmethod
+    def shutdown_workers():
+        """
+        Stops the pool of worker processes used by root parallel searches, if there is one.
+        """
+        if MonteCarloTreeSearch._executor is not None:
+            MonteCarloTreeSearch._executor.shutdown(wait=True, cancel_futures=True)
+            MonteCarloTreeSearch._executor = None
+            MonteCarloTreeSearch._executor_workers = None
+
+
+def _run_root_playouts(board, team, deadline, seed):
+    """
+    Grows a new tree from a board in a worker process, for MonteCarloTreeSearch.find_best_move_parallel().
+    :param board: a Board representing the root board state
+    :param team: a PieceType enum representing the team to move
+    :param deadline: the time (from time.time()) to stop by
+    :param seed: the seed for the playouts' random moves
+    :return: a Tuple of the root statistics, see MonteCarloTreeSearch.root_statistics(), and the number of playouts
+    """
+    engine = MonteCarloTreeSearch(seed)
+    engine.read_board(board, team)
+    engine.search(deadline)
+    return engine.root_statistics(), engine.playouts
+
+
+if __name__ == "__main__":
+    board = Board(InitialBoardState.BELGIAN)
+    engine = MonteCarloTreeSearch(seed=1)
+    engine.read_board(board, PieceType.BLACK)
+    move = engine.find_best_move(None, 5)
+
+    # Keep the tree for white's turn after black's move
+    board.move_piece(move[-1], list(move[:-1]))
+    engine.read_board(board, PieceType.WHITE)
+    print(f"Kept {engine.root.visits} playouts below the new root")
+    engine.find_best_move_parallel(None, 5)
+    MonteCarloTreeSearch.shutdown_workers()
@@ -0,0 +1,198 @@
+from array import array
+
+from board import Board
+from board import CELL_IDS, CELL_INDICES, LINE_DIRECTIONS, NEIGHBOURS, OFF_BOARD
+from enums import MoveDirection
+from exceptions import InvalidParameterException
+
+
+# Moves packed into a single int, so the engine can pass moves around without building tuples of positions.
+#
+# A move code describes the marbles moved by the cell they start from (the tail), how many there are and which line
+# they lie on, along with the direction they move in. Every move fits in 13 bits, so lists of moves can be stored in an
+# array('H') buffer, see create_move_list(). Use decode_to_notation() and encode_notation() to convert to and from the
+# move notation used by the GUI, eg. (("C", 3), ("B", 2), ("A", 1), MoveDirection.UP_RIGHT).
+
+# Every direction a move can be made in, a move code stores the position of its direction in this tuple
+MOVE_DIRECTIONS = tuple(MoveDirection)
+
+# Position of each direction in MOVE_DIRECTIONS
+MOVE_DIRECTION_INDEX = {direction: i for i, direction in enumerate(MOVE_DIRECTIONS)}
+
+# Layout of a move code, from the lowest bit up:
+#   bits 0-5    cell id of the tail marble, the marble the others follow on from along the line
+#   bits 6-7    number of marbles moved (1-3)
+#   bits 8-9    position in LINE_DIRECTIONS of the line running from the tail through the other marbles (0 for one)
+#   bits 10-12  position in MOVE_DIRECTIONS of the move direction
+COUNT_SHIFT = 6
+LINE_SHIFT = 8
+DIRECTION_SHIFT = 10
+
+CELL_MASK = 0x3F
+COUNT_MASK = 0x3
+LINE_MASK = 0x3
+
+# Every move code is less than this
+MOVE_CODE_LIMIT = 1 << 13
+
+# Position in LINE_DIRECTIONS of the line between a cell and its neighbour, as LINE_STEPS[(tail cell, next cell)]
+LINE_STEPS = {}
+
+# Move codes decoded for Board.make_index_move(), as MOVE_TABLE[code] = (MoveDirection, tuple of tiles array indices).
+# None for codes that do not describe marbles in a line on the board. Built once at the bottom of the module.
+MOVE_TABLE = [None] * MOVE_CODE_LIMIT
+
+
+def encode_move(tail_cell, count, line_direction, move_direction):
+    """
+    Packs a move into a move code.
+    :param tail_cell: the cell id of the tail marble as an int
+    :param count: the number of marbles moved as an int (1-3)
+    :param line_direction: the position in LINE_DIRECTIONS of the line the marbles are on as an int, 0 for one marble
+    :param move_direction: the position in MOVE_DIRECTIONS of the move direction as an int
+    :return: the move code as an int
+    """
+    return tail_cell | count << COUNT_SHIFT | line_direction << LINE_SHIFT | move_direction << DIRECTION_SHIFT
+
+
+def decode_move(move_code):
+    """
+    Unpacks a move code, the reverse of encode_move().
+    :param move_code: the move code as an int
+    :return: a Tuple of the tail cell, count, line direction and move direction as ints
+    """
+    return (move_code & CELL_MASK,
+            move_code >> COUNT_SHIFT & COUNT_MASK,
+            move_code >> LINE_SHIFT & LINE_MASK,
+            move_code >> DIRECTION_SHIFT)
+
+
+def encode_cells(cells, move_direction):
+    """
+    Packs a line of marbles and the direction they move in into a move code.
+    :param cells: a sequence of the marbles cell ids, in order along the line from the tail
+    :param move_direction: the position in MOVE_DIRECTIONS of the move direction as an int
+    :return: the move code as an int
+    """
+    if len(cells) == 1:
+        return encode_move(cells[0], 1, 0, move_direction)
+    return encode_move(cells[0], len(cells), LINE_STEPS[(cells[0], cells[1])], move_direction)
+
+
+def move_cells(move_code):
+    """
+    Finds the cell ids of the marbles moved by a move code.
+    :param move_code: the move code as an int
+    :return: a Tuple of cell ids, in order along the line from the tail
+    """
+    cell = move_code & CELL_MASK
+    neighbours = NEIGHBOURS[LINE_DIRECTIONS[move_code >> LINE_SHIFT & LINE_MASK]]
+    cells = [cell]
+    for i in range((move_code >> COUNT_SHIFT & COUNT_MASK) - 1):
+        cell = neighbours[cell]
+        cells.append(cell)
+    return tuple(cells)
+
+
+def encode_notation(move):
+    """
+    Converts a move in move notation to a move code. The positions can be given in any order.
+    Throws an InvalidParameterException if the positions are not a line of one to three tiles on the board.
+    :param move: a Tuple of positions followed by a MoveDirection enum, eg. (("C", 3), ("B", 2), MoveDirection.UP_RIGHT)
+    :return: the move code as an int
+    """
+    positions = move[:-1]
+    cells = set()
+    for position in positions:
+        cell = CELL_IDS.get(tuple(Board.position_to_index(position)))
+        if cell is None:
+            raise InvalidParameterException(f"{position} is not a position on the board")
+        cells.add(cell)
+
+    move_direction = MOVE_DIRECTION_INDEX[move[-1]]
+    count = len(positions)
+    if count == 1:
+        return encode_move(cells.pop(), 1, 0, move_direction)
+
+    # Find the tail, the cell the others can be reached from by stepping along one of the line directions
+    if len(cells) == count <= 3:
+        for tail in cells:
+            for line_direction, direction in enumerate(LINE_DIRECTIONS):
+                cell = tail
+                line = {cell}
+                for i in range(count - 1):
+                    cell = NEIGHBOURS[direction][cell]
+                    line.add(cell)
+                if line == cells:
+                    return encode_move(tail, count, line_direction, move_direction)
+
+    raise InvalidParameterException(f"{positions} is not a line of one to three positions")
+
+
+def decode_to_notation(move_code):
+    """
+    Converts a move code to move notation.
+    :param move_code: the move code as an int
+    :return: a Tuple of positions in order along the line from the tail, followed by the MoveDirection enum
+    """
+    return tuple(Board.index_to_position(CELL_INDICES[cell]) for cell in move_cells(move_code)) \
+        + (MOVE_DIRECTIONS[move_code >> DIRECTION_SHIFT],)
+
+
+def move_info_positions(move_code):
+    """
+    Converts a move code to the strings MoveInfo records for the move history, eg. "C3B2A1".
+    :param move_code: the move code as an int
+    :return: a Tuple of the from position, to position and move type strings
+    """
+    direction = MOVE_DIRECTIONS[move_code >> DIRECTION_SHIFT]
+    from_cells = move_cells(move_code)
+    to_cells = [NEIGHBOURS[direction][cell] for cell in from_cells]
+
+    from_pos = "".join(f"{letter}{number}" for letter, number in
+                       (Board.index_to_position(CELL_INDICES[cell]) for cell in from_cells))
+    to_pos = "".join(f"{letter}{number}" for letter, number in
+                     (Board.index_to_position(CELL_INDICES[cell]) for cell in to_cells if cell != OFF_BOARD))
+    return from_pos, to_pos, direction.name
+
+
+def create_move_list(move_codes=()):
+    """
+    Creates a compact list of move codes.
+    :param move_codes: an iterable of move codes to start the list with
+    :return: an array('H') of move codes
+    """
+    return array('H', move_codes)
+
+
+def _build_move_tables():
+    """
+    Fills in the LINE_STEPS and MOVE_TABLE tables.
+    """
+    for cell in range(len(CELL_INDICES)):
+        for line_direction, direction in enumerate(LINE_DIRECTIONS):
+            if NEIGHBOURS[direction][cell] != OFF_BOARD:
+                LINE_STEPS[(cell, NEIGHBOURS[direction][cell])] = line_direction
+
+    for move_code in range(MOVE_CODE_LIMIT):
+        tail_cell, count, line_direction, move_direction = decode_move(move_code)
+        # Skip codes that are out of range, and the unused line directions of single marble moves
+        if tail_cell >= len(CELL_INDICES) or count == 0 or line_direction >= len(LINE_DIRECTIONS) \
+                or move_direction >= len(MOVE_DIRECTIONS) or (count == 1 and line_direction != 0):
+            continue
+        cells = move_cells(move_code)
+        if OFF_BOARD in cells:
+            continue
+        MOVE_TABLE[move_code] = (MOVE_DIRECTIONS[move_direction], tuple(CELL_INDICES[cell] for cell in cells))
+
+
+_build_move_tables()
+
+
+if __name__ == "__main__":
+    notation = (("C", 3), ("B", 2), ("A", 1), MoveDirection.UP_RIGHT)
+    code = encode_notation(notation)
+    print(f"{notation} -> {code} -> {decode_move(code)}")
+    print(decode_to_notation(code))
+    print(move_info_positions(code))
+    print(sum(1 for entry in MOVE_TABLE if entry is not None), "valid move codes")
@@ -0,0 +1,137 @@
+import argparse
+import time
+
+from board import Board
+from enums import InitialBoardState
+from enums import PieceType
+from exceptions import InvalidParameterException
+from moveencoding import MOVE_TABLE, decode_to_notation
+from statespacegenerator import StateSpaceGenerator
+
+
+# Known leaf node counts with black to move first, as REFERENCE_COUNTS[layout][depth - 1]. Any change to the move
+# generator or to make/unmake that changes these numbers is a bug.
+REFERENCE_COUNTS = {
+    InitialBoardState.DEFAULT: (44, 1936, 98912, 5045110),
+    InitialBoardState.BELGIAN: (52, 2692, 149322, 8270666),
+    InitialBoardState.GERMAN: (80, 6244, 493480, 38240570),
+}
+
+
+def perft(board, team, depth):
+    """
+    Counts the leaf nodes of the game tree to the depth given, using the StateSpaceGenerator to generate moves and
+    make/unmake to walk the tree. Nothing is evaluated and no transposition table is used, so only move generation
+    and moving pieces are measured. Won games are not treated as terminal.
+    :param board: a Board representing the current board state, left unchanged once done
+    :param team: a PieceType enum representing the team to move
+    :param depth: an int representing the depth to search the tree
+    :return: an int representing the number of leaf nodes
+    """
+    if depth == 0:
+        return 1
+
+    move_codes = StateSpaceGenerator.build_state_space_generator(board, team).generate_move_codes()
+
+    # Every move at the last ply is a leaf, there is no need to make them
+    if depth == 1:
+        return len(move_codes)
+
+    next_team = PieceType.BLACK if team == PieceType.WHITE else PieceType.WHITE
+    nodes = 0
+    for move in move_codes:
+        undo_record = board.make_index_move(*MOVE_TABLE[move])
+        nodes += perft(board, next_team, depth - 1)
+        board.unmake_move(undo_record)
+    return nodes
+
+
+def divide(board, team, depth):
+    """
+    Splits the perft() count up by the moves at the root, to narrow down where two move generators disagree.
+    :param board: a Board representing the current board state, left unchanged once done
+    :param team: a PieceType enum representing the team to move
+    :param depth: an int representing the depth to search the tree, at least 1
+    :return: a List of Tuples of each root move code and the number of leaf nodes under it
+    """
+    next_team = PieceType.BLACK if team == PieceType.WHITE else PieceType.WHITE
+    results = []
+    for move in StateSpaceGenerator.build_state_space_generator(board, team).generate_move_codes():
+        undo_record = board.make_index_move(*MOVE_TABLE[move])
+        results.append((move, perft(board, next_team, depth - 1)))
+        board.unmake_move(undo_record)
+    return results
+
+
+def run(layout, depth, show_divide=False):
+    """
+    Runs perft on a starting layout with black to move, printing the node count, time taken and nodes per second.
+    Throws an InvalidParameterException if the depth is less than 1.
+    :param layout: an InitialBoardState enum for the board to start from
+    :param depth: an int representing the depth to search the tree, at least 1
+    :param show_divide: True to also print the node count under each root move
+    :return: True if the count matches REFERENCE_COUNTS or there is no reference count for the depth, False otherwise
+    """
+    if depth < 1:
+        raise InvalidParameterException(f"perft needs a depth of at least 1, not {depth}")
+
+    board = Board(layout)
+
+    start_time = time.perf_counter()
+    if show_divide:
+        results = divide(board, PieceType.BLACK, depth)
+        nodes = sum(count for move, count in results)
+    else:
+        results = None
+        nodes = perft(board, PieceType.BLACK, depth)
+    elapsed = time.perf_counter() - start_time
+
+    if results is not None:
+        for move, count in results:
+            print(f"{decode_to_notation(move)}: {count}")
+
+    reference = REFERENCE_COUNTS[layout]
+    expected = reference[depth - 1] if depth <= len(reference) else None
+    if expected is None:
+        status = "no reference"
+    elif expected == nodes:
+        status = "ok"
+    else:
+        status = f"MISMATCH, expected {expected}"
+
+    print(f"{layout.name} depth {depth}: {nodes} nodes in {elapsed:.3f}s "
+          f"({nodes / elapsed if elapsed > 0 else 0:.0f} nodes/s) [{status}]")
+    return expected is None or expected == nodes
+
+
+def _depth(value):
+    """
+    Parses the depth argument, which must be at least 1.
+    :param value: the argument as a String
+    :return: the depth as an int
+    """
+    depth = int(value)
+    if depth < 1:
+        raise argparse.ArgumentTypeError(f"depth must be at least 1, not {depth}")
+    return depth
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Counts the leaf nodes of the move generator from a starting layout.")
+    parser.add_argument("depth", type=_depth, nargs="?", default=3, help="depth to search the tree to, at least 1")
+    parser.add_argument("--layout", choices=[layout.name for layout in REFERENCE_COUNTS], action="append",
+                        help="starting layout, every layout with reference counts if not given")
+    parser.add_argument("--divide", action="store_true", help="print the node count under each root move")
+    args = parser.parse_args()
+
+    layouts = [InitialBoardState[name] for name in args.layout] if args.layout else list(REFERENCE_COUNTS)
+    passed = True
+    for layout in layouts:
+        passed = run(layout, args.depth, args.divide) and passed
+
+    if not passed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
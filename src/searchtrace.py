@@ -0,0 +1,149 @@
+import json
+
+from moveencoding import move_info_positions
+from transpositiontable import NO_MOVE
+
+
+# Reasons a node of the search stopped before searching all of its moves, written as the "cutoff" of its record
+# A move scored outside the alpha-beta window, so the rest were pruned
+CUTOFF_ALPHA_BETA = "alpha_beta"
+# The transposition table already held a score for the board that could be used
+CUTOFF_TRANSPOSITION = "transposition"
+# Passing still scored outside the window, see StateSpaceGenerator.minimax()
+CUTOFF_NULL_MOVE = "null_move"
+
+
+class SearchTrace:
+    """
+    Writes a record of every node a search visits to a JSON Lines file, one JSON object per line, to see where the
+    search spends its nodes and how well it prunes. Quiescence nodes are not recorded, the score of a minimax leaf
+    already includes them.
+
+    Node records hold the node's ply from the root, the depth left to search, the alpha-beta window it was searched
+    with, its score, the best move found (null if none) and the cutoff that ended it (null if every move was
+    searched). Iteration records are written as each iteration of iterative deepening completes, with its score,
+    principal variation and node count so far.
+
+    Records are kept in memory as tuples and only turned into JSON once BUFFER_RECORDS of them have been collected,
+    so tracing slows the search down as little as it can. Searches that are not traced never create one.
+    """
+
+    # Number of records collected before they are written to the file
+    BUFFER_RECORDS = 4096
+
+    def __init__(self, file_name):
+        """
+        Opens the trace file, replacing any file already there.
+        :param file_name: a String of the path of the file to write
+        """
+        self._file = open(file_name, mode='w', encoding='utf-8')
+        self._buffer = []
+        # Number of node records written, including the ones still in the buffer
+        self._nodes = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def nodes(self):
+        """
+        Property to get the number of node records written
+        :return: an int
+        """
+        return self._nodes
+
+    def record(self, ply, depth, move, alpha, beta, score, cutoff=None):
+        """
+        Records a node once it has been scored.
+        :param ply: the number of moves from the root to the node as an int
+        :param depth: the depth left to search below the node as an int
+        :param move: the best move code found at the node, NO_MOVE if there is none
+        :param alpha: the alpha the node was searched with as an int
+        :param beta: the beta the node was searched with as an int
+        :param score: the score of the node as an int
+        :param cutoff: the cutoff that ended the node, one of the CUTOFF strings or None
+        """
+        self._nodes += 1
+        self._buffer.append((ply, depth, move, alpha, beta, score, cutoff))
+        if len(self._buffer) >= SearchTrace.BUFFER_RECORDS:
+            self.flush()
+
+    def record_iteration(self, depth, score, line, nodes):
+        """
+        Records an iteration of iterative deepening once it has completed.
+        :param depth: the depth searched below the root moves as an int
+        :param score: the score of the best root move as an int
+        :param line: a sequence of the move codes of the principal variation, starting with the best root move
+        :param nodes: the number of nodes searched so far as an int
+        """
+        self._buffer.append((depth, score, tuple(line), nodes))
+        if len(self._buffer) >= SearchTrace.BUFFER_RECORDS:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes the records collected to the file.
+        """
+        lines = []
+        for record in self._buffer:
+            if len(record) == 4:
+                depth, score, line, nodes = record
+                lines.append(json.dumps({"iteration": depth, "score": score,
+                                         "pv": [SearchTrace.move_to_string(move) for move in line],
+                                         "nodes": nodes}))
+            else:
+                ply, depth, move, alpha, beta, score, cutoff = record
+                lines.append(json.dumps({"ply": ply, "depth": depth, "move": SearchTrace.move_to_string(move),
+                                         "alpha": alpha, "beta": beta, "score": score, "cutoff": cutoff}))
+        if lines:
+            self._file.write("\n".join(lines) + "\n")
+        self._buffer.clear()
+        self._file.flush()
+
+    def close(self):
+        """
+        Writes any records left and closes the file.
+        """
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    @staticmethod
+    def move_to_string(move):
+        """
+        Converts a move code to the string written in the trace, eg. "C3B2A1 UP_RIGHT".
+        :param move: the move code as an int
+        :return: a String, None for NO_MOVE
+        """
+        if move == NO_MOVE:
+            return None
+        from_pos, to_pos, direction = move_info_positions(move)
+        return f"{from_pos} {direction}"
+
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+    from collections import Counter
+
+    from board import Board
+    from enums import InitialBoardState, PieceType, SearchMode
+    from statespacegenerator import StateSpaceGenerator
+
+    # Trace a short search and count how its nodes ended
+    trace_file = os.path.join(tempfile.gettempdir(), "search_trace.jsonl")
+    state_space_gen = StateSpaceGenerator.build_state_space_generator(Board(InitialBoardState.BELGIAN),
+                                                                      PieceType.BLACK)
+    with SearchTrace(trace_file) as search_trace:
+        state_space_gen.trace = search_trace
+        state_space_gen.find_best_move(2, None, SearchMode.PRINCIPAL_VARIATION)
+        state_space_gen.trace = None
+
+    with open(trace_file, mode='r', encoding='utf-8') as trace_input:
+        records = [json.loads(line) for line in trace_input]
+    print(f"{len(records)} records written to {trace_file}")
+    print(Counter(record.get("cutoff") for record in records if "ply" in record))
+    print([record for record in records if "iteration" in record])
@@ -1,23 +1,103 @@
+from array import array
 from enum import Enum
 
 from board import Board
+from board import CELL_IDS, LINES_OF_THREE, LINES_OF_TWO, NEIGHBOUR_INDICES, ROW_OFFSETS
+from bitboard import BitBoard
+from moveencoding import MOVE_CODE_LIMIT, MOVE_DIRECTIONS, MOVE_TABLE
+from moveencoding import create_move_list, decode_to_notation, encode_cells, encode_notation
+from searchtrace import CUTOFF_ALPHA_BETA, CUTOFF_NULL_MOVE, CUTOFF_TRANSPOSITION
+from transpositiontable import EXACT, LOWER_BOUND, NO_MOVE, NO_QUIESCENCE_KEY, UPPER_BOUND, WHITE_SCORES_KEY
+from transpositiontable import SharedTranspositionTable, TranspositionTable
 from enums import MoveDirection, HeuristicWeight
 from enums import PieceType
+from enums import SearchMode
+from exceptions import InvalidParameterException
+from exceptions import SearchTimeoutException
+import atexit
+from concurrent.futures import ProcessPoolExecutor
+import itertools
+import multiprocessing
+import os
 import time
 
 
+def _build_piece_points(starting_marbles):
+    """
+    Builds the table of points for the number of pieces each team has. Losing a marble costs ten times what pushing
+    one off gains, and pushing off the sixth wins.
+    :param starting_marbles: the number of marbles each team starts with as an int
+    :return: a List of Lists of points as ints, indexed by the team's own marbles then the opponent's marbles
+    """
+    piece_weight = HeuristicWeight.PIECE_WEIGHT.value
+    piece_points = []
+    for own_marbles in range(starting_marbles + 1):
+        row = []
+        for opponent_marbles in range(starting_marbles + 1):
+            if opponent_marbles <= 8:
+                row.append(HeuristicWeight.WIN_WEIGHT.value)
+            else:
+                row.append((starting_marbles - opponent_marbles) * piece_weight
+                           - (starting_marbles - own_marbles) * piece_weight * 10)
+        piece_points.append(row)
+    return piece_points
+
+
 class StateSpaceGenerator:
     """
     A class that generates all possible legal next moves and the resulting game
     board configuration of each move.
     """
 
-    MIN = -3000
-    MAX = 3000
+    # Bounds of the search window, beyond every score evaluate() gives so the full window never cuts a line off.
+    # Losing every marble scores lowest, see _build_piece_points().
+    MIN = -100000
+    MAX = 100000
 
     starting_marbles = 14
 
-    TRANSPOSITION_TABLE = {}
+    # Points for the number of pieces, as PIECE_POINTS[own marbles][opponent marbles], see points_for_pieces()
+    PIECE_POINTS = _build_piece_points(starting_marbles)
+
+    # Scores of searched boards, keyed by Board.get_transposition_key() of the board. Shared by every search.
+    TRANSPOSITION_TABLE = TranspositionTable()
+
+    # Pool of worker processes for parallel searches, its size, and the alpha bound, stop flag and transposition table
+    # shared by its workers
+    _executor = None
+    _executor_workers = None
+    _shared_alpha = None
+    _shared_stop_flag = None
+    _shared_table = None
+
+    # Number of nodes minimax searches between checks of the deadline and stop flag, and the number between checks
+    # when searching to a latency target, where the deadline is only milliseconds away. The node limit is checked at
+    # every node.
+    DEADLINE_CHECK_INTERVAL = 256
+    LATENCY_CHECK_INTERVAL = 1
+
+    # Most seconds taken off the time given to a search, so it returns before the caller's own time is up, and the
+    # most taken off as a fraction of the time given, so short searches keep most of their time
+    TIME_BUFFER = 0.5
+    TIME_BUFFER_FRACTION = 0.1
+
+    # Null move pruning settings: plies taken off the null move search, the least depth left to try a null move at
+    # and the least number of legal moves needed to try one
+    NULL_MOVE_REDUCTION = 2
+    NULL_MOVE_MIN_DEPTH = 3
+    NULL_MOVE_MIN_MOVES = 10
+
+    # Late move reduction settings: plies taken off a late move, the least depth left to reduce at and the number of
+    # moves searched before moves are reduced
+    LATE_MOVE_REDUCTION = 1
+    LATE_MOVE_MIN_DEPTH = 3
+    LATE_MOVE_MIN_NUMBER = 4
+
+    # Most nodes a quiescence search can visit below one minimax leaf
+    QUIESCENCE_NODE_LIMIT = 64
+
+    # Distance either side of the last iteration's score of the root window for principal variation search
+    ASPIRATION_WINDOW = 25
 
     def __init__(self):
         # Board configuration read in
@@ -30,8 +110,46 @@ class StateSpaceGenerator:
         self._ally_pieces = []
         # List of pieces for the other player not acting
         self._enemy_pieces = []
+        # Colour of the piece on each occupied tile, keyed by the (x, y) array index
+        self._occupancy = {}
         # Number of sumit moves
         self._num_sumito = 0
+        # Time (from time.time()) the search must stop by, None for no deadline
+        self._deadline = None
+        # Time (from time.time()) of the last check of the deadline, and the most seconds seen between two checks
+        self._last_check = None
+        self._longest_check = 0.0
+        # Shared flag another process sets to stop the search early, None if there is none
+        self._stop_flag = None
+        # Number of nodes the search must stop by, None for no limit, and the number of nodes between checks of the
+        # deadline and stop flag
+        self._node_limit = None
+        self._check_interval = StateSpaceGenerator.DEADLINE_CHECK_INTERVAL
+        # Number of nodes visited by minimax in the current search
+        self._nodes_searched = 0
+        # Depth of the current search counted from the root, the most plies a node can be from the root
+        self._search_depth = 0
+        # Triangular table of principal variations: the best line found below the node searched at each ply, as a
+        # Tuple of move codes. Set up for each iteration, see _start_iteration().
+        self._pv_table = None
+        # Principal variation of the last iteration to complete, as a Tuple of move codes
+        self._best_line = ()
+        # SearchTrace recording every node searched, None to not trace the search
+        self._trace = None
+        # True to end minimax with a quiescence search, and the number of nodes it has visited below the current leaf
+        self._quiescence = True
+        self._quiescence_nodes = 0
+        # True to prune with null moves, and whether the search is below a null move
+        self._null_move = False
+        self._in_null_move = False
+        # True to reduce the depth of late quiet moves
+        self._late_move_reductions = False
+        # True to search with principal variation search instead of minimax, see SearchMode
+        self._principal_variation = False
+        # Killer moves and history scores used to order moves, see _reset_move_ordering()
+        self._killers = {}
+        self._history = None
+        self._reset_move_ordering()
 
     @property
     def pieces(self):
@@ -65,26 +183,42 @@ class StateSpaceGenerator:
         """
 
         self._player_type = team
-        tile_values = board.get_tiles_values()
 
-        self._pieces.clear()
-        self._ally_pieces.clear()
-        self._enemy_pieces.clear()
+        pieces = []
+        ally_pieces = []
+        enemy_pieces = []
+        occupancy = {}
 
-        for x in range(len(tile_values)):
-            for y in range(len(tile_values[x])):
-                if tile_values[x][y]:
-                    self._pieces.append((x, y, PieceType.WHITE))
-                    if self._player_type is PieceType.BLACK:
-                        self._enemy_pieces.append((x, y, PieceType.WHITE))
-                    else:
-                        self._ally_pieces.append((x, y, PieceType.WHITE))
-                elif tile_values[x][y] is False:
-                    self._pieces.append((x, y, PieceType.BLACK))
-                    if self._player_type is PieceType.BLACK:
-                        self._ally_pieces.append((x, y, PieceType.BLACK))
-                    else:
-                        self._enemy_pieces.append((x, y, PieceType.BLACK))
+        # Build the pieces straight from the tile values, ally/enemy split decided once for each colour
+        if team is PieceType.WHITE:
+            white_pieces, black_pieces = ally_pieces, enemy_pieces
+        else:
+            white_pieces, black_pieces = enemy_pieces, ally_pieces
+
+        for x, row in enumerate(board.get_tiles_values()):
+            for y, value in enumerate(row):
+                if value is None:
+                    continue
+                if value:
+                    piece = (x, y, PieceType.WHITE)
+                    white_pieces.append(piece)
+                else:
+                    piece = (x, y, PieceType.BLACK)
+                    black_pieces.append(piece)
+                pieces.append(piece)
+                occupancy[(x, y)] = piece[2]
+
+        self._pieces = pieces
+        self._ally_pieces = ally_pieces
+        self._enemy_pieces = enemy_pieces
+        self._occupancy = occupancy
+
+    def _build_occupancy(self):
+        """
+        Builds the occupancy index from the list of pieces, so the colour on a tile
+        can be looked up without searching through the lists of pieces.
+        """
+        self._occupancy = {(piece[0], piece[1]): piece[2] for piece in self._pieces}
 
     def read_input_file(self, file_name):
         """
@@ -112,6 +246,7 @@ class StateSpaceGenerator:
             # Separate lists for ally and enemy pieces for ease of search
             self._ally_pieces = [piece for piece in self._pieces if piece[2] == self._player_type]
             self._enemy_pieces = [piece for piece in self._pieces if piece[2] != self._player_type]
+            self._build_occupancy()
 
     def _piece_generator(self):
         """
@@ -135,58 +270,16 @@ class StateSpaceGenerator:
     def find_triple_pieces(self):
         """
         Finds all ally pieces which can be grouped as a 'three'.
-        :return: a List containing all groups of 'two' as tuples.
+        :return: a List containing all groups of 'three' as tuples.
         """
-        # List to store triple pieces
-        triples = []
-        # Loop through all 'ally' pieces
-        for piece in self._ally_pieces:
-            # Loop through all moves for each piece
-            for move in MoveDirection:
-                # Create an ally piece (if it exists, returns None if not)
-                adjacent_piece = self._is_ally(piece, move)
-                if adjacent_piece is not None:
-                    # Repeat the check for the next in-line piece
-                    next_adjacent_piece = self._is_ally(adjacent_piece, move)
-                    if next_adjacent_piece is not None:
-                        # Check if the move has been added already in another order of pieces
-                        existing = False
-                        for trips in triples:
-                            if piece in trips and tuple(adjacent_piece) in trips and tuple(next_adjacent_piece) in trips:
-                                existing = True
-                                break
-                        # Add to list of triplets if none already exists
-                        if not existing:
-                            triples.append((piece, tuple(adjacent_piece), tuple(next_adjacent_piece)))
-        return triples
+        return self._find_groups(self._ally_pieces, LINES_OF_THREE)
 
     def find_triple_pieces_enemy(self):
         """
-        Finds all ally pieces which can be grouped as a 'three'.
-        :return: a List containing all groups of 'two' as tuples.
+        Finds all enemy pieces which can be grouped as a 'three'.
+        :return: a List containing all groups of 'three' as tuples.
         """
-        # List to store triple pieces
-        triples = []
-        # Loop through all 'ally' pieces
-        for piece in self._enemy_pieces:
-            # Loop through all moves for each piece
-            for move in MoveDirection:
-                # Create an ally piece (if it exists, returns None if not)
-                adjacent_piece = self._is_enemy(piece, move)
-                if adjacent_piece is not None:
-                    # Repeat the check for the next in-line piece
-                    next_adjacent_piece = self._is_enemy(adjacent_piece, move)
-                    if next_adjacent_piece is not None:
-                        # Check if the move has been added already in another order of pieces
-                        existing = False
-                        for trips in triples:
-                            if piece in trips and tuple(adjacent_piece) in trips and tuple(next_adjacent_piece) in trips:
-                                existing = True
-                                break
-                        # Add to list of triplets if none already exists
-                        if not existing:
-                            triples.append((piece, tuple(adjacent_piece), tuple(next_adjacent_piece)))
-        return triples
+        return self._find_groups(self._enemy_pieces, LINES_OF_THREE)
 
     def find_three_piece_moves(self, groups):
         """
@@ -194,103 +287,44 @@ class StateSpaceGenerator:
         :param groups: a List of Tuples containing all valid groups of three pieces for the player.
         :return: a List of Tuples containing all legal moves
         """
-        # List to store the legal moves
-        legal_moves = []
-        # Loop through all groups of three
-        for trips in groups:
-            # Loop through all moves for each group
-            for move in MoveDirection:
-                # Create local reference of each piece for readability (and speed)
-                piece_one = trips[0]
-                piece_two = trips[1]
-                piece_three = trips[2]
-                # Check if move is in-line by calling function from Board class
-                if Board.is_inline(piece_one, piece_two, move):
-                    # Checks for an empty space or a valid sumito move in the direction of movement
-                    sumito = self._is_sumito(trips, move)
-                    empty = self._is_empty(trips, move)
-                    if empty or sumito:
-                        existing = False
-                        # Create the board position for each piece (e.g A1)
-                        board_position_one = Board.index_to_position(piece_one)
-                        board_position_two = Board.index_to_position(piece_two)
-                        board_position_three = Board.index_to_position(piece_three)
-                        # Check if the move has already been added in different order of pieces
-                        for legal_move in legal_moves:
-                            if board_position_one in legal_move and board_position_two in legal_move and board_position_three in legal_move and move in legal_move:
-                                existing = True
-                                break
-                        # Add to list if not found
-                        if not existing:
-                            if sumito:
-                                self._num_sumito += 1
-                            legal_moves.append((board_position_one, board_position_two, board_position_three, move))
-                # Side-step move if not in-line
-                else:
-                    # Checks if there is empty space for a sidestep move
-                    if self._check_valid_sidestep(trips, move):
-                        # Repeat from in-line
-                        existing = False
-                        board_position_one = Board.index_to_position(piece_one)
-                        board_position_two = Board.index_to_position(piece_two)
-                        board_position_three = Board.index_to_position(piece_three)
-                        for legal_move in legal_moves:
-                            if board_position_one in legal_move and board_position_two in legal_move and board_position_three in legal_move and move in legal_move:
-                                existing = True
-                                break
-                        if not existing:
-                            legal_moves.append((board_position_one, board_position_two, board_position_three, move))
-        return legal_moves
+        return self._find_group_moves(groups)
 
     def find_double_pieces(self):
         """
         Finds all ally pieces which can be grouped as a 'two'.
         :return: a List containing all groups of 'two' as tuples.
         """
-        # List to store double pieces
-        twos = []
-        # Loop through all moves for each piece
-        for piece in self._ally_pieces:
-            # Loop through all moves for each piece
-            for move in MoveDirection:
-                # Create an ally piece (if it exists, returns None if not)
-                adjacent_piece = self._is_ally(piece, move)
-                if adjacent_piece is not None:
-                    # Check if the move has already been added in another order of pieces
-                    existing = False
-                    for double in twos:
-                        if adjacent_piece in double and piece in double:
-                            existing = True
-                            break
-                    if not existing:
-                        # Add to list if not found
-                        twos.append((piece, tuple(adjacent_piece)))
-        return twos
+        return self._find_groups(self._ally_pieces, LINES_OF_TWO)
 
     def find_double_pieces_enemy(self):
         """
         Finds all enemy pieces which can be grouped as a 'two'.
         :return: a List containing all groups of 'two' as tuples.
         """
-        # List to store double pieces
-        twos = []
-        # Loop through all moves for each piece
-        for piece in self._enemy_pieces:
-            # Loop through all moves for each piece
-            for move in MoveDirection:
-                # Create an ally piece (if it exists, returns None if not)
-                adjacent_piece = self._is_enemy(piece, move)
-                if adjacent_piece is not None:
-                    # Check if the move has already been added in another order of pieces
-                    existing = False
-                    for double in twos:
-                        if adjacent_piece in double and piece in double:
-                            existing = True
-                            break
-                    if not existing:
-                        # Add to list if not found
-                        twos.append((piece, tuple(adjacent_piece)))
-        return twos
+        return self._find_groups(self._enemy_pieces, LINES_OF_TWO)
+
+    def _find_groups(self, pieces, lines):
+        """
+        Finds all groups of same coloured pieces using a table of lines on the board.
+        Every line is only stored once in the table, so every group is found exactly once.
+        :param pieces: a List of pieces of the same colour to start the groups from
+        :param lines: the LINES_OF_TWO or LINES_OF_THREE table from board
+        :return: a List containing all groups as tuples of pieces, in the order of the line
+        """
+        # List to store the groups
+        groups = []
+        occupancy = self._occupancy
+        for piece in pieces:
+            colour = piece[2]
+            # Loop through every line starting at this piece
+            for line in lines[ROW_OFFSETS[piece[0]] + piece[1]]:
+                # The group is valid if every other tile of the line holds the same colour
+                for index in line[1:]:
+                    if occupancy.get(index) is not colour:
+                        break
+                else:
+                    groups.append((piece,) + tuple(index + (colour,) for index in line[1:]))
+        return groups
 
     def _is_ally(self, index, direction):
         """
@@ -302,8 +336,8 @@ class StateSpaceGenerator:
         """
         adjacent_piece = StateSpaceGenerator.apply_movement(index, direction)
 
-        # If adjacent piece is in the list of allies, return the piece
-        if tuple(adjacent_piece) in self._ally_pieces:
+        # If adjacent tile holds an ally, return the piece
+        if self._occupancy.get((adjacent_piece[0], adjacent_piece[1])) is self._player_type:
             return adjacent_piece
         # Returns None if not an ally or no piece found
         else:
@@ -319,8 +353,9 @@ class StateSpaceGenerator:
         """
         adjacent_piece = StateSpaceGenerator.apply_movement(index, direction)
 
-        # If adjacent piece is in the list of allies, return the piece
-        if tuple(adjacent_piece) in self._enemy_pieces:
+        # If adjacent tile holds an enemy, return the piece
+        colour = self._occupancy.get((adjacent_piece[0], adjacent_piece[1]))
+        if colour is not None and colour is not self._player_type:
             return adjacent_piece
         # Returns None if not an ally or no piece found
         else:
@@ -332,51 +367,52 @@ class StateSpaceGenerator:
         :param groups: a List of Tuples containing all valid groups of two pieces for the player.
         :return: a List of Tuples containing all legal moves
         """
+        return self._find_group_moves(groups)
+
+    def _find_group_moves(self, groups):
+        """
+        Finds all legal moves for groups of two or three pieces. Each group must only be given once,
+        which is how find_double_pieces() and find_triple_pieces() return them.
+        :param groups: a List of Tuples containing all valid groups of pieces for the player.
+        :return: a List of Tuples containing all legal moves
+        """
         # List to store all legal moves
         legal_moves = []
-        # Loop through all groups of two pieces
-        for double in groups:
-            # Loop through all moves for each group of two
+        # Loop through all groups
+        for group in groups:
+            # Create the board position for each piece (e.g A1) when the first legal move is found
+            board_positions = None
+            # Loop through all moves for each group
             for move in MoveDirection:
-                # Create local reference of each piece for readability (and speed)
-                piece_one = double[0]
-                piece_two = double[1]
-                # Check if move is in-line by calling function from Board class
-                if Board.is_inline(piece_one, piece_two, move):
-                    # Checks for an empty space or a valid sumito move in the direction of movement
-                    sumito = self._is_sumito(double, move)
-                    empty = self._is_empty(double, move)
-                    if empty or sumito:
-                        existing = False
-                        # Create the board position for each piece (e.g A1)
-                        board_position_one = Board.index_to_position(piece_one)
-                        board_position_two = Board.index_to_position(piece_two)
-                        # Check if the move has already been added in different order of pieces
-                        for legal_move in legal_moves:
-                            if board_position_one in legal_move and board_position_two in legal_move and move in legal_move:
-                                existing = True
-                                break
-                        # Add to list if not found
-                        if not existing:
-                            if sumito:
-                                self._num_sumito += 1
-                            legal_moves.append((board_position_one, board_position_two, move))
-                # Side-step move if not in-line
-                else:
-                    # Checks if there is empty space for a sidestep move
-                    if self._check_valid_sidestep(double, move):
-                        # Repeat from in-line
-                        existing = False
-                        board_position_one = Board.index_to_position(piece_one)
-                        board_position_two = Board.index_to_position(piece_two)
-                        for legal_move in legal_moves:
-                            if board_position_one in legal_move and board_position_two in legal_move and move in legal_move:
-                                existing = True
-                                break
-                        if not existing:
-                            legal_moves.append((board_position_one, board_position_two, move))
+                # Check if move is in-line
+                if StateSpaceGenerator._is_inline(group[0], group[1], move):
+                    # Checks for a valid sumito move or an empty space in the direction of movement
+                    if self._is_sumito(group, move):
+                        self._num_sumito += 1
+                    elif not self._is_empty(group, move):
+                        continue
+                # Side-step move if not in-line, checks if there is empty space for a sidestep move
+                elif not self._check_valid_sidestep(group, move):
+                    continue
+
+                if board_positions is None:
+                    board_positions = tuple(Board.index_to_position(piece) for piece in group)
+                legal_moves.append(board_positions + (move,))
         return legal_moves
 
+    @staticmethod
+    def _is_inline(piece_one, piece_two, direction):
+        """
+        Checks if two adjacent pieces are in line with a move direction, using the neighbour table.
+        :param piece_one: a piece of the group to move
+        :param piece_two: a piece of the group to move next to piece_one
+        :param direction: a MoveDirection enum
+        :return: True if the movement is inline
+        """
+        neighbours = NEIGHBOUR_INDICES[direction]
+        return neighbours[ROW_OFFSETS[piece_one[0]] + piece_one[1]] == (piece_two[0], piece_two[1]) \
+            or neighbours[ROW_OFFSETS[piece_two[0]] + piece_two[1]] == (piece_one[0], piece_one[1])
+
     def _check_valid_sidestep(self, pieces, move):
         """
         Finds out if a column/row of pieces moving in the indicated move direction
@@ -429,15 +465,11 @@ class StateSpaceGenerator:
                 break
         # *NOTE* moved_piece = head piece - sorry not very clear
 
-        # Create an enemy piece at the head piece's location in order to search
-        # for it in the enemy's list of pieces
-        dummy_piece = moved_piece.copy()
-        if self._player_type == PieceType.W:
-            dummy_piece[2] = PieceType.B
-        else:
-            dummy_piece[2] = PieceType.W
-        # Check if dummy piece exists in enemy's pieces
-        if tuple(dummy_piece) in self._enemy_pieces:
+        occupancy = self._occupancy
+
+        # Check if the head piece's new position holds an enemy
+        colour = occupancy.get((moved_piece[0], moved_piece[1]))
+        if colour is not None and colour is not self._player_type:
             num_enemy_pieces += 1
         else:
             # Piece is either ally or empty space, no need to proceed
@@ -445,19 +477,19 @@ class StateSpaceGenerator:
 
         # Copy from Board.calculate_sumito()
         while True:
-            # Move dummy piece (enemy) and ally piece to the next in-line position
-            dummy_piece = StateSpaceGenerator.apply_movement(dummy_piece, move)
+            # Move to the next in-line position
             moved_piece = StateSpaceGenerator.apply_movement(moved_piece, move)
+            colour = occupancy.get((moved_piece[0], moved_piece[1]))
 
-            # Check if this position is still taken up by the enemy
-            if tuple(dummy_piece) in self._enemy_pieces:
-                num_enemy_pieces += 1
+            # Breaks loop at empty space or off the board
+            if colour is None:
+                break
             # If piece is an ally, cannot move a sandwiched piece
-            elif tuple(moved_piece) in self._ally_pieces:
+            elif colour is self._player_type:
                 return False
-            # Breaks loop at empty space otherwise
+            # Position is still taken up by the enemy
             else:
-                break
+                num_enemy_pieces += 1
 
         # Sumito is true if number of marbles to push is less than number of our marbles
         if num_enemy_pieces < num_ally_pieces:
@@ -465,6 +497,28 @@ class StateSpaceGenerator:
         else:
             return False
 
+    def _is_push_off(self, pieces, move):
+        """
+        Finds out if a valid sumito pushes an enemy marble off the board.
+        :param pieces: a List representing the column/row of pieces to move.
+        :param move: a MoveDirection enum indicating the direction of the move.
+        :precondition: the move is a valid sumito, see _is_sumito()
+        :return: True if the last enemy marble pushed ends up off the board, False otherwise.
+        """
+        # Find the head piece
+        moved_piece = None
+        for piece in pieces:
+            moved_piece = StateSpaceGenerator.apply_movement(piece, move)
+            if tuple(moved_piece) not in pieces:
+                break
+
+        # Walk over the enemy marbles in front of the head
+        while (moved_piece[0], moved_piece[1]) in self._occupancy:
+            moved_piece = StateSpaceGenerator.apply_movement(moved_piece, move)
+
+        # The tile behind the last enemy marble is off the board
+        return not self._check_piece_bounds(moved_piece)
+
     def _is_empty(self, pieces, move):
         """
         Checks if there is an empty space adjacent to the piece(s) given in the direction given.
@@ -536,34 +590,15 @@ class StateSpaceGenerator:
         :param new_pieces: a List of new pieces.
         :return: True if positions have already been taken, False otherwise.
         """
+        occupancy = self._occupancy
 
         # No need for loop if there is only 1 piece
         if num_pieces == 1:
-            # Check if position is taken up by an ally piece
-            if tuple(new_pieces) in self._ally_pieces:
-                return True
-            # Convert piece to enemy's colour
-            if self._player_type == PieceType.B:
-                new_pieces[2] = PieceType.WHITE
-            else:
-                new_pieces[2] = PieceType.BLACK
-            # Check if position is taken up by enemy piece
-            if tuple(new_pieces) in self._enemy_pieces:
-                return True
+            return (new_pieces[0], new_pieces[1]) in occupancy
         # Loop through all pieces if more than 1 piece
-        else:
-            for new_piece in new_pieces:
-                # Check if position of piece is taken up by ally piece
-                if tuple(new_piece) in self._ally_pieces:
-                    return True
-                # Convert piece to enemy's colour
-                if self._player_type == PieceType.B:
-                    new_piece[2] = PieceType.WHITE
-                else:
-                    new_piece[2] = PieceType.BLACK
-                # Check if position is taken up by enemy piece
-                if tuple(new_piece) in self._enemy_pieces:
-                    return True
+        for new_piece in new_pieces:
+            if (new_piece[0], new_piece[1]) in occupancy:
+                return True
         return False
 
     @staticmethod
@@ -572,20 +607,10 @@ class StateSpaceGenerator:
         Applies the move direction to the given piece and returns the new coordinates.
         :param piece: a List representing the index of the piece on the Board
         :param direction: a MoveDirection enum
-        :return: a new piece with the move applied
+        :return: a new piece with the move applied, with OFF_BOARD_INDEX coordinates if it moved off the board
         """
-        # Get the MoveDirection as the Move Notation value (e.g (1,0))
-        movement = direction.value
-
-        # # Gets the current position as a Letter and Number eg. [A, 5]
-        # current_position = list(Board.index_to_position(piece))
-        # # Apply movement to the Letter and Number
-        # current_position[0] = chr(ord(current_position[0]) + movement[0])
-        # current_position[1] = current_position[1] + movement[1]
-        # # Get the index of the new position and build a new piece
-        # new_index = Board.position_to_index(current_position)
-
-        new_index = Board.add_direction(piece, direction)
+        # Look up the neighbouring tile in the precomputed table
+        new_index = NEIGHBOUR_INDICES[direction][ROW_OFFSETS[piece[0]] + piece[1]]
         new_piece = [new_index[0], new_index[1], piece[2]]
 
         return new_piece
@@ -616,65 +641,24 @@ class StateSpaceGenerator:
         """
         Evaluates a board and returns the score based on how far the pieces are from the centre.
         Utilizes the HeuristicWeight(DISTANCE_WEIGHT) enum to give weights to each distance from the middle.
+        The board keeps the sum up to date as marbles move, see Board.distance_points.
         :param board: The board to evaluate as a Board
         :param team: The team to evaluate for as a PieceType enum
         :return: The points given to the board for how far a players pieces are from the centre.
         """
-        points = 0
-
-        tile_distance_value = HeuristicWeight.DISTANCE_TILE_ARRAY.value
-
-        tiles = board.get_tiles()
-
-        y_pos = 0
-        x_pos = 0
-
-        for y in tiles:
-            for x in y:
-                if x == team:
-                    points += tile_distance_value[y_pos][x_pos]
-
-                x_pos += 1
-
-            x_pos = 0
-            y_pos += 1
-
-        return points
+        return board.distance_points[team.value]
 
     @staticmethod
     def points_for_spaces_from_center_enemy(board, team):
         """
-        Evaluates a board and returns the score based on how far the pieces are from the centre.
+        Evaluates a board and returns the score based on how far the enemy's pieces are from the centre.
         Utilizes the HeuristicWeight(DISTANCE_WEIGHT) enum to give weights to each distance from the middle.
+        The board keeps the sum up to date as marbles move, see Board.enemy_distance_points.
         :param board: The board to evaluate as a Board
         :param team: The team to evaluate for as a PieceType enum
-        :return: The points given to the board for how far a players pieces are from the centre.
+        :return: The points given to the board for how far the enemy's pieces are from the centre.
         """
-        points = 0
-
-        tile_distance_value = HeuristicWeight.ENEMY_DISTANCE_TILE_ARRAY.value
-
-        tiles = board.get_tiles()
-
-        if team == PieceType.WHITE:
-            enemy_team = PieceType.BLACK
-        else:
-            enemy_team = PieceType.WHITE
-
-        y_pos = 0
-        x_pos = 0
-
-        for y in tiles:
-            for x in y:
-                if x == enemy_team:
-                    points += tile_distance_value[y_pos][x_pos]
-
-                x_pos += 1
-
-            x_pos = 0
-            y_pos += 1
-
-        return points
+        return board.enemy_distance_points[not team.value]
 
     @staticmethod
     def points_for_groups(board, team):
@@ -763,22 +747,14 @@ class StateSpaceGenerator:
         """
         Evaluates a board and returns the score based on how pieces there are.
         Utilizes the HeuristicWeight(PIECE_WEIGHT) enum to give weights to each piece.
+        The points for every pair of marble counts are looked up in PIECE_POINTS.
         :param board: The board to evaluate as a Board
         :param team: The team to evaluate for as a PieceType enum
         :return: The points given to the board for the number of pieces.
         """
-        if team == PieceType.W:
-            if board.black_marbles <= 8:
-                return HeuristicWeight.WIN_WEIGHT.value
-            own_marbles = board.white_marbles
-            opponent_marbles = board.black_marbles
-            return ((StateSpaceGenerator.starting_marbles - opponent_marbles) * HeuristicWeight.PIECE_WEIGHT.value) - (StateSpaceGenerator.starting_marbles - own_marbles) * (HeuristicWeight.PIECE_WEIGHT.value * 10)
-        else:
-            if board.white_marbles <= 8:
-                return HeuristicWeight.WIN_WEIGHT.value
-            own_marbles = board.black_marbles
-            opponent_marbles = board.white_marbles
-            return ((StateSpaceGenerator.starting_marbles - opponent_marbles) * HeuristicWeight.PIECE_WEIGHT.value) - (StateSpaceGenerator.starting_marbles - own_marbles) * (HeuristicWeight.PIECE_WEIGHT.value * 10)
+        if team.value:
+            return StateSpaceGenerator.PIECE_POINTS[board.white_marbles][board.black_marbles]
+        return StateSpaceGenerator.PIECE_POINTS[board.black_marbles][board.white_marbles]
 
     @staticmethod
     def points_for_sumito(board, team):
@@ -824,149 +800,568 @@ class StateSpaceGenerator:
             board.set_tile_value(piece_data[2].value, tuple((piece_data[0], piece_data[1])))
         return board
 
-    def minimax(self, board, depth, alpha, beta, team):
+    def minimax(self, board, depth, alpha, beta, team, ply=1):
         """
         The minimax function evaluates the resulting board states of the given
         board to the depth level given, for each state it generates all legal
         next ply moves and explores the nodes not pruned via alpha-beta pruning.
+
+        Child nodes are visited by making each move on the board and unmaking it afterwards,
+        so the board is left as it was passed in.
+
+        Every board searched is stored in the transposition table with the depth it was searched to and whether its
+        score is exact or only a bound, so a board found again can often be scored without searching it.
         :param board: a Board representing the current board state
         :param depth: an int representing the depth to search the tree
-        :param team: a PieceType enum representing the player to evaluate the score for.
+        :param alpha: an int representing the best score MAX can guarantee
+        :param beta: an int representing the best score MIN can guarantee
+        :param team: a PieceType enum representing the player to move
+        :param ply: the number of moves from the root to the board as an int, counting null moves. Root moves are at
+                    ply 0, so the boards after them are at ply 1.
         :return: an int representing the score of the board.
         """
+        # Check the node limit at every node and the other limits every few nodes, throws a SearchTimeoutException
+        # once one is reached. The count only goes up by one, so it reaches the limit exactly (never if it is None).
+        # The board is left part way through the search when that happens.
+        self._nodes_searched += 1
+        if self._nodes_searched == self._node_limit \
+                or self._nodes_searched % self._check_interval == 0 and self._limit_reached():
+            raise SearchTimeoutException()
+
+        # Start this node's line of the principal variation empty, it is filled in once a move lands in the window
+        pv_table = self._pv_table
+        pv_table[ply] = ()
 
         # Terminate if depth limit has been reached
-        if depth == 0:
-            # Get the score for this board
-            score = self.evaluate(board, self._player_type)
+        if depth <= 0:
+            # Get the score for this board, playing out any sumitos first so the score is not taken mid exchange
+            if self._quiescence:
+                self._quiescence_nodes = 0
+                score = self.quiescence(board, alpha, beta, team)
+            else:
+                score = self.evaluate(board, self._player_type)
+            if self._trace is not None:
+                self._trace.record(ply, depth, NO_MOVE, alpha, beta, score)
             return score
-        # # Terminate if BLACK has won (we need to set a positive threshold?)
-        # if score > 2000:
-        #     return score
-        # # Terminate if WHITE has won (set a negative threshold?)
-        # if score < -2000:
-        #     return score
+
+        # Key the board by its Zobrist hash, the team to move and how it is scored
+        transposition_key = self._transposition_key(board, team)
+
+        # Check if this state exists in Transposition table, searched at least as deep as needed
+        transposition_table = StateSpaceGenerator.TRANSPOSITION_TABLE
+        entry = transposition_table.probe(transposition_key)
+        transposition_move = NO_MOVE
+        if entry is not None:
+            transposition_move = entry[3]
+            if entry[0] >= depth:
+                entry_bound = entry[1]
+                entry_score = entry[2]
+                # Exact scores can be used as is, bounds only if they fall outside the alpha-beta window
+                if entry_bound == EXACT \
+                        or (entry_bound == LOWER_BOUND and entry_score >= beta) \
+                        or (entry_bound == UPPER_BOUND and entry_score <= alpha):
+                    if self._trace is not None:
+                        self._trace.record(ply, depth, transposition_move, alpha, beta, entry_score,
+                                           CUTOFF_TRANSPOSITION)
+                    return entry_score
+
+        original_alpha = alpha
+        original_beta = beta
+        best_move = NO_MOVE
+        principal_variation = self._principal_variation
 
         # Create a State Space Generator to generate all legal moves of
         # the resulting board state
         state_space_gen = self.build_state_space_generator(board, team)
-        all_legal_moves = state_space_gen.generate_all_legal_moves()
+
+        # Order the moves so the ones most likely to cause a cut-off are searched first. They are generated in stages
+        # as the search reaches them, so a node cut off early never generates or sorts its quiet moves.
+        killers = self._killers.setdefault(ply, [NO_MOVE, NO_MOVE])
+        history = self._history[team.value]
+        sumito_moves = set()
+        all_legal_moves = state_space_gen._generate_ordered_move_codes(transposition_move, killers, history,
+                                                                       sumito_moves)
+
+        # Null move pruning: let the other player move twice in a row with a shallower search. If this player's score
+        # is still outside the window, a real move would be too, so the node is cut off without searching any moves.
+        # Passing is only a safe guess when there are plenty of moves, and two null moves in a row prove nothing.
+        if self._null_move and not self._in_null_move and depth >= self.NULL_MOVE_MIN_DEPTH \
+                and state_space_gen._has_moves(self.NULL_MOVE_MIN_MOVES):
+            next_team = PieceType.BLACK if team == PieceType.WHITE else PieceType.WHITE
+            # The reduction can take the search past the leaves if the settings are lowered, so stop at a leaf
+            null_depth = max(0, depth - 1 - self.NULL_MOVE_REDUCTION)
+            self._in_null_move = True
+            try:
+                if team == self._player_type:
+                    null_eval = self.minimax(board, null_depth, beta - 1, beta, next_team, ply + 1)
+                else:
+                    null_eval = self.minimax(board, null_depth, alpha, alpha + 1, next_team, ply + 1)
+            finally:
+                self._in_null_move = False
+
+            if team == self._player_type and null_eval >= beta:
+                transposition_table.store(transposition_key, depth, LOWER_BOUND, null_eval)
+                if self._trace is not None:
+                    self._trace.record(ply, depth, NO_MOVE, alpha, beta, null_eval, CUTOFF_NULL_MOVE)
+                return null_eval
+            if team != self._player_type and null_eval <= alpha:
+                transposition_table.store(transposition_key, depth, UPPER_BOUND, null_eval)
+                if self._trace is not None:
+                    self._trace.record(ply, depth, NO_MOVE, alpha, beta, null_eval, CUTOFF_NULL_MOVE)
+                return null_eval
+
+        # Late move reductions: quiet moves ordered late are unlikely to be best, so they are searched less deep first
+        # and only searched to the full depth if that finds they might be better
+        late_move_reductions = self._late_move_reductions and depth >= self.LATE_MOVE_MIN_DEPTH
+        # Stop a reduced search at a leaf if the settings are lowered, like the null move depth above
+        reduced_depth = max(0, depth - 1 - self.LATE_MOVE_REDUCTION)
 
         # If player to move is MAX
         if team == self._player_type:
             # Variable to store the best possible score for this Node
-            max_eval = StateSpaceGenerator.MIN
+            best_eval = StateSpaceGenerator.MIN
+            # The team to move after MAX
+            next_team = PieceType.BLACK if team == PieceType.WHITE else PieceType.WHITE
 
             # Loop through all legal moves in the resulting state and find the
             # best move by recursively calling minimax
-            for move in all_legal_moves:
-                # Create a board object to create child node
-                max_board = StateSpaceGenerator.build_board(state_space_gen)
+            for move_number, move in enumerate(all_legal_moves):
+                # Move the piece on the board to get to the child node
+                undo_record = board.make_index_move(*MOVE_TABLE[move])
+
+                # Search late quiet moves with a reduced depth and a null window first
+                full_depth_search = True
+                if late_move_reductions and move_number >= self.LATE_MOVE_MIN_NUMBER \
+                        and move not in sumito_moves and move != killers[0] and move != killers[1]:
+                    eval = self.minimax(board, reduced_depth, alpha, alpha + 1, next_team, ply + 1)
+                    full_depth_search = eval > alpha
+
+                # Find the minimax score for resulting board state. With principal variation search, moves after the
+                # first are only searched fully if a null window search finds they might be better.
+                if full_depth_search:
+                    if principal_variation and move_number > 0:
+                        eval = self.minimax(board, depth - 1, alpha, alpha + 1, next_team, ply + 1)
+                        if alpha < eval < beta:
+                            eval = self.minimax(board, depth - 1, alpha, beta, next_team, ply + 1)
+                    else:
+                        eval = self.minimax(board, depth - 1, alpha, beta, next_team, ply + 1)
 
-                # Create a list for pieces to be moved in this move notation
-                pieces_to_move = []
-                # Get move direction as local variable
-                move_enum = move[len(move) - 1]
+                # Move the piece back to return to this node
+                board.unmake_move(undo_record)
 
-                # Get all the pieces to be moved (exclude the move direction enum)
-                for i in range(len(move) - 1):
-                    pieces_to_move.append(move[i])
+                # Set best to eval if it is greater
+                if eval > best_eval:
+                    best_eval = eval
+                    best_move = move
 
-                # Move the piece
-                max_board.move_piece(move_enum, pieces_to_move)
+                # A score inside the window makes the move's line this node's principal variation
+                if eval > alpha:
+                    pv_table[ply] = (move,) + pv_table[ply + 1]
 
-                board_configuration = StateSpaceGenerator.generate_board_configuration(max_board)
+                # Alpha-Beta pruning
+                alpha = max(alpha, eval)
+                if beta <= alpha:
+                    self._record_cutoff(move, depth, sumito_moves, killers, history)
+                    break
+        # If player is MIN
+        else:
+            best_eval = StateSpaceGenerator.MAX
+
+            for move_number, move in enumerate(all_legal_moves):
+                # Move the piece on the board to get to the child node
+                undo_record = board.make_index_move(*MOVE_TABLE[move])
+
+                # Search late quiet moves with a reduced depth and a null window first, see above
+                full_depth_search = True
+                if late_move_reductions and move_number >= self.LATE_MOVE_MIN_NUMBER \
+                        and move not in sumito_moves and move != killers[0] and move != killers[1]:
+                    eval = self.minimax(board, reduced_depth, beta - 1, beta, self._player_type, ply + 1)
+                    full_depth_search = eval < beta
+
+                # Find the minimax score for resulting board state, see above
+                if full_depth_search:
+                    if principal_variation and move_number > 0:
+                        eval = self.minimax(board, depth - 1, beta - 1, beta, self._player_type, ply + 1)
+                        if alpha < eval < beta:
+                            eval = self.minimax(board, depth - 1, alpha, beta, self._player_type, ply + 1)
+                    else:
+                        eval = self.minimax(board, depth - 1, alpha, beta, self._player_type, ply + 1)
 
-                if self._player_type == PieceType.WHITE:
-                    transposition_key = 'w ' + board_configuration
-                else:
-                    transposition_key = 'b ' + board_configuration
+                # Move the piece back to return to this node
+                board.unmake_move(undo_record)
 
-                # Check if this state exists in Transposition table
-                if transposition_key in StateSpaceGenerator.TRANSPOSITION_TABLE:
-                    eval = StateSpaceGenerator.TRANSPOSITION_TABLE.get(transposition_key)
+                # Set best to eval if lesser
+                if eval < best_eval:
+                    best_eval = eval
+                    best_move = move
 
-                    max_eval = max(max_eval, eval)
+                # A score inside the window makes the move's line this node's principal variation
+                if eval < beta:
+                    pv_table[ply] = (move,) + pv_table[ply + 1]
 
-                    # Alpha-Beta pruning
-                    alpha = max(alpha, eval)
-                    if beta <= alpha:
-                        break
-                else:
-                    # Find the minimax score for resulting board state
-                    if self._player_type == PieceType.WHITE:
-                        eval = self.minimax(max_board, depth - 1, alpha, beta, PieceType.BLACK)
-                    else:
-                        eval = self.minimax(max_board, depth - 1, alpha, beta, PieceType.WHITE)
+                # Alpha-Beta pruning
+                beta = min(beta, eval)
+                if beta <= alpha:
+                    self._record_cutoff(move, depth, sumito_moves, killers, history)
+                    break
 
-                    # Add heuristic score to transposition table
-                    StateSpaceGenerator.TRANSPOSITION_TABLE[transposition_key] = eval
+        # A score at or below alpha means no move was good enough for MAX, so the real score could be even lower.
+        # A score at or above beta means the search was cut off, so the real score could be even higher.
+        if best_eval <= original_alpha:
+            bound = UPPER_BOUND
+        elif best_eval >= original_beta:
+            bound = LOWER_BOUND
+        else:
+            bound = EXACT
+        transposition_table.store(transposition_key, depth, bound, best_eval, best_move)
 
-                    # Set best to eval if it is greater
-                    max_eval = max(max_eval, eval)
+        if self._trace is not None:
+            self._trace.record(ply, depth, best_move, original_alpha, original_beta, best_eval,
+                               CUTOFF_ALPHA_BETA if beta <= alpha else None)
+        return best_eval
 
-                    # Alpha-Beta pruning
-                    alpha = max(alpha, eval)
-                    if beta <= alpha:
-                        break
+    def quiescence(self, board, alpha, beta, team):
+        """
+        Searches only sumito moves from a board at the end of the minimax search, until no sumitos are left, so that a
+        board is never scored in the middle of pushing marbles off.
 
-            return max_eval
+        The player to move can always choose not to sumito, so the board's own score (the stand pat score) is a bound
+        on its score and can cut the search off straight away. The search also stops extending once it has visited
+        QUIESCENCE_NODE_LIMIT nodes below the minimax leaf it started from.
+        :param board: a Board representing the current board state
+        :param alpha: an int representing the best score MAX can guarantee
+        :param beta: an int representing the best score MIN can guarantee
+        :param team: a PieceType enum representing the player to move
+        :return: an int representing the score of the board.
+        """
+        # Check the limits, see minimax()
+        self._nodes_searched += 1
+        if self._nodes_searched == self._node_limit \
+                or self._nodes_searched % self._check_interval == 0 and self._limit_reached():
+            raise SearchTimeoutException()
+
+        stand_pat = self.evaluate(board, self._player_type)
+
+        # Stop extending once the node limit for this leaf is used up
+        self._quiescence_nodes += 1
+        if self._quiescence_nodes > StateSpaceGenerator.QUIESCENCE_NODE_LIMIT:
+            return stand_pat
+
+        # If player to move is MAX
+        if team == self._player_type:
+            if stand_pat >= beta:
+                return stand_pat
+            alpha = max(alpha, stand_pat)
+            best_eval = stand_pat
+            next_team = PieceType.BLACK if team == PieceType.WHITE else PieceType.WHITE
+
+            for move in self.build_state_space_generator(board, team).generate_sumito_move_codes():
+                undo_record = board.make_index_move(*MOVE_TABLE[move])
+                eval = self.quiescence(board, alpha, beta, next_team)
+                board.unmake_move(undo_record)
+
+                best_eval = max(best_eval, eval)
+                alpha = max(alpha, eval)
+                if beta <= alpha:
+                    break
         # If player is MIN
         else:
-            minEval = StateSpaceGenerator.MAX
+            if stand_pat <= alpha:
+                return stand_pat
+            beta = min(beta, stand_pat)
+            best_eval = stand_pat
+
+            for move in self.build_state_space_generator(board, team).generate_sumito_move_codes():
+                undo_record = board.make_index_move(*MOVE_TABLE[move])
+                eval = self.quiescence(board, alpha, beta, self._player_type)
+                board.unmake_move(undo_record)
+
+                best_eval = min(best_eval, eval)
+                beta = min(beta, eval)
+                if beta <= alpha:
+                    break
 
-            for move in all_legal_moves:
-                # Create a board object to create child node
-                min_board = StateSpaceGenerator.build_board(state_space_gen)
+        return best_eval
 
-                # Create a list for pieces to be moved in this move notation
-                pieces_to_move = []
-                # Get move direction as local variable
-                move_enum = move[len(move) - 1]
+    def _limit_reached(self):
+        """
+        Checks if the search has to stop: its deadline would pass before the next check or its stop flag is set.
+        The node limit is checked by the nodes themselves, see minimax().
 
-                # Get all the pieces to be moved (exclude the move direction enum)
-                for i in range(len(move) - 1):
-                    pieces_to_move.append(move[i])
+        The next check is expected to take as long as the longest time between two checks so far, so a slow node
+        stops the search before it would run past the deadline.
+        :return: a bool
+        """
+        if self._deadline is not None:
+            now = time.time()
+            if self._last_check is not None:
+                self._longest_check = max(self._longest_check, now - self._last_check)
+            self._last_check = now
+            if now + self._longest_check >= self._deadline:
+                return True
+        # The stop flag is checked whatever the limits, so a search limited only by depth can still be stopped
+        return self._stop_flag is not None and self._stop_flag.value
 
-                # Move the piece
-                min_board.move_piece(move_enum, pieces_to_move)
+    @staticmethod
+    def time_buffer(time_given):
+        """
+        Finds the seconds to take off the time given to a search, see TIME_BUFFER.
+        :param time_given: the number of seconds given to search as a number
+        :return: a float
+        """
+        return min(StateSpaceGenerator.TIME_BUFFER, time_given * StateSpaceGenerator.TIME_BUFFER_FRACTION)
 
-                board_configuration = StateSpaceGenerator.generate_board_configuration(min_board)
+    @property
+    def quiescence_enabled(self):
+        """
+        Property to get whether minimax ends with a quiescence search over sumitos
+        :return: a bool
+        """
+        return self._quiescence
 
-                if self._player_type == PieceType.WHITE:
-                    transposition_key = 'b ' + board_configuration
-                else:
-                    transposition_key = 'w ' + board_configuration
+    @quiescence_enabled.setter
+    def quiescence_enabled(self, enabled):
+        """
+        Property to set whether minimax ends with a quiescence search over sumitos
+        :param enabled: a bool
+        """
+        self._quiescence = enabled
 
-                # Check if this state exists in Transposition table
-                if transposition_key in StateSpaceGenerator.TRANSPOSITION_TABLE:
-                    eval = StateSpaceGenerator.TRANSPOSITION_TABLE.get(transposition_key)
+    @property
+    def null_move_enabled(self):
+        """
+        Property to get whether minimax prunes with null moves
+        :return: a bool
+        """
+        return self._null_move
 
-                    minEval = min(minEval, eval)
+    @null_move_enabled.setter
+    def null_move_enabled(self, enabled):
+        """
+        Property to set whether minimax prunes with null moves, see NULL_MOVE_REDUCTION for its settings
+        :param enabled: a bool
+        """
+        self._null_move = enabled
 
-                    # Alpha-Beta pruning
-                    beta = min(beta, eval)
-                    if beta <= alpha:
-                        break
-                else:
-                    # Find the minimax score for resulting board state
-                    if self._player_type == PieceType.WHITE:
-                        eval = self.minimax(min_board, depth - 1, alpha, beta, PieceType.WHITE)
-                    else:
-                        eval = self.minimax(min_board, depth - 1, alpha, beta, PieceType.BLACK)
+    @property
+    def late_move_reductions_enabled(self):
+        """
+        Property to get whether minimax reduces the depth of late quiet moves
+        :return: a bool
+        """
+        return self._late_move_reductions
 
-                    # Add heuristic score to transposition table
-                    StateSpaceGenerator.TRANSPOSITION_TABLE[transposition_key] = eval
+    @late_move_reductions_enabled.setter
+    def late_move_reductions_enabled(self, enabled):
+        """
+        Property to set whether minimax reduces the depth of late quiet moves, see LATE_MOVE_REDUCTION for its settings
+        :param enabled: a bool
+        """
+        self._late_move_reductions = enabled
 
-                    # Set minEval to eval if lesser
-                    minEval = min(minEval, eval)
+    @property
+    def trace(self):
+        """
+        Property to get the SearchTrace recording every node searched
+        :return: a SearchTrace, None if searches are not traced
+        """
+        return self._trace
 
-                    # Alpha-Beta pruning
-                    beta = min(beta, eval)
-                    if beta <= alpha:
-                        break
+    @trace.setter
+    def trace(self, search_trace):
+        """
+        Property to set the SearchTrace recording every node searched. The caller closes it once done.
+        :param search_trace: a SearchTrace, None to stop tracing
+        """
+        self._trace = search_trace
 
-            return minEval
+    @property
+    def best_line(self):
+        """
+        Property to get the principal variation of the last search, the line of play it expects from the root
+        :return: a List of Move Notations starting with the best move
+        """
+        return [decode_to_notation(move) for move in self._best_line]
+
+    def _start_iteration(self, iteration_depth):
+        """
+        Sets up an iteration of iterative deepening that searches to the depth given below the root moves.
+        :param iteration_depth: the depth to search below each root move as an int
+        """
+        # Root moves are at ply 0, so the nodes below them are one ply deeper
+        self._search_depth = iteration_depth + 1
+        # Every ply takes at least one off the depth left, so no node is further from the root than the search depth
+        self._pv_table = [()] * (self._search_depth + 1)
+
+    def _transposition_key(self, board, team):
+        """
+        Finds the key minimax() stores a board under in the transposition table. Scores depend on the team they are
+        for and on whether the leaves were scored with a quiescence search, so both are combined into the key.
+        :param board: a Board representing the board state
+        :param team: a PieceType enum representing the player to move
+        :return: the key as an int
+        """
+        transposition_key = board.get_transposition_key(team)
+        if self._player_type is PieceType.WHITE:
+            transposition_key ^= WHITE_SCORES_KEY
+        if not self._quiescence:
+            transposition_key ^= NO_QUIESCENCE_KEY
+        return transposition_key
+
+    def _extend_line(self, board, line, length):
+        """
+        Extends a principal variation that stops short of the depth searched by following the best moves stored in
+        the transposition table. The triangular table loses the rest of a line at a node cut off by the
+        transposition table, as no moves were searched there. Each stored move is checked to be legal, and the line
+        stops before a board it has already reached.
+        :param board: a Board representing the root board state, left unchanged once done
+        :param line: a Tuple of the move codes of the principal variation, starting with the root move
+        :param length: the number of moves the line should have as an int, one more than the depth searched
+        :return: a Tuple of the move codes of the line
+        """
+        if len(line) >= length:
+            return line
+
+        # Play the line out, remembering every board reached with the team to move
+        team = self._player_type
+        seen = {board.get_transposition_key(team)}
+        undo_records = []
+        for move in line:
+            undo_records.append(board.make_index_move(*MOVE_TABLE[move]))
+            team = PieceType.BLACK if team == PieceType.WHITE else PieceType.WHITE
+            seen.add(board.get_transposition_key(team))
+
+        extended_line = list(line)
+        while len(extended_line) < length:
+            entry = StateSpaceGenerator.TRANSPOSITION_TABLE.probe(self._transposition_key(board, team))
+            if entry is None or entry[3] == NO_MOVE \
+                    or not self.build_state_space_generator(board, team)._check_move_code(entry[3])[0]:
+                break
+
+            undo_record = board.make_index_move(*MOVE_TABLE[entry[3]])
+            team = PieceType.BLACK if team == PieceType.WHITE else PieceType.WHITE
+            if board.get_transposition_key(team) in seen:
+                board.unmake_move(undo_record)
+                break
+            seen.add(board.get_transposition_key(team))
+            undo_records.append(undo_record)
+            extended_line.append(entry[3])
+
+        for undo_record in reversed(undo_records):
+            board.unmake_move(undo_record)
+        return tuple(extended_line)
+
+    def _generate_ordered_move_codes(self, transposition_move, killers, history, sumito_moves):
+        """
+        A generator method which yields the legal moves in the order minimax searches them: the transposition table
+        move, then sumitos, then the killer moves of the ply, then every other move from the highest history score
+        down. Moves with the same history score keep the order they were generated in.
+
+        Each stage is only generated once the search reaches it. The quiet moves are only generated and sorted once
+        the transposition table move, the sumitos and the killers have all failed to cause a cut-off.
+        :param transposition_move: the best move code stored in the transposition table, NO_MOVE if there is none
+        :param killers: a List of the two killer move codes of the ply
+        :param history: an array('L') of history scores indexed by move code
+        :param sumito_moves: a set the sumito move codes are added to as they are found, for minimax to tell them
+                             apart from quiet moves
+        :return: an int move code for each legal move
+        """
+        # Stage 1: the transposition table move. It could be from another board with the same key, so check it is
+        # legal.
+        if transposition_move != NO_MOVE:
+            legal, sumito = self._check_move_code(transposition_move)
+            if not legal:
+                transposition_move = NO_MOVE
+            else:
+                if sumito:
+                    sumito_moves.add(transposition_move)
+                yield transposition_move
+
+        # Groups are needed to find sumitos, so they are found up front
+        three_marble_groups = self.find_triple_pieces()
+        two_marble_groups = self.find_double_pieces()
+
+        # Stage 2: sumitos, those that push a marble off first
+        for group, direction_index in self._generate_sumito_groups(three_marble_groups + two_marble_groups):
+            move = StateSpaceGenerator._encode_group(group, direction_index)
+            sumito_moves.add(move)
+            if move != transposition_move:
+                yield move
+
+        # Stage 3: killer moves that are legal quiet moves on this board
+        searched_killers = []
+        for killer in killers:
+            if killer != NO_MOVE and killer != transposition_move and killer not in sumito_moves \
+                    and killer not in searched_killers and self._check_move_code(killer)[0]:
+                searched_killers.append(killer)
+                yield killer
+
+        # Stage 4: every other move, by history score
+        quiet_moves = [StateSpaceGenerator._encode_group(group, direction_index) for group, direction_index
+                       in self._generate_quiet_groups(three_marble_groups, two_marble_groups)]
+        quiet_moves = [move for move in quiet_moves if move != transposition_move and move not in searched_killers]
+        quiet_moves.sort(key=history.__getitem__, reverse=True)
+        yield from quiet_moves
+
+    def _check_move_code(self, move):
+        """
+        Checks if a move code is a legal move for the player acting, without generating any other moves.
+        :param move: the move code as an int
+        :return: a Tuple of whether the move is legal and whether it is a sumito, as bools
+        """
+        move_info = MOVE_TABLE[move]
+        if move_info is None:
+            return False, False
+        direction, indices = move_info
+
+        occupancy = self._occupancy
+        for index in indices:
+            if occupancy.get(index) is not self._player_type:
+                return False, False
+        pieces = tuple(index + (self._player_type,) for index in indices)
+
+        if len(pieces) == 1:
+            return self._validate_one_marble_move(direction, pieces[0]), False
+        if StateSpaceGenerator._is_inline(pieces[0], pieces[1], direction):
+            if self._is_empty(pieces, direction):
+                return True, False
+            sumito = self._is_sumito(pieces, direction)
+            return sumito, sumito
+        return self._check_valid_sidestep(pieces, direction), False
+
+    def _has_moves(self, count):
+        """
+        Checks if there are at least count legal moves, generating only as many moves as needed to tell.
+        :param count: the number of moves as an int
+        :return: a bool
+        """
+        return next(itertools.islice(self.generate_staged_move_codes(), count - 1, None), None) is not None
+
+    def _record_cutoff(self, move, depth, sumito_moves, killers, history):
+        """
+        Records a move that caused an alpha-beta cut-off, so it is searched earlier in other nodes. Sumitos are already
+        searched early, so only other moves become killers and gain history.
+        :param move: the move code that caused the cut-off
+        :param depth: the depth left to search below the node as an int
+        :param sumito_moves: a set of the sumito move codes of the node
+        :param killers: a List of the two killer move codes of the node's ply
+        :param history: an array('L') of history scores indexed by move code, for the team that moved
+        """
+        if move in sumito_moves:
+            return
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+        history[move] += depth * depth
+
+    def _reset_move_ordering(self):
+        """
+        Clears the killer moves and history scores, to start a new search.
+        """
+        # Two killer move codes for each ply from the root
+        self._killers = {}
+        # History scores of each move code, one array for each team indexed by PieceType value (False is black)
+        self._history = [array('L', [0]) * MOVE_CODE_LIMIT, array('L', [0]) * MOVE_CODE_LIMIT]
 
     def generate_all_legal_moves(self):
         """
@@ -997,6 +1392,134 @@ class StateSpaceGenerator:
 
         return all_moves
 
+    def generate_staged_moves(self):
+        """
+        A generator method which yields the legal next ply moves of the current board configuration in stages,
+        so moves are only generated when they are needed. A search that prunes on an early move never pays to
+        generate the rest.
+
+        Moves are yielded in the order: sumito moves that push a marble off the board, the other sumito moves,
+        inline three marble moves and lastly all other moves.
+        :return: a Tuple in move notation for each legal move
+        """
+        for group, direction_index in self._generate_staged_groups():
+            yield StateSpaceGenerator._group_to_positions(group) + (MOVE_DIRECTIONS[direction_index],)
+
+    def generate_staged_move_codes(self):
+        """
+        Works like generate_staged_moves(), but yields each move packed into an int, see moveencoding.
+        :return: an int move code for each legal move
+        """
+        for group, direction_index in self._generate_staged_groups():
+            yield StateSpaceGenerator._encode_group(group, direction_index)
+
+    def generate_move_codes(self):
+        """
+        Generates all legal next ply moves of the current board configuration as move codes, in the same order as
+        generate_staged_moves().
+        :return: an array('H') of move codes
+        """
+        return create_move_list(self.generate_staged_move_codes())
+
+    def _generate_staged_groups(self):
+        """
+        A generator method which yields the pieces and direction of each legal move in the stages described in
+        generate_staged_moves().
+        :return: a Tuple of the group of pieces to move (in order along their line) and the position of the move
+                 direction in MOVE_DIRECTIONS
+        """
+        # Groups are needed to find sumitos, so they are found up front
+        three_marble_groups = self.find_triple_pieces()
+        two_marble_groups = self.find_double_pieces()
+
+        # Stage 1 and 2: sumitos
+        yield from self._generate_sumito_groups(three_marble_groups + two_marble_groups)
+
+        # Stage 3 and 4: every other move
+        yield from self._generate_quiet_groups(three_marble_groups, two_marble_groups)
+
+    def _generate_quiet_groups(self, three_marble_groups, two_marble_groups):
+        """
+        A generator method which yields the pieces and direction of each legal move that is not a sumito, in stages 3
+        and 4 of generate_staged_moves().
+        :param three_marble_groups: a List of the groups of three pieces of the player acting
+        :param two_marble_groups: a List of the groups of two pieces of the player acting
+        :return: a Tuple of the group of pieces to move (in order along their line) and the position of the move
+                 direction in MOVE_DIRECTIONS
+        """
+        # Stage 3: inline three marble moves into an empty space
+        for group in three_marble_groups:
+            for direction_index, move in enumerate(MOVE_DIRECTIONS):
+                if StateSpaceGenerator._is_inline(group[0], group[1], move) and self._is_empty(group, move):
+                    yield group, direction_index
+
+        # Stage 4: three marble sidesteps, single marble moves, then two marble inline moves and sidesteps
+        for group in three_marble_groups:
+            for direction_index, move in enumerate(MOVE_DIRECTIONS):
+                if not StateSpaceGenerator._is_inline(group[0], group[1], move) \
+                        and self._check_valid_sidestep(group, move):
+                    yield group, direction_index
+
+        for piece in self._ally_pieces:
+            for direction_index, move in enumerate(MOVE_DIRECTIONS):
+                if self._validate_one_marble_move(move, piece):
+                    yield (piece,), direction_index
+
+        for group in two_marble_groups:
+            for direction_index, move in enumerate(MOVE_DIRECTIONS):
+                if StateSpaceGenerator._is_inline(group[0], group[1], move):
+                    if self._is_empty(group, move):
+                        yield group, direction_index
+                elif self._check_valid_sidestep(group, move):
+                    yield group, direction_index
+
+    def generate_sumito_move_codes(self):
+        """
+        A generator method which yields only the sumito moves of the current board configuration, those that push
+        a marble off the board first.
+        :return: an int move code for each legal sumito move
+        """
+        for group, direction_index in self._generate_sumito_groups(self.find_triple_pieces()
+                                                                   + self.find_double_pieces()):
+            yield StateSpaceGenerator._encode_group(group, direction_index)
+
+    def _generate_sumito_groups(self, groups):
+        """
+        A generator method which yields the pieces and direction of each sumito move, yielding the ones that push a
+        marble off the board straight away and the rest after.
+        :param groups: a List of groups of two or three pieces
+        :return: a Tuple of the group of pieces to move and the position of the move direction in MOVE_DIRECTIONS
+        """
+        other_sumito_moves = []
+        for group in groups:
+            for direction_index, move in enumerate(MOVE_DIRECTIONS):
+                if StateSpaceGenerator._is_inline(group[0], group[1], move) and self._is_sumito(group, move):
+                    self._num_sumito += 1
+                    if self._is_push_off(group, move):
+                        yield group, direction_index
+                    else:
+                        other_sumito_moves.append((group, direction_index))
+        yield from other_sumito_moves
+
+    @staticmethod
+    def _encode_group(group, direction_index):
+        """
+        Packs a group of pieces and a move direction into a move code.
+        :param group: a Tuple of pieces, in order along their line
+        :param direction_index: the position of the move direction in MOVE_DIRECTIONS as an int
+        :return: the move code as an int
+        """
+        return encode_cells([ROW_OFFSETS[piece[0]] + piece[1] for piece in group], direction_index)
+
+    @staticmethod
+    def _group_to_positions(group):
+        """
+        Converts a group of pieces to board positions (e.g A1)
+        :param group: a Tuple of pieces
+        :return: a Tuple of board positions
+        """
+        return tuple(Board.index_to_position(piece) for piece in group)
+
     def generate_three_piece_moves(self):
         """
         Generates a List of legal moves for three piece marble combinations only.
@@ -1008,64 +1531,600 @@ class StateSpaceGenerator:
         three_marble_moves = self.find_three_piece_moves(three_marble_combos)
         return three_marble_moves
 
-    def find_best_move(self, depth, time_given):
+    def find_best_move(self, depth, time_given, search_mode=SearchMode.MINIMAX, node_limit=None, latency=None):
         """
         Finds the best move for the given board state and team acting.
-        :param depth: the depth to search the tree as an int
-        :param time_given: int representing the number of seconds given to search for move
-        :return: a Move Notation representing the best move
+
+        Searches with iterative deepening, one iteration for each depth from 0 up to the depth given, until one of
+        the limits given is reached. The limits are checked inside minimax, and the best move of the last iteration
+        to complete is returned, or the first move generated if none completed. The best move of each iteration is
+        searched first in the next one.
+
+        A node limit stops the search at the same node however busy the machine is, so the move found is always the
+        same. The transposition table is cleared first, so entries from earlier searches do not change the result.
+        A latency target checks the time at every node, for searches that must return within milliseconds. The
+        setup of the search counts against it too.
+        The BITBOARD search mode runs the iterations with minimax_bitboard() instead of minimax().
+        Throws an InvalidParameterException if no limit is given or the node limit is less than 1.
+        :param depth: the maximum depth to search the tree as an int, None for no depth limit
+        :param time_given: int representing the number of seconds given to search for move, None for no time limit
+        :param search_mode: a SearchMode enum for the search algorithm to use
+        :param node_limit: the most nodes to search as an int, None for no node limit
+        :param latency: the most milliseconds to search for as a number, None for no latency target
+        :return: a Move Notation representing the best move, its principal variation is kept as best_line
         """
 
         # Start time
         start_time = time.time()
-        # Take 0.5 seconds off of time given for buffer
-        safe_time_given = time_given - 0.5
 
-        # Generate a state space generator
-        all_legal_moves = self.generate_all_legal_moves()
+        # Generate the root moves once, they are searched again in every iteration
+        root_moves = self._prepare_search(start_time, depth, time_given, search_mode, node_limit, latency)
+        if not root_moves:
+            return None
 
-        # Initiate best heuristic score as MIN, and best move as None
-        best_value = StateSpaceGenerator.MIN
-        best_move = None
+        # Build the board once, every root move is made and unmade on it
+        board = StateSpaceGenerator.build_board(self)
+        iteration_depths = itertools.count() if depth is None else range(depth + 1)
+        if search_mode == SearchMode.BITBOARD:
+            best_move, best_value, completed_depth = self._iterative_deepening_bitboard(
+                BitBoard.from_board(board), iteration_depths, start_time)
+        else:
+            best_move, best_value, completed_depth = self._iterative_deepening(board, root_moves, iteration_depths,
+                                                                               start_time)
+
+        # Convert the best move code back to move notation for the GUI
+        if best_move is not None:
+            best_move = decode_to_notation(best_move)
 
-        for move in all_legal_moves:
-            move_board = StateSpaceGenerator.build_board(self)
+        print(f"The best move is {best_move} at a value of {best_value} ({search_mode.name}, "
+              f"{self._nodes_searched} nodes)")
+        print(f"Principal variation: {self.best_line}")
+        return best_move
+
+    def _prepare_search(self, start_time, depth, time_given, search_mode, node_limit, latency):
+        """
+        Sets up the limits and settings of a search started by find_best_move() or find_best_moves().
+        Throws an InvalidParameterException if no limit is given or the node limit is less than 1.
+        :param start_time: the time (from time.time()) the search started
+        :param depth: the maximum depth to search the tree as an int, None for no depth limit
+        :param time_given: int representing the number of seconds given to search for move, None for no time limit
+        :param search_mode: a SearchMode enum for the search algorithm to use
+        :param node_limit: the most nodes to search as an int, None for no node limit
+        :param latency: the most milliseconds to search for as a number, None for no latency target
+        :return: a List of the root move codes, in the order of generate_staged_moves()
+        """
+        if depth is None and time_given is None and node_limit is None and latency is None:
+            raise InvalidParameterException("A search needs a depth, time, node or latency limit")
+        if node_limit is not None and node_limit < 1:
+            raise InvalidParameterException(f"A node limit must be at least 1, not {node_limit}")
+
+        # Stop by the earlier of the deadlines, leaving a buffer for the caller
+        self._deadline = None
+        self._check_interval = StateSpaceGenerator.DEADLINE_CHECK_INTERVAL
+        if time_given is not None:
+            self._deadline = start_time + time_given - StateSpaceGenerator.time_buffer(time_given)
+        if latency is not None:
+            latency_deadline = start_time + latency / 1000 - StateSpaceGenerator.time_buffer(latency / 1000)
+            self._deadline = latency_deadline if self._deadline is None else min(self._deadline, latency_deadline)
+            self._check_interval = StateSpaceGenerator.LATENCY_CHECK_INTERVAL
+        self._last_check = None
+        self._longest_check = 0.0
+        self._node_limit = node_limit
+        self._nodes_searched = 0
+        self._best_line = ()
+        self._principal_variation = search_mode == SearchMode.PRINCIPAL_VARIATION
+        # A node limited search starts from an empty table, so the same search always finds the same move
+        if node_limit is not None:
+            StateSpaceGenerator.TRANSPOSITION_TABLE.clear()
+        else:
+            StateSpaceGenerator.TRANSPOSITION_TABLE.new_search()
 
-            # Create a list for pieces to be moved in this move notation
-            pieces_to_move = []
-            # Get move direction as local variable
-            move_enum = move[len(move) - 1]
+        return list(self.generate_staged_move_codes())
 
-            # Get all the pieces to be moved (exclude the move direction enum)
-            for i in range(len(move) - 1):
-                pieces_to_move.append(move[i])
+    def _iterative_deepening(self, board, root_moves, iteration_depths, start_time, report=True):
+        """
+        Runs the iterations of find_best_move(), one for each depth given, until they run out or the search is
+        stopped by its deadline or stop flag.
+        :param board: a Board representing the root board state
+        :param root_moves: a List of the root move codes, reordered in place with the best move first
+        :param iteration_depths: an iterable of the depths to search below the root moves, in increasing order
+        :param start_time: the time (from time.time()) the search started
+        :param report: True to print the result of each iteration
+        :return: a Tuple of the best move code, its score and the depth of the last iteration to complete (-1 if none)
+        """
+        # Fall back to the first legal move if not even the first iteration completes
+        best_move = root_moves[0]
+        self._best_line = (best_move,)
+        best_value = StateSpaceGenerator.MIN
+        completed_depth = -1
 
+        self._in_null_move = False
+        self._reset_move_ordering()
+        next_team = PieceType.BLACK if self._player_type == PieceType.WHITE else PieceType.WHITE
+
+        try:
+            for iteration_depth in iteration_depths:
+                self._start_iteration(iteration_depth)
+
+                if self._principal_variation and iteration_depth > 0:
+                    # Expect the score to be close to the last iteration's, a narrow window prunes much more
+                    alpha = best_value - StateSpaceGenerator.ASPIRATION_WINDOW
+                    beta = best_value + StateSpaceGenerator.ASPIRATION_WINDOW
+                    iteration_value, iteration_move = self._search_root(board, root_moves, iteration_depth,
+                                                                        alpha, beta, next_team)
+
+                    # The score fell outside the window, so search again with the full window
+                    if iteration_value <= alpha or iteration_value >= beta:
+                        iteration_value, iteration_move = self._search_root(
+                            board, root_moves, iteration_depth, StateSpaceGenerator.MIN, StateSpaceGenerator.MAX,
+                            next_team)
+                else:
+                    iteration_value, iteration_move = self._search_root(
+                        board, root_moves, iteration_depth, StateSpaceGenerator.MIN, StateSpaceGenerator.MAX,
+                        next_team)
+
+                # The iteration completed, so its best move replaces the last one
+                best_move = iteration_move
+                best_value = iteration_value
+                completed_depth = iteration_depth
+                self._best_line = self._extend_line(board, self._pv_table[0], iteration_depth + 1)
+                if self._trace is not None:
+                    self._trace.record_iteration(iteration_depth, best_value, self._best_line, self._nodes_searched)
+                if report:
+                    print(f"Depth {iteration_depth}: {decode_to_notation(best_move)} at a value of {best_value} "
+                          f"({self._nodes_searched} nodes, {time.time() - start_time:.2f}s)")
+
+                # Search the best move first in the next iteration
+                root_moves.remove(best_move)
+                root_moves.insert(0, best_move)
+        except SearchTimeoutException:
+            # Time is up, the iteration that was cut off is thrown away
+            if report:
+                print(f"Stopped search at {time.time() - start_time:.2f}s")
+        finally:
+            self._deadline = None
+            self._node_limit = None
+
+        return best_move, best_value, completed_depth
+
+    def _search_root(self, board, root_moves, depth, alpha, beta, next_team):
+        """
+        Searches every root move for one iteration of find_best_move().
+
+        With minimax every root move is searched with the window given. With principal variation search the window's
+        alpha is raised by each root move searched, and moves after the first are searched with a null window first.
+        :param board: a Board representing the root board state
+        :param root_moves: a List of the root move codes, in the order to search them
+        :param depth: the depth to search below each root move as an int
+        :param alpha: an int representing the lowest score of interest
+        :param beta: an int representing the highest score of interest
+        :param next_team: a PieceType enum representing the player to move after the root
+        :return: a Tuple of the best score and the best move code
+        """
+        best_value = StateSpaceGenerator.MIN
+        best_move = None
+
+        for move_number, move in enumerate(root_moves):
             # Move the piece
-            move_board.move_piece(move_enum, pieces_to_move)
+            undo_record = board.make_index_move(*MOVE_TABLE[move])
 
             # Find minimax value for move
-            if self._player_type == PieceType.WHITE:
-                move_value = self.minimax(move_board, depth, StateSpaceGenerator.MIN, StateSpaceGenerator.MAX, PieceType.BLACK)
+            if self._principal_variation and move_number > 0:
+                move_value = self.minimax(board, depth, alpha, alpha + 1, next_team)
+                if alpha < move_value < beta:
+                    move_value = self.minimax(board, depth, alpha, beta, next_team)
             else:
-                move_value = self.minimax(move_board, depth, StateSpaceGenerator.MIN, StateSpaceGenerator.MAX, PieceType.WHITE)
-            print(move)
-            print(move_value)
+                move_value = self.minimax(board, depth, alpha, beta, next_team)
+
+            # Move the piece back for the next root move
+            board.unmake_move(undo_record)
 
-            # Update best move/value if better than current
-            if move_value > best_value:
+            # Update best move/value if better than current, along with the principal variation
+            if best_move is None or move_value > best_value:
                 best_move = move
                 best_value = move_value
+                self._pv_table[0] = (move,) + self._pv_table[1]
+
+            if self._principal_variation:
+                alpha = max(alpha, move_value)
+                # Only happens with an aspiration window, find_best_move() searches again
+                if alpha >= beta:
+                    break
+
+        return best_value, best_move
+
+    def find_best_moves(self, count, depth, time_given, search_mode=SearchMode.MINIMAX, node_limit=None,
+                        latency=None):
+        """
+        Finds the best few moves for the given board state and team acting, with their scores and principal
+        variations (multi-PV analysis).
+
+        Searches with iterative deepening and the same limits as find_best_move(). Each iteration searches every root
+        move once. Once count moves have been scored, a move is searched with a null window at the lowest of their
+        scores first, and only gets an exact score if it beats it. Every line shares the transposition table, so
+        this costs far less than count separate searches. Each line's principal variation is taken from the search
+        that gave it its exact score.
+        :param count: the number of moves to find as an int
+        :param depth: the maximum depth to search the tree as an int, None for no depth limit
+        :param time_given: int representing the number of seconds given to search for move, None for no time limit
+        :param search_mode: a SearchMode enum for the search algorithm to use
+        :param node_limit: the most nodes to search as an int, None for no node limit
+        :param latency: the most milliseconds to search for as a number, None for no latency target
+        :return: a List of up to count Tuples of a Move Notation, its score and its principal variation as a List of
+                 Move Notations starting with the move, best first
+        """
+        # Start time
+        start_time = time.time()
+
+        root_moves = self._prepare_search(start_time, depth, time_given, search_mode, node_limit, latency)
+        if not root_moves:
+            return []
+
+        # Fall back to the first legal moves if not even the first iteration completes
+        lines = [(StateSpaceGenerator.MIN, move, (move,)) for move in root_moves[:count]]
 
-            # # End time for each loop
-            end_time = time.time()
-            if end_time - start_time >= safe_time_given:
-                # print("Time is up")
-                # print(f"Stopped search at {end_time - start_time}")
+        self._in_null_move = False
+        self._reset_move_ordering()
+        board = StateSpaceGenerator.build_board(self)
+        next_team = PieceType.BLACK if self._player_type == PieceType.WHITE else PieceType.WHITE
+
+        iteration_depths = itertools.count() if depth is None else range(depth + 1)
+        try:
+            for iteration_depth in iteration_depths:
+                self._start_iteration(iteration_depth)
+                lines = self._search_root_lines(board, root_moves, iteration_depth, count, next_team)
+                # Complete any line cut off by the transposition table, see _extend_line()
+                lines = [(value, move, self._extend_line(board, line, iteration_depth + 1))
+                         for value, move, line in lines]
+                print(f"Depth {iteration_depth}: "
+                      + ", ".join(f"{decode_to_notation(move)} at {value}" for value, move, line in lines)
+                      + f" ({self._nodes_searched} nodes, {time.time() - start_time:.2f}s)")
+
+                # Search the lines first in the next iteration, best first
+                line_moves = [move for value, move, line in lines]
+                root_moves[:] = line_moves + [move for move in root_moves if move not in line_moves]
+        except SearchTimeoutException:
+            # Time is up, the iteration that was cut off is thrown away
+            print(f"Stopped search at {time.time() - start_time:.2f}s")
+        finally:
+            self._deadline = None
+            self._node_limit = None
+
+        self._best_line = lines[0][2]
+        analysis = [(decode_to_notation(move), value, [decode_to_notation(line_move) for line_move in line])
+                    for value, move, line in lines]
+        for move, value, principal_variation in analysis:
+            print(f"{value}: {principal_variation}")
+        return analysis
+
+    def _search_root_lines(self, board, root_moves, depth, count, next_team):
+        """
+        Searches every root move for one iteration of find_best_moves(), keeping the best count of them.
+        :param board: a Board representing the root board state
+        :param root_moves: a List of the root move codes, in the order to search them
+        :param depth: the depth to search below each root move as an int
+        :param count: the number of moves to keep as an int
+        :param next_team: a PieceType enum representing the player to move after the root
+        :return: a List of up to count Tuples of the score, move code and principal variation, best first
+        """
+        lines = []
+        for move in root_moves:
+            undo_record = board.make_index_move(*MOVE_TABLE[move])
+
+            if len(lines) == count:
+                # Only a move better than the worst line kept needs an exact score
+                alpha = lines[-1][0]
+                move_value = self.minimax(board, depth, alpha, alpha + 1, next_team)
+                if move_value > alpha:
+                    move_value = self.minimax(board, depth, alpha, StateSpaceGenerator.MAX, next_team)
+            else:
+                move_value = self.minimax(board, depth, StateSpaceGenerator.MIN, StateSpaceGenerator.MAX, next_team)
+
+            board.unmake_move(undo_record)
+
+            if len(lines) < count or move_value > lines[-1][0]:
+                lines.append((move_value, move, (move,) + self._pv_table[1]))
+                # Moves with the same score keep the order they were searched in
+                lines.sort(key=lambda line: line[0], reverse=True)
+                del lines[count:]
+
+        return lines
+
+    def find_best_move_parallel(self, depth, time_given, search_mode=SearchMode.MINIMAX, workers=None):
+        """
+        Finds the best move for the given board state and team acting, searching the root moves in parallel.
+
+        Works like find_best_move() with iterative deepening, but every root move is searched by one of a pool of
+        worker processes. The first root move of each iteration is searched on its own, then the rest are searched
+        at once with the best score found so far shared between the workers as an alpha bound.
+        The pool is kept alive between calls, see shutdown_workers(), and its workers share one transposition table.
+        :param depth: the maximum depth to search the tree as an int, None to keep deepening until time runs out
+        :param time_given: int representing the number of seconds given to search for move
+        :param search_mode: a SearchMode enum for the search algorithm to use, MINIMAX or PRINCIPAL_VARIATION
+        :param workers: the number of worker processes as an int, the number of CPUs if None
+        :return: a Move Notation representing the best move
+        """
+        if search_mode not in (SearchMode.MINIMAX, SearchMode.PRINCIPAL_VARIATION):
+            raise InvalidParameterException(f"{search_mode} can not be searched in parallel")
+        # Start time
+        start_time = time.time()
+        # Take a buffer off of time given, see TIME_BUFFER
+        deadline = start_time + time_given - StateSpaceGenerator.time_buffer(time_given)
+
+        # Generate the root moves once, they are searched again in every iteration
+        root_moves = list(self.generate_staged_move_codes())
+        if not root_moves:
+            return None
+
+        # Fall back to the first legal move if not even the first iteration completes
+        best_move = root_moves[0]
+        best_value = StateSpaceGenerator.MIN
+
+        executor, shared_alpha, stop_flag, shared_table = StateSpaceGenerator._get_workers(workers)
+        shared_table.new_search()
+        board = StateSpaceGenerator.build_board(self)
+        self._principal_variation = search_mode == SearchMode.PRINCIPAL_VARIATION
+        settings = (self._principal_variation, self._quiescence, self._null_move, self._late_move_reductions)
+        self._nodes_searched = 0
+
+        iteration_depths = itertools.count() if depth is None else range(depth + 1)
+        for iteration_depth in iteration_depths:
+            shared_alpha.value = StateSpaceGenerator.MIN
+
+            # Search the first move alone so the other moves have an alpha bound to search with
+            first_future = executor.submit(_search_root_move, board, self._player_type, root_moves[0],
+                                           iteration_depth, deadline, settings)
+            results = [first_future.result()]
+            if results[0][1] is not None:
+                futures = [executor.submit(_search_root_move, board, self._player_type, move, iteration_depth,
+                                           deadline, settings) for move in root_moves[1:]]
+                results.extend(future.result() for future in futures)
+
+            self._nodes_searched += sum(nodes for move, value, nodes in results)
+
+            # A worker ran out of time, so the iteration is thrown away
+            if any(value is None for move, value, nodes in results):
+                print(f"Stopped search at {time.time() - start_time:.2f}s")
                 break
 
-        print(f"The best move is {best_move} at a value of {best_value}")
+            # The first move with the highest score is the best, later moves with the same score may only be bounds
+            iteration_move, iteration_value = results[0][0], results[0][1]
+            for move, value, nodes in results[1:]:
+                if value > iteration_value:
+                    iteration_move, iteration_value = move, value
+
+            # The iteration completed, so its best move replaces the last one
+            best_move = iteration_move
+            best_value = iteration_value
+            print(f"Depth {iteration_depth}: {decode_to_notation(best_move)} at a value of {best_value} "
+                  f"({self._nodes_searched} nodes, {time.time() - start_time:.2f}s)")
+
+            # Search the best move first in the next iteration
+            root_moves.remove(best_move)
+            root_moves.insert(0, best_move)
+
+        best_move = decode_to_notation(best_move)
+        print(f"The best move is {best_move} at a value of {best_value} ({self._nodes_searched} nodes)")
+        return best_move
+
+    def find_best_move_lazy_smp(self, depth, time_given, search_mode=SearchMode.MINIMAX, workers=None):
+        """
+        Finds the best move for the given board state and team acting, with every worker process searching the whole
+        tree at once (Lazy SMP).
+
+        The workers only share a transposition table, so each one uses the scores and best moves the others have
+        found. Worker 0 searches like find_best_move(), the others start one depth deeper every other worker and
+        search the root moves in a rotated order, so they spread out over the tree instead of repeating each other.
+        Once worker 0 finishes the others are stopped. The move of the worker that completed the deepest iteration is
+        returned, preferring the lowest numbered worker.
+        :param depth: the maximum depth to search the tree as an int, None to keep deepening until time runs out
+        :param time_given: int representing the number of seconds given to search for move
+        :param search_mode: a SearchMode enum for the search algorithm to use, MINIMAX or PRINCIPAL_VARIATION
+        :param workers: the number of worker processes as an int, the number of CPUs if None
+        :return: a Move Notation representing the best move
+        """
+        if search_mode not in (SearchMode.MINIMAX, SearchMode.PRINCIPAL_VARIATION):
+            raise InvalidParameterException(f"{search_mode} can not be searched in parallel")
+        # Start time
+        start_time = time.time()
+        # Take a buffer off of time given, see TIME_BUFFER
+        deadline = start_time + time_given - StateSpaceGenerator.time_buffer(time_given)
+
+        root_moves = list(self.generate_staged_move_codes())
+        if not root_moves:
+            return None
+
+        executor, shared_alpha, stop_flag, shared_table = StateSpaceGenerator._get_workers(workers)
+        shared_table.new_search()
+        stop_flag.value = False
+        board = StateSpaceGenerator.build_board(self)
+        self._principal_variation = search_mode == SearchMode.PRINCIPAL_VARIATION
+        settings = (self._principal_variation, self._quiescence, self._null_move, self._late_move_reductions)
+
+        futures = [executor.submit(_lazy_smp_search, board, self._player_type, worker_id, root_moves, depth,
+                                   deadline, settings)
+                   for worker_id in range(StateSpaceGenerator._executor_workers)]
+        # Stop the helpers once the main worker is done, their results are only kept if they got deeper
+        futures[0].result()
+        stop_flag.value = True
+        results = [future.result() for future in futures]
+        stop_flag.value = False
+
+        best_move, best_value, completed_depth, nodes = results[0]
+        for move, value, worker_depth, worker_nodes in results[1:]:
+            if worker_depth > completed_depth:
+                best_move, best_value, completed_depth = move, value, worker_depth
+        self._nodes_searched = sum(result[3] for result in results)
+
+        best_move = decode_to_notation(best_move)
+        print(f"The best move is {best_move} at a value of {best_value} (depth {completed_depth}, "
+              f"{len(results)} workers, {self._nodes_searched} nodes, {time.time() - start_time:.2f}s)")
         return best_move
 
+    @staticmethod
+    def _get_workers(workers):
+        """
+        Gets the pool of worker processes for parallel searches, starting it if there is none with the number of
+        workers asked for. The workers share an alpha bound, a stop flag and a SharedTranspositionTable, which they
+        use in place of TRANSPOSITION_TABLE.
+        :param workers: the number of worker processes as an int, the number of CPUs if None
+        :return: a Tuple of the ProcessPoolExecutor, the shared alpha Value, the stop flag Value and the shared table
+        """
+        workers = workers or os.cpu_count() or 1
+        if StateSpaceGenerator._executor is None or StateSpaceGenerator._executor_workers != workers:
+            StateSpaceGenerator.shutdown_workers()
+            shared_alpha = multiprocessing.Value('i', StateSpaceGenerator.MIN)
+            stop_flag = multiprocessing.Value('b', False, lock=False)
+            shared_table = SharedTranspositionTable()
+            StateSpaceGenerator._executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_search_worker,
+                                                                initargs=(shared_alpha, stop_flag, shared_table))
+            StateSpaceGenerator._executor_workers = workers
+            StateSpaceGenerator._shared_alpha = shared_alpha
+            StateSpaceGenerator._shared_stop_flag = stop_flag
+            StateSpaceGenerator._shared_table = shared_table
+        return StateSpaceGenerator._executor, StateSpaceGenerator._shared_alpha, \
+            StateSpaceGenerator._shared_stop_flag, StateSpaceGenerator._shared_table
+
+    @staticmethod
+    def shutdown_workers():
+        """
+        Stops the pool of worker processes used by parallel searches and frees their shared table, if there is one.
+        """
+        if StateSpaceGenerator._executor is not None:
+            StateSpaceGenerator._shared_stop_flag.value = True
+            StateSpaceGenerator._executor.shutdown(wait=True, cancel_futures=True)
+            StateSpaceGenerator._shared_table.unlink()
+            StateSpaceGenerator._executor = None
+            StateSpaceGenerator._executor_workers = None
+            StateSpaceGenerator._shared_alpha = None
+            StateSpaceGenerator._shared_stop_flag = None
+            StateSpaceGenerator._shared_table = None
+
+    @property
+    def num_sumito(self):
+        """
+        Property to get the number of sumito moves found by the last move generation, they are generated first
+        :return: an int
+        """
+        return self._num_sumito
+
+    @property
+    def nodes_searched(self):
+        """
+        Property to get the number of nodes visited by minimax in the last search
+        :return: an int
+        """
+        return self._nodes_searched
+
+    def minimax_bitboard(self, bitboard, depth, alpha, beta, team):
+        """
+        The minimax function run entirely on bitboards. Works like minimax() with the MINIMAX search mode and no
+        quiescence search, but generates, applies and evaluates moves with a BitBoard, so no Board or
+        StateSpaceGenerator is built for any node. No transposition table or move ordering is used.
+        :param bitboard: a BitBoard representing the current board state
+        :param depth: an int representing the depth to search the tree
+        :param alpha: an int representing the best score MAX can guarantee
+        :param beta: an int representing the best score MIN can guarantee
+        :param team: a PieceType enum representing the player to move
+        :return: an int representing the score of the board.
+        """
+        # Check the limits, see minimax()
+        self._nodes_searched += 1
+        if self._nodes_searched == self._node_limit \
+                or self._nodes_searched % self._check_interval == 0 and self._limit_reached():
+            raise SearchTimeoutException()
+
+        # Terminate if depth limit has been reached
+        if depth <= 0:
+            return bitboard.evaluate(self._player_type)
+
+        next_team = PieceType.BLACK if team == PieceType.WHITE else PieceType.WHITE
+
+        # If player to move is MAX
+        if team == self._player_type:
+            max_eval = StateSpaceGenerator.MIN
+            for move in bitboard.generate_moves(team):
+                eval = self.minimax_bitboard(bitboard.apply_move(move), depth - 1, alpha, beta, next_team)
+                max_eval = max(max_eval, eval)
+
+                # Alpha-Beta pruning
+                alpha = max(alpha, eval)
+                if beta <= alpha:
+                    break
+            return max_eval
+        # If player is MIN
+        else:
+            min_eval = StateSpaceGenerator.MAX
+            for move in bitboard.generate_moves(team):
+                eval = self.minimax_bitboard(bitboard.apply_move(move), depth - 1, alpha, beta, next_team)
+                min_eval = min(min_eval, eval)
+
+                # Alpha-Beta pruning
+                beta = min(beta, eval)
+                if beta <= alpha:
+                    break
+            return min_eval
+
+    def _iterative_deepening_bitboard(self, bitboard, iteration_depths, start_time):
+        """
+        Runs the iterations of find_best_move() for the BITBOARD search mode, like _iterative_deepening() but
+        searching every root move with minimax_bitboard() and the full window.
+        :param bitboard: a BitBoard representing the root board state
+        :param iteration_depths: an iterable of the depths to search below the root moves, in increasing order
+        :param start_time: the time (from time.time()) the search started
+        :return: a Tuple of the best move code, its score and the depth of the last iteration to complete (-1 if none)
+        """
+        root_moves = list(bitboard.generate_moves(self._player_type))
+        next_team = PieceType.BLACK if self._player_type == PieceType.WHITE else PieceType.WHITE
+
+        # Fall back to the first legal move if not even the first iteration completes
+        best_move = root_moves[0]
+        best_value = StateSpaceGenerator.MIN
+        completed_depth = -1
+
+        try:
+            for iteration_depth in iteration_depths:
+                iteration_value = StateSpaceGenerator.MIN
+                iteration_move = None
+                for move in root_moves:
+                    move_value = self.minimax_bitboard(bitboard.apply_move(move), iteration_depth,
+                                                       StateSpaceGenerator.MIN, StateSpaceGenerator.MAX, next_team)
+                    if iteration_move is None or move_value > iteration_value:
+                        iteration_move = move
+                        iteration_value = move_value
+
+                # The iteration completed, so its best move replaces the last one
+                best_move = iteration_move
+                best_value = iteration_value
+                completed_depth = iteration_depth
+                print(f"Depth {iteration_depth}: {BitBoard.move_to_notation(best_move)} at a value of {best_value} "
+                      f"({self._nodes_searched} nodes, {time.time() - start_time:.2f}s)")
+
+                # Search the best move first in the next iteration
+                root_moves.remove(best_move)
+                root_moves.insert(0, best_move)
+        except SearchTimeoutException:
+            # Time is up, the iteration that was cut off is thrown away
+            print(f"Stopped search at {time.time() - start_time:.2f}s")
+        finally:
+            self._deadline = None
+            self._node_limit = None
+
+        # No principal variation is collected on bitboards, so the line is only the best move
+        best_move = encode_notation(BitBoard.move_to_notation(best_move))
+        self._best_line = (best_move,)
+        return best_move, best_value, completed_depth
+
+    def find_best_move_bitboard(self, depth, time_given):
+        """
+        Finds the best move for the given board state and team acting, searching on bitboards.
+        Same as find_best_move() with the BITBOARD search mode.
+        :param depth: the maximum depth to search the tree as an int, None for no depth limit
+        :param time_given: int representing the number of seconds given to search for move, None for no time limit
+        :return: a Move Notation representing the best move
+        """
+        return self.find_best_move(depth, time_given, SearchMode.BITBOARD)
+
     @staticmethod
     def generate_board_configuration(board):
         """
@@ -1118,42 +2177,8 @@ class StateSpaceGenerator:
         :return: The StateSpaceGenerator object built using the board
         """
         state_space_generator = StateSpaceGenerator()
-
-        input_formatted_string = ""
-
-        tiles = board.get_tiles_values()
-
-        y_pos = 0
-        x_pos = 0
-
-        # Construct a string similar to the input file using the board tiles
-        for y in tiles:
-            for x in y:
-                if x is not None:
-                    temp_piece_pos = Board.index_to_position(tuple((y_pos, x_pos)))
-                    temp_piece_team = "w" if x else "b"
-                    input_formatted_string += f"{temp_piece_pos[0]}{temp_piece_pos[1]}{temp_piece_team},"
-
-                x_pos += 1
-
-            x_pos = 0
-            y_pos += 1
-
-        input_formatted_string = input_formatted_string[:-1]
-
-        # Set the player colour to the corresponding Enum
-        state_space_generator._player_type = team
-
-        state_space_generator._board_configuration = input_formatted_string
-        # Uses a generator method to generate all pieces as array
-        # indexes corresponding to our State Representation
-        piece_generator = state_space_generator._piece_generator()
-        state_space_generator._pieces = [piece for piece in piece_generator]
-        # Separate lists for ally and enemy pieces for ease of search
-        state_space_generator._ally_pieces = \
-            [piece for piece in state_space_generator._pieces if piece[2] == state_space_generator._player_type]
-        state_space_generator._enemy_pieces = \
-            [piece for piece in state_space_generator._pieces if piece[2] != state_space_generator._player_type]
+        # Read the tiles directly, no board configuration string is built or parsed
+        state_space_generator.read_board(board, team)
 
         return state_space_generator
 
@@ -1165,32 +2190,7 @@ class StateSpaceGenerator:
             on the board.
         :return: True if in bounds, False otherwise.
         """
-
-        # If x or y is negative it must be out of bounds
-        if piece[0] < 0 or piece[1] < 0:
-            return False
-        elif piece[0] > 8:
-            return False
-
-        # Max x index of E-I is y + 4
-        if piece[0] < 5:
-            if piece[1] > piece[0] + 4:
-                return False
-        # Max x index of the rest hard coded
-        elif piece[0] == 5:
-            if piece[1] > 7:
-                return False
-        elif piece[0] == 6:
-            if piece[1] > 6:
-                return False
-        elif piece[0] == 7:
-            if piece[1] > 5:
-                return False
-        elif piece[0] == 8:
-            if piece[1] > 4:
-                return False
-
-        return True
+        return (piece[0], piece[1]) in CELL_IDS
 
     @staticmethod
     def create_move_list(single_moves, double_moves, triple_moves):
@@ -1217,6 +2217,104 @@ class StateSpaceGenerator:
         return move_list
 
 
+# Stop the pool of a parallel search, if one was started, before the interpreter exits
+atexit.register(StateSpaceGenerator.shutdown_workers)
+
+
+# Alpha bound and stop flag shared by the workers of a parallel search
+_worker_shared_alpha = None
+_worker_stop_flag = None
+
+
+def _init_search_worker(shared_alpha, stop_flag, shared_table):
+    """
+    Sets up a worker process for parallel searches.
+    :param shared_alpha: a multiprocessing Value holding the best root score found so far
+    :param stop_flag: a multiprocessing Value set to stop every worker's search
+    :param shared_table: a SharedTranspositionTable the worker uses in place of its own transposition table
+    """
+    global _worker_shared_alpha, _worker_stop_flag
+    _worker_shared_alpha = shared_alpha
+    _worker_stop_flag = stop_flag
+    StateSpaceGenerator.TRANSPOSITION_TABLE = shared_table
+
+
+def _search_root_move(board, team, move, depth, deadline, settings):
+    """
+    Searches one root move in a worker process for StateSpaceGenerator.find_best_move_parallel().
+
+    The move is searched with a null window at the shared alpha first, and only searched fully if it beats it.
+    :param board: a Board representing the root board state
+    :param team: a PieceType enum representing the team to move at the root
+    :param move: the root move code to search
+    :param depth: the depth to search below the root move as an int
+    :param deadline: the time (from time.time()) the search must stop by
+    :param settings: a Tuple of the principal variation, quiescence, null move and late move reduction flags
+    :return: a Tuple of the move code, its score (None if time ran out) and the number of nodes searched
+    """
+    state_space_gen = StateSpaceGenerator.build_state_space_generator(board, team)
+    state_space_gen._principal_variation, state_space_gen._quiescence, state_space_gen._null_move, \
+        state_space_gen._late_move_reductions = settings
+    state_space_gen._deadline = deadline
+    state_space_gen._start_iteration(depth)
+    next_team = PieceType.BLACK if team == PieceType.WHITE else PieceType.WHITE
+
+    board.make_index_move(*MOVE_TABLE[move])
+    alpha = _worker_shared_alpha.value
+    try:
+        if alpha > StateSpaceGenerator.MIN:
+            value = state_space_gen.minimax(board, depth, alpha, alpha + 1, next_team)
+            if value > alpha:
+                value = state_space_gen.minimax(board, depth, alpha, StateSpaceGenerator.MAX, next_team)
+        else:
+            value = state_space_gen.minimax(board, depth, StateSpaceGenerator.MIN, StateSpaceGenerator.MAX,
+                                            next_team)
+    except SearchTimeoutException:
+        return move, None, state_space_gen.nodes_searched
+
+    # Raise the shared alpha for the other workers
+    with _worker_shared_alpha.get_lock():
+        if value > _worker_shared_alpha.value:
+            _worker_shared_alpha.value = value
+
+    return move, value, state_space_gen.nodes_searched
+
+
+def _lazy_smp_search(board, team, worker_id, root_moves, depth, deadline, settings):
+    """
+    Searches the whole tree in a worker process for StateSpaceGenerator.find_best_move_lazy_smp().
+    :param board: a Board representing the root board state
+    :param team: a PieceType enum representing the team to move at the root
+    :param worker_id: the number of the worker as an int, 0 for the main worker
+    :param root_moves: a List of the root move codes
+    :param depth: the maximum depth to search the tree as an int, None to keep deepening until time runs out
+    :param deadline: the time (from time.time()) the search must stop by
+    :param settings: a Tuple of the principal variation, quiescence, null move and late move reduction flags
+    :return: a Tuple of the best move code, its score, the depth of the last iteration to complete (-1 if none) and
+             the number of nodes searched
+    """
+    state_space_gen = StateSpaceGenerator.build_state_space_generator(board, team)
+    state_space_gen._principal_variation, state_space_gen._quiescence, state_space_gen._null_move, \
+        state_space_gen._late_move_reductions = settings
+    state_space_gen._deadline = deadline
+    # The main worker is stopped by the deadline only
+    if worker_id > 0:
+        state_space_gen._stop_flag = _worker_stop_flag
+
+    # Helpers start on a different root move, and every other helper starts one depth deeper
+    shift = worker_id % len(root_moves)
+    root_moves = root_moves[shift:] + root_moves[:shift]
+    first_depth = worker_id % 2
+    if depth is None:
+        iteration_depths = itertools.count(first_depth)
+    else:
+        iteration_depths = range(min(first_depth, depth), depth + 1)
+
+    best_move, best_value, completed_depth = state_space_gen._iterative_deepening(
+        board, root_moves, iteration_depths, time.time(), report=worker_id == 0)
+    return best_move, best_value, completed_depth, state_space_gen.nodes_searched
+
+
 def read_board_file(file_name):
     """
     Reads the board file in and generates a List of all board configurations.
@@ -1418,3 +2516,15 @@ if __name__ == "__main__":
     # print(board)
 
     best_move = state_space_gen.find_best_move(2, 100)
+
+    # Compare the number of nodes each search mode needs for the same depth
+    for mode in SearchMode:
+        StateSpaceGenerator.TRANSPOSITION_TABLE.clear()
+        state_space_gen.find_best_move(2, 100, mode)
+        print(f"{mode.name}: {state_space_gen.nodes_searched} nodes")
+
+    # A node limit gives the same move every time, a latency target returns within the milliseconds given
+    state_space_gen.find_best_move(None, None, SearchMode.PRINCIPAL_VARIATION, node_limit=5000)
+    start_time = time.time()
+    state_space_gen.find_best_move(None, None, SearchMode.PRINCIPAL_VARIATION, latency=50)
+    print(f"Latency: {(time.time() - start_time) * 1000:.1f}ms")
@@ -0,0 +1,274 @@
+from array import array
+from multiprocessing import shared_memory
+import random
+
+
+# Bound flags, telling how the score of an entry relates to the real score of the board
+EXACT = 0
+# The real score is at least the score stored, the search was cut off by beta
+LOWER_BOUND = 1
+# The real score is at most the score stored, no move raised alpha
+UPPER_BOUND = 2
+
+# Best move stored when there is none, move code 0 never describes a move
+NO_MOVE = 0
+
+# Depth stored in an empty slot
+EMPTY = -1
+
+# Bytes used by one slot in each of the arrays below
+SLOT_SIZE = 8 + 1 + 1 + 4 + 2 + 1
+
+# Memory used by the table if no size is given, in bytes
+DEFAULT_SIZE = 16 * 1024 * 1024
+
+# Combined into the key of boards scored for white, so scores for either team are never mixed up
+WHITE_SCORES_KEY = random.Random(0x5C0E).getrandbits(64)
+
+# Combined into the key of boards searched without a quiescence search, so leaf scores that played out the sumitos are
+# never mixed up with ones that did not
+NO_QUIESCENCE_KEY = random.Random(0x9E5C).getrandbits(64)
+
+
+class TranspositionTable:
+    """
+    A fixed size transposition table that stores the scores of searched boards by their Zobrist key.
+
+    Every entry stores the key, the depth searched, a bound flag (EXACT, LOWER_BOUND or UPPER_BOUND), the score, the
+    best move as a move code and the age of the search that stored it. The entries live in flat arrays allocated up
+    front, so the table never grows past the size given.
+
+    The table is split into buckets of two slots. The first slot keeps the deepest entry and is only replaced by an
+    entry searched at least as deep, or once its entry is from an older search. The second slot is always replaced.
+    """
+
+    def __init__(self, size=DEFAULT_SIZE):
+        """
+        Allocates the table.
+        :param size: the most memory the table can use as an int number of bytes
+        """
+        # Use a power of two number of buckets so a key can be masked down to a bucket
+        buckets = 1
+        while buckets * 2 * 2 * SLOT_SIZE <= size:
+            buckets *= 2
+        self._mask = buckets - 1
+        self._slots = buckets * 2
+
+        self._keys = array('Q', bytes(8 * self._slots))
+        self._depths = array('b', [EMPTY]) * self._slots
+        self._bounds = array('B', bytes(self._slots))
+        self._scores = array('i', bytes(4 * self._slots))
+        self._moves = array('H', bytes(2 * self._slots))
+        self._ages = array('B', bytes(self._slots))
+
+        # Age of the current search, see new_search()
+        self._age = 0
+
+    @property
+    def slots(self):
+        """
+        Property to get the number of entries the table can hold
+        :return: an int
+        """
+        return self._slots
+
+    def new_search(self):
+        """
+        Starts a new search, so that entries from older searches are replaced first.
+        """
+        self._age = (self._age + 1) & 0xFF
+
+    def clear(self):
+        """
+        Empties the table.
+        """
+        # Marking every slot empty is enough, a new array is much faster to build than a loop over the old one
+        self._depths = array('b', [EMPTY]) * self._slots
+
+    def probe(self, key):
+        """
+        Looks up the entry for a board.
+        :param key: the board's key as an int, see Board.get_transposition_key()
+        :return: a Tuple of the depth, bound flag, score and best move code of the entry, None if there is no entry
+        """
+        slot = (key & self._mask) << 1
+        keys = self._keys
+        if keys[slot] != key or self._depths[slot] == EMPTY:
+            slot += 1
+            if keys[slot] != key or self._depths[slot] == EMPTY:
+                return None
+        return self._depths[slot], self._bounds[slot], self._scores[slot], self._moves[slot]
+
+    def store(self, key, depth, bound, score, move=NO_MOVE):
+        """
+        Stores the result of searching a board, following the replacement scheme of the table.
+        :param key: the board's key as an int, see Board.get_transposition_key()
+        :param depth: the depth the board was searched to as an int
+        :param bound: the bound flag of the score, EXACT, LOWER_BOUND or UPPER_BOUND
+        :param score: the score of the board as an int
+        :param move: the best move found as a move code, NO_MOVE if there is none
+        """
+        slot = (key & self._mask) << 1
+        # The depth preferred slot takes the entry if it is the same board, is from an older search or is shallower
+        if self._keys[slot] != key and self._ages[slot] == self._age and self._depths[slot] > depth:
+            slot += 1
+
+        # Keep the best move of the board if this search did not find one
+        if move == NO_MOVE and self._keys[slot] == key and self._depths[slot] != EMPTY:
+            move = self._moves[slot]
+
+        self._keys[slot] = key
+        self._depths[slot] = depth
+        self._bounds[slot] = bound
+        self._scores[slot] = score
+        self._moves[slot] = move
+        self._ages[slot] = self._age
+
+
+# Bytes used by one slot of the SharedTranspositionTable, the packed entry and its key combined with the entry
+SHARED_SLOT_SIZE = 8 + 8
+
+# Layout of an entry of the SharedTranspositionTable packed into a 64-bit int, from the lowest bit up:
+#   bits 0-15   best move code
+#   bits 16-31  score, offset by SCORE_OFFSET so it is never negative
+#   bits 32-39  depth + 1, so a slot of zeros is empty
+#   bits 40-41  bound flag
+#   bits 48-55  age of the search that stored it
+SCORE_SHIFT = 16
+DEPTH_SHIFT = 32
+BOUND_SHIFT = 40
+AGE_SHIFT = 48
+SCORE_OFFSET = 0x8000
+
+
+class SharedTranspositionTable:
+    """
+    A fixed size transposition table in shared memory, so that several search processes can use each other's results.
+    It has the same interface and replacement scheme as TranspositionTable.
+
+    Every slot is two 64-bit words: the entry packed into one int, and the key XORed with the entry. Processes read and
+    write without any locks. If two processes write a slot at the same time the words can be left from different
+    entries, which then no longer give back the key, so a torn entry is treated as missing instead of being used.
+
+    The process that creates the table owns the shared memory and must unlink() it once done. Pickling the table, eg.
+    passing it to a worker process, attaches to the same shared memory.
+    """
+
+    def __init__(self, size=DEFAULT_SIZE, name=None):
+        """
+        Allocates the table in new shared memory, or attaches to the shared memory of an existing table.
+        :param size: the most memory the table can use as an int number of bytes
+        :param name: the name of the shared memory of an existing table, None to create a new table
+        """
+        # Use a power of two number of buckets so a key can be masked down to a bucket
+        buckets = 1
+        while buckets * 2 * 2 * SHARED_SLOT_SIZE <= size:
+            buckets *= 2
+        self._size = size
+        self._mask = buckets - 1
+        self._slots = buckets * 2
+
+        # The first word holds the age of the current search, so every process sees new_search()
+        if name is None:
+            self._memory = shared_memory.SharedMemory(create=True, size=8 + self._slots * SHARED_SLOT_SIZE)
+        else:
+            self._memory = shared_memory.SharedMemory(name=name)
+        self._owner = name is None
+        self._words = self._memory.buf[:8 + self._slots * SHARED_SLOT_SIZE].cast('Q')
+
+    def __getstate__(self):
+        return self._size, self._memory.name
+
+    def __setstate__(self, state):
+        self.__init__(*state)
+
+    @property
+    def slots(self):
+        """
+        Property to get the number of entries the table can hold
+        :return: an int
+        """
+        return self._slots
+
+    @property
+    def name(self):
+        """
+        Property to get the name of the table's shared memory
+        :return: a String
+        """
+        return self._memory.name
+
+    def new_search(self):
+        """
+        Starts a new search, so that entries from older searches are replaced first.
+        """
+        self._words[0] = (self._words[0] + 1) & 0xFF
+
+    def clear(self):
+        """
+        Empties the table.
+        """
+        words = self._words
+        for i in range(1, len(words)):
+            words[i] = 0
+
+    def probe(self, key):
+        """
+        Looks up the entry for a board.
+        :param key: the board's key as an int, see Board.get_transposition_key()
+        :return: a Tuple of the depth, bound flag, score and best move code of the entry, None if there is no entry
+        """
+        words = self._words
+        word = ((key & self._mask) << 2) + 1
+        entry = words[word + 1]
+        if entry == 0 or words[word] ^ entry != key:
+            entry = words[word + 3]
+            if entry == 0 or words[word + 2] ^ entry != key:
+                return None
+        return ((entry >> DEPTH_SHIFT & 0xFF) - 1,
+                entry >> BOUND_SHIFT & 0x3,
+                (entry >> SCORE_SHIFT & 0xFFFF) - SCORE_OFFSET,
+                entry & 0xFFFF)
+
+    def store(self, key, depth, bound, score, move=NO_MOVE):
+        """
+        Stores the result of searching a board, following the replacement scheme of the table.
+        :param key: the board's key as an int, see Board.get_transposition_key()
+        :param depth: the depth the board was searched to as an int
+        :param bound: the bound flag of the score, EXACT, LOWER_BOUND or UPPER_BOUND
+        :param score: the score of the board as an int
+        :param move: the best move code found, NO_MOVE if there is none
+        """
+        words = self._words
+        age = words[0]
+        word = ((key & self._mask) << 2) + 1
+        # The depth preferred slot takes the entry if it is the same board, is from an older search or is shallower
+        entry = words[word + 1]
+        if entry != 0 and words[word] ^ entry != key and entry >> AGE_SHIFT == age \
+                and (entry >> DEPTH_SHIFT & 0xFF) - 1 > depth:
+            word += 2
+            entry = words[word + 1]
+
+        # Keep the best move of the board if this search did not find one
+        if move == NO_MOVE and entry != 0 and words[word] ^ entry == key:
+            move = entry & 0xFFFF
+
+        entry = move | (score + SCORE_OFFSET) << SCORE_SHIFT | (depth + 1) << DEPTH_SHIFT \
+            | bound << BOUND_SHIFT | age << AGE_SHIFT
+        words[word] = key ^ entry
+        words[word + 1] = entry
+
+    def close(self):
+        """
+        Detaches this process from the table's shared memory, the table can no longer be used.
+        """
+        self._words.release()
+        self._memory.close()
+
+    def unlink(self):
+        """
+        Detaches from and frees the table's shared memory. Only called by the process that created the table.
+        """
+        self.close()
+        if self._owner:
+            self._memory.unlink()
@@ -2,6 +2,7 @@ import time
 
 from enums import PieceType
 from exceptions import ClockError
+from moveencoding import move_info_positions
 
 
 def gen_move_numbers(start=1, stop=1000):
@@ -91,6 +92,19 @@ class MoveInfo:
         self._time = time_taken
         self._did_sumito = sumito
 
+    @classmethod
+    def from_move_code(cls, move_code, time_taken, sumito=False, color=PieceType.BLACK):
+        """
+        Creates a move info for a move packed into an int, see moveencoding.
+        :param move_code: the move code as an int
+        :param time_taken: the time taken for the move as a float
+        :param sumito: True if the move was a sumito
+        :param color: the PieceType of the player that moved
+        :return: a MoveInfo
+        """
+        from_pos, to_pos, move_type = move_info_positions(move_code)
+        return cls(from_pos, to_pos, move_type, time_taken, sumito, color)
+
     def get_as_history_format(self):
         time_str = ""
         if self._time is None:  # Set time properly if None, or format to 2 decimal places
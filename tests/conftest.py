@@ -0,0 +1,55 @@
+import os
+import sys
+
+
+# The modules in src import each other by name, so put src on the path for every test
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+import itertools
+import random
+
+from board import Board
+from enums import InitialBoardState, PieceType
+from moveencoding import MOVE_TABLE
+from statespacegenerator import StateSpaceGenerator
+
+
+def other_team(team):
+    """
+    Gets the team that moves after the one given.
+    :param team: a PieceType enum
+    :return: the other PieceType enum
+    """
+    return PieceType.BLACK if team == PieceType.WHITE else PieceType.WHITE
+
+
+def random_positions(layout, plies, seed):
+    """
+    Plays random moves from a layout with black to move, yielding the board and the team to move before each move.
+    Stops early once the game is won or there are no moves. The same Board is yielded every time, changed in place.
+    :param layout: an InitialBoardState enum for the board to start from
+    :param plies: the most positions to yield as an int
+    :param seed: the seed of the random moves
+    :return: a Generator of Tuples of the Board and the team to move as a PieceType enum
+    """
+    rng = random.Random(seed)
+    board = Board(layout)
+    team = PieceType.BLACK
+    for ply in range(plies):
+        move_codes = StateSpaceGenerator.build_state_space_generator(board, team).generate_move_codes()
+        if not move_codes or board.has_won():
+            return
+        yield board, team
+        board.make_index_move(*MOVE_TABLE[rng.choice(move_codes)])
+        team = other_team(team)
+
+
+def midgame_board(seed, plies, layout=InitialBoardState.BELGIAN):
+    """
+    Plays random moves from a layout, so that the moves of the board reached have different scores.
+    :param seed: the seed of the random moves
+    :param plies: the number of moves to play as an int
+    :param layout: an InitialBoardState enum for the board to start from
+    :return: a Tuple of the Board and the team to move as a PieceType enum
+    """
+    return next(itertools.islice(random_positions(layout, plies + 1, seed), plies, None))
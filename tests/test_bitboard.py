@@ -0,0 +1,83 @@
+import pytest
+
+from bitboard import BitBoard
+from board import Board
+from engine import SearchEngine
+from enums import InitialBoardState, PieceType, SearchMode
+from moveencoding import MOVE_TABLE, encode_notation
+from statespacegenerator import StateSpaceGenerator
+
+from conftest import other_team, random_positions
+
+LAYOUTS = [InitialBoardState.DEFAULT, InitialBoardState.BELGIAN, InitialBoardState.GERMAN]
+
+
+def board_scores(board, team, depth):
+    """
+    Scores every root move with the Board minimax search, with no quiescence search.
+    """
+    StateSpaceGenerator.TRANSPOSITION_TABLE.clear()
+    state_space_gen = StateSpaceGenerator.build_state_space_generator(board, team)
+    state_space_gen.quiescence_enabled = False
+    state_space_gen._start_iteration(depth)
+    scores = {}
+    for move in state_space_gen.generate_move_codes():
+        undo_record = board.make_index_move(*MOVE_TABLE[move])
+        scores[move] = state_space_gen.minimax(board, depth, StateSpaceGenerator.MIN, StateSpaceGenerator.MAX,
+                                               other_team(team))
+        board.unmake_move(undo_record)
+    return scores
+
+
+def bitboard_scores(board, team, depth):
+    """
+    Scores every root move with minimax_bitboard().
+    """
+    state_space_gen = StateSpaceGenerator.build_state_space_generator(board, team)
+    bitboard = BitBoard.from_board(board)
+    return {encode_notation(BitBoard.move_to_notation(move)):
+            state_space_gen.minimax_bitboard(bitboard.apply_move(move), depth, StateSpaceGenerator.MIN,
+                                             StateSpaceGenerator.MAX, other_team(team))
+            for move in bitboard.generate_moves(team)}
+
+
+@pytest.mark.parametrize("layout", LAYOUTS)
+def test_moves_and_evaluation_match_board(layout):
+    for board, team in random_positions(layout, 40, 1):
+        bitboard = BitBoard.from_board(board)
+        move_codes = StateSpaceGenerator.build_state_space_generator(board, team).generate_move_codes()
+        assert sorted(encode_notation(BitBoard.move_to_notation(move)) for move in bitboard.generate_moves(team)) \
+            == sorted(move_codes)
+        for scored_team in (PieceType.WHITE, PieceType.BLACK):
+            assert bitboard.evaluate(scored_team) == StateSpaceGenerator.evaluate(board, scored_team)
+
+
+@pytest.mark.parametrize("layout", LAYOUTS)
+def test_search_scores_match_board_search(layout):
+    for number, (board, team) in enumerate(random_positions(layout, 30, 2)):
+        if number % 10 == 0:
+            assert bitboard_scores(board, team, 1) == board_scores(board, team, 1)
+
+
+def test_find_best_move_bitboard_mode_finds_best_score():
+    board = Board(InitialBoardState.BELGIAN)
+    state_space_gen = StateSpaceGenerator.build_state_space_generator(board, PieceType.BLACK)
+    best_move = state_space_gen.find_best_move(1, None, SearchMode.BITBOARD)
+    scores = board_scores(board, PieceType.BLACK, 1)
+    assert scores[encode_notation(best_move)] == max(scores.values())
+
+
+def test_bitboard_search_stops_at_node_limit():
+    state_space_gen = StateSpaceGenerator.build_state_space_generator(Board(InitialBoardState.GERMAN),
+                                                                      PieceType.BLACK)
+    assert state_space_gen.find_best_move(None, None, SearchMode.BITBOARD, node_limit=2000) is not None
+    assert state_space_gen.nodes_searched <= 2000 + StateSpaceGenerator.DEADLINE_CHECK_INTERVAL
+
+
+def test_engine_searches_with_bitboard_mode():
+    engine = SearchEngine()
+    try:
+        future = engine.start_search(Board(InitialBoardState.DEFAULT), PieceType.BLACK, 1, None, SearchMode.BITBOARD)
+        assert future.result(timeout=60) is not None
+    finally:
+        engine.shutdown()
@@ -0,0 +1,109 @@
+import time
+
+import pytest
+
+from board import Board
+from engine import SearchEngine
+from enums import InitialBoardState, PieceType, SearchMode
+from moveencoding import MOVE_TABLE, encode_notation
+from statespacegenerator import StateSpaceGenerator
+from transpositiontable import NO_MOVE
+
+# Seconds given to the search that follows a ponder search
+PONDER_TIME_GIVEN = 2
+
+
+@pytest.fixture
+def engine():
+    search_engine = SearchEngine()
+    yield search_engine
+    search_engine.shutdown()
+
+
+def test_cancel_stops_depth_only_search(engine):
+    # Far too deep to finish, only the stop flag can end it
+    engine.start_search(Board(InitialBoardState.BELGIAN), PieceType.BLACK, 8, None)
+    time.sleep(1)
+    engine.cancel()
+
+    # The engine has a single worker, so the next search only starts once the cancelled one has stopped
+    start_time = time.time()
+    future = engine.start_search(Board(InitialBoardState.BELGIAN), PieceType.BLACK, 0, None)
+    assert future.result(timeout=20) is not None
+    assert time.time() - start_time < 20
+
+
+def test_new_search_stops_node_limited_search(engine):
+    engine.start_search(Board(InitialBoardState.GERMAN), PieceType.BLACK, None, None, node_limit=10 ** 9)
+    time.sleep(1)
+    future = engine.start_search(Board(InitialBoardState.GERMAN), PieceType.BLACK, 0, None)
+    assert future.result(timeout=20) is not None
+
+
+def test_search_copies_board(engine):
+    board = Board(InitialBoardState.BELGIAN)
+    future = engine.start_search(board, PieceType.BLACK, 1, None, SearchMode.PRINCIPAL_VARIATION)
+    # Changing the board straight after starting must not change the board searched
+    board.clear_tiles()
+    assert future.result(timeout=60) is not None
+
+
+def start_pondering(engine):
+    """
+    Plays the engine's move for black on the Belgian layout and ponders on white's reply, waiting until the reply
+    has been guessed.
+    :return: a Tuple of the board after the engine's move and the ponder search's Future
+    """
+    board = Board(InitialBoardState.BELGIAN)
+    best_move = engine.start_search(board, PieceType.BLACK, 1, None).result(timeout=60)
+    board.make_index_move(*MOVE_TABLE[encode_notation(best_move)])
+
+    ponder_future = engine.start_ponder(board, PieceType.BLACK)
+    deadline = time.time() + 30
+    while engine._ponder_move.value == NO_MOVE and time.time() < deadline:
+        time.sleep(0.05)
+    assert engine.pondering
+    return board, ponder_future
+
+
+def assert_legal(board, team, move):
+    move_codes = StateSpaceGenerator.build_state_space_generator(board, team).generate_move_codes()
+    assert encode_notation(move) in move_codes
+
+
+def test_ponder_hit_keeps_ponder_search(engine):
+    board, ponder_future = start_pondering(engine)
+    board.make_index_move(*MOVE_TABLE[engine._ponder_move.value])
+
+    start_time = time.time()
+    future = engine.start_search(board, PieceType.BLACK, None, PONDER_TIME_GIVEN)
+    # The ponder search carries on with the time given as its deadline
+    assert future is ponder_future
+    assert not engine.pondering and engine.searching
+    best_move = future.result(timeout=30)
+    assert time.time() - start_time < PONDER_TIME_GIVEN + 1
+    assert_legal(board, PieceType.BLACK, best_move)
+
+
+@pytest.mark.parametrize("miss", ["other reply", "other search mode", "depth limit"])
+def test_ponder_miss_starts_over(engine, miss):
+    board, ponder_future = start_pondering(engine)
+    reply = engine._ponder_move.value
+    search_mode = SearchMode.MINIMAX
+    depth = None
+    if miss == "other reply":
+        move_codes = StateSpaceGenerator.build_state_space_generator(board, PieceType.WHITE).generate_move_codes()
+        reply = next(move for move in move_codes if move != reply)
+    elif miss == "other search mode":
+        search_mode = SearchMode.PRINCIPAL_VARIATION
+    else:
+        # A depth limit is only kept by starting over
+        depth = 1
+    board.make_index_move(*MOVE_TABLE[reply])
+
+    future = engine.start_search(board, PieceType.BLACK, depth, PONDER_TIME_GIVEN, search_mode)
+    assert future is not ponder_future
+    assert not engine.pondering
+    # The cancelled ponder search stops and gives the best move it found, the new search searches the board given
+    ponder_future.result(timeout=30)
+    assert_legal(board, PieceType.BLACK, future.result(timeout=30))
@@ -0,0 +1,89 @@
+import pytest
+
+from board import Board
+from enums import HeuristicWeight, InitialBoardState, PieceType
+from moveencoding import MOVE_TABLE
+from statespacegenerator import StateSpaceGenerator
+
+from conftest import other_team, random_positions
+
+# Number of random moves played from each layout
+PLAYOUT_MOVES = 120
+# Every move of one position in this many is made and unmade
+UNMAKE_INTERVAL = 10
+
+
+def full_distance_points(board, team, tile_values):
+    """
+    Sums the points of a team's marbles by walking every tile, the way the evaluation did before the board kept the
+    sums up to date.
+    :param board: the Board to sum
+    :param team: the team whose marbles are summed as a PieceType enum
+    :param tile_values: the points of each tile as a List of rows, eg. HeuristicWeight.DISTANCE_TILE_ARRAY.value
+    :return: the points as an int
+    """
+    return sum(tile_values[y][x] for y, row in enumerate(board.get_tiles()) for x, tile in enumerate(row)
+               if tile == team)
+
+
+def full_piece_points(board, team):
+    """
+    Scores the number of pieces from the marble counts, the way the evaluation did before PIECE_POINTS.
+    :param board: the Board to score
+    :param team: the team to score for as a PieceType enum
+    :return: the points as an int
+    """
+    own_marbles, opponent_marbles = (board.white_marbles, board.black_marbles) if team == PieceType.WHITE \
+        else (board.black_marbles, board.white_marbles)
+    if opponent_marbles <= 8:
+        return HeuristicWeight.WIN_WEIGHT.value
+    return (StateSpaceGenerator.starting_marbles - opponent_marbles) * HeuristicWeight.PIECE_WEIGHT.value \
+        - (StateSpaceGenerator.starting_marbles - own_marbles) * HeuristicWeight.PIECE_WEIGHT.value * 10
+
+
+def full_evaluation(board, team):
+    enemy = other_team(team)
+    return StateSpaceGenerator.points_for_groups(board, team) \
+        + full_distance_points(board, team, HeuristicWeight.DISTANCE_TILE_ARRAY.value) \
+        + full_piece_points(board, team) \
+        + full_distance_points(board, enemy, HeuristicWeight.ENEMY_DISTANCE_TILE_ARRAY.value)
+
+
+def assert_matches_full_recompute(board):
+    recomputed_board = Board(board=board)
+    recomputed_board.calculate_distance_points()
+    assert board.distance_points == recomputed_board.distance_points
+    assert board.enemy_distance_points == recomputed_board.enemy_distance_points
+    for team in (PieceType.BLACK, PieceType.WHITE):
+        assert StateSpaceGenerator.evaluate(board, team) == full_evaluation(board, team)
+
+
+def board_state(board):
+    return board.zobrist_hash, list(board.distance_points), list(board.enemy_distance_points)
+
+
+@pytest.mark.parametrize("layout", [InitialBoardState.DEFAULT, InitialBoardState.BELGIAN,
+                                    InitialBoardState.GERMAN])
+def test_incremental_evaluation_matches_full_recompute(layout):
+    for ply, (board, team) in enumerate(random_positions(layout, PLAYOUT_MOVES, layout.name)):
+        assert_matches_full_recompute(board)
+        if ply % UNMAKE_INTERVAL:
+            continue
+
+        # Unmaking restores the sums as well as the marbles
+        start_state = board_state(board)
+        for move in StateSpaceGenerator.build_state_space_generator(board, team).generate_move_codes():
+            undo_record = board.make_index_move(*MOVE_TABLE[move])
+            assert_matches_full_recompute(board)
+            board.unmake_move(undo_record)
+            assert board_state(board) == start_state
+
+
+def test_incremental_evaluation_after_push_off():
+    marbles = None
+    for board, team in random_positions(InitialBoardState.GERMAN, 400, 5):
+        if marbles is None:
+            marbles = board.white_marbles + board.black_marbles
+        assert_matches_full_recompute(board)
+    # Marbles were pushed off the board along the way
+    assert board.white_marbles + board.black_marbles < marbles
@@ -0,0 +1,71 @@
+import time
+
+import pytest
+
+from board import Board
+from enums import InitialBoardState, PieceType, SearchMode
+from exceptions import InvalidParameterException
+from statespacegenerator import StateSpaceGenerator
+
+
+# Number of times each latency target is searched
+LATENCY_RUNS = 7
+
+
+def build(layout=InitialBoardState.GERMAN):
+    return StateSpaceGenerator.build_state_space_generator(Board(layout), PieceType.BLACK)
+
+
+@pytest.mark.parametrize("search_mode", [SearchMode.MINIMAX, SearchMode.PRINCIPAL_VARIATION, SearchMode.BITBOARD])
+@pytest.mark.parametrize("node_limit", [1, 10, 100, 1000])
+def test_node_limit_is_exact(node_limit, search_mode):
+    state_space_gen = build()
+    assert state_space_gen.find_best_move(None, None, search_mode, node_limit=node_limit) is not None
+    assert state_space_gen.nodes_searched == node_limit
+
+
+@pytest.mark.parametrize("node_limit", [0, -5])
+def test_node_limit_below_one(node_limit):
+    with pytest.raises(InvalidParameterException):
+        build().find_best_move(None, None, node_limit=node_limit)
+
+
+def test_node_limited_search_is_reproducible():
+    results = []
+    for layout in (InitialBoardState.GERMAN, InitialBoardState.BELGIAN, InitialBoardState.GERMAN):
+        # Fill the transposition table with another search in between
+        build(layout).find_best_move(1, None, SearchMode.PRINCIPAL_VARIATION)
+        state_space_gen = build()
+        move = state_space_gen.find_best_move(None, None, SearchMode.PRINCIPAL_VARIATION, node_limit=5000)
+        results.append((move, state_space_gen.best_line, state_space_gen.nodes_searched))
+    assert results[0] == results[1] == results[2]
+
+
+def test_node_limited_analysis_is_reproducible():
+    first_analysis = build().find_best_moves(3, None, None, SearchMode.PRINCIPAL_VARIATION, node_limit=3000)
+    build(InitialBoardState.DEFAULT).find_best_move(1, None)
+    assert build().find_best_moves(3, None, None, SearchMode.PRINCIPAL_VARIATION, node_limit=3000) == first_analysis
+
+
+@pytest.mark.parametrize("search_mode", [SearchMode.MINIMAX, SearchMode.PRINCIPAL_VARIATION])
+@pytest.mark.parametrize("latency", [5, 10, 20])
+def test_latency_target_is_met(latency, search_mode):
+    wall_times = []
+    for _ in range(LATENCY_RUNS):
+        start_time = time.perf_counter()
+        start_process_time = time.process_time()
+        state_space_gen = build()
+        move = state_space_gen.find_best_move(None, None, search_mode, latency=latency)
+        assert move is not None
+        assert state_space_gen.nodes_searched > 0
+        # Time spent searching never runs past the target. The wall clock can, if the test process is switched out.
+        assert (time.process_time() - start_process_time) * 1000 <= latency
+        wall_times.append((time.perf_counter() - start_time) * 1000)
+    assert sorted(wall_times)[LATENCY_RUNS // 2] <= latency
+
+
+def test_latency_target_with_time_limit():
+    # The earlier of the two deadlines is used
+    start_process_time = time.process_time()
+    assert build().find_best_move(None, 30, latency=10) is not None
+    assert time.process_time() - start_process_time <= 0.01
@@ -0,0 +1,185 @@
+import math
+
+import pytest
+
+from board import Board
+from enums import InitialBoardState, PieceType
+from montecarlotreesearch import MonteCarloNode, MonteCarloTreeSearch
+from moveencoding import MOVE_TABLE, encode_notation
+from transpositiontable import NO_MOVE
+
+from conftest import other_team
+
+# Number of playouts made by the tests that do not search against the clock
+PLAYOUTS = 200
+# Number of playouts made to find the capture, enough for it to be searched the most
+CAPTURE_PLAYOUTS = 1000
+
+
+@pytest.fixture(scope="module", autouse=True)
+def shutdown_workers():
+    yield
+    MonteCarloTreeSearch.shutdown_workers()
+
+
+def grow_tree(board, team, playouts=PLAYOUTS, seed=1):
+    """
+    Reads a board into a new engine and makes a fixed number of playouts from it.
+    :return: the MonteCarloTreeSearch
+    """
+    engine = MonteCarloTreeSearch(seed)
+    engine.read_board(board, team)
+    for _ in range(playouts):
+        engine._playout(engine._root_board)
+    return engine
+
+
+def child_node(visits, wins):
+    node = MonteCarloNode(NO_MOVE, None, PieceType.WHITE, [])
+    node.visits = visits
+    node.wins = wins
+    return node
+
+
+def test_select_child_uses_uct():
+    parent = child_node(100, 50)
+    well_searched = child_node(50, 30)
+    barely_searched = child_node(5, 2)
+    parent.children = [well_searched, barely_searched]
+
+    def uct(child, exploration):
+        return child.wins / child.visits + exploration * math.sqrt(math.log(parent.visits) / child.visits)
+
+    # 0.6 + 0.42 against 0.4 + 1.34, the child searched less is worth exploring
+    assert uct(barely_searched, MonteCarloTreeSearch.EXPLORATION) > uct(well_searched, MonteCarloTreeSearch.EXPLORATION)
+    assert parent.select_child(MonteCarloTreeSearch.EXPLORATION) is barely_searched
+    # Without exploration only the win rates count
+    assert parent.select_child(0) is well_searched
+
+
+def test_playout_backs_up_result_for_each_team():
+    engine = MonteCarloTreeSearch(1)
+    engine.read_board(Board(InitialBoardState.BELGIAN), PieceType.BLACK)
+    # Score every playout as 0.8 for the team to move at the new node, white after black's root move
+    engine._simulate = lambda board, team: 0.8
+
+    engine._playout(engine._root_board)
+    root = engine.root
+    child = root.children[0]
+    assert (child.visits, child.wins) == (1, pytest.approx(0.2))
+    assert (root.visits, root.wins) == (1, pytest.approx(0.8))
+    assert engine.playouts == 1
+
+
+def test_visits_add_up_through_tree():
+    engine = grow_tree(Board(InitialBoardState.BELGIAN), PieceType.BLACK)
+    root = engine.root
+    assert root.visits == engine.playouts == PLAYOUTS
+    assert sum(child.visits for child in root.children) == root.visits
+
+    nodes = list(root.children)
+    while nodes:
+        node = nodes.pop()
+        # Every playout through a node either added it or went on to one of its children
+        assert node.visits == 1 + sum(child.visits for child in node.children)
+        assert 0 <= node.wins <= node.visits
+        assert node.team == other_team(node.parent.team)
+        nodes.extend(node.children)
+
+
+def test_score_board_for_won_game():
+    board = Board(InitialBoardState.BELGIAN, white_marbles=14, black_marbles=8)
+    assert MonteCarloTreeSearch._score_board(board, PieceType.WHITE) == 1.0
+    assert MonteCarloTreeSearch._score_board(board, PieceType.BLACK) == 0.0
+    assert 0 < MonteCarloTreeSearch._score_board(Board(InitialBoardState.BELGIAN), PieceType.BLACK) < 1
+
+
+def test_tree_kept_across_played_moves():
+    board = Board(InitialBoardState.BELGIAN)
+    engine = grow_tree(board, PieceType.BLACK)
+    root = engine.root
+
+    # The same board keeps the whole tree
+    engine.read_board(board, PieceType.BLACK)
+    assert engine.root is root
+
+    # Black's move and white's reply keep the tree below the reply
+    child = max(root.children, key=lambda node: node.visits)
+    grandchild = max(child.children, key=lambda node: node.visits)
+    visits = grandchild.visits
+    board.make_index_move(*MOVE_TABLE[child.move])
+    board.make_index_move(*MOVE_TABLE[grandchild.move])
+    engine.read_board(board, PieceType.BLACK)
+    assert engine.root is grandchild
+    assert engine.root.visits == visits
+    assert engine.root.parent is None
+    assert engine.root.move == NO_MOVE
+
+    # A board that was never searched starts a new tree
+    engine.read_board(Board(InitialBoardState.GERMAN), PieceType.BLACK)
+    assert engine.root.visits == 0
+    assert not engine.root.children
+
+
+def test_tree_kept_after_one_move():
+    board = Board(InitialBoardState.BELGIAN)
+    engine = grow_tree(board, PieceType.BLACK)
+    child = max(engine.root.children, key=lambda node: node.visits)
+    board.make_index_move(*MOVE_TABLE[child.move])
+    engine.read_board(board, PieceType.WHITE)
+    assert engine.root is child
+    # The same board with the other team to move is a different node
+    engine.read_board(board, PieceType.BLACK)
+    assert engine.root is not child
+
+
+def test_root_parallel_search_merges_visits():
+    engine = MonteCarloTreeSearch(1)
+    engine.read_board(Board(InitialBoardState.BELGIAN), PieceType.BLACK)
+    merged = {}
+    choose_move = engine._choose_move
+
+    def capture_statistics(statistics):
+        merged.update(statistics)
+        return choose_move(statistics)
+
+    engine._choose_move = capture_statistics
+    best_move = engine.find_best_move_parallel(None, 2, workers=2)
+
+    # Every playout of every tree visits one root move
+    own_statistics = engine.root_statistics()
+    assert sum(visits for visits, wins in merged.values()) == engine.playouts
+    assert engine.playouts > engine.root.visits
+    for move, (visits, wins) in own_statistics.items():
+        assert merged[move][0] >= visits
+        assert merged[move][1] >= wins
+    assert encode_notation(best_move) == max(merged, key=lambda move: merged[move][0])
+
+
+def capture_board():
+    """
+    Builds a board where black can push a white marble off from A1 with the marbles on B1 and C1.
+    Both teams are down to nine marbles, so the push wins the game while the board is otherwise even.
+    """
+    board = Board()
+    for position in (("A", 1), ("E", 5), ("E", 6), ("F", 5), ("F", 6), ("F", 7), ("G", 5), ("G", 6), ("G", 7)):
+        board.set_tile(PieceType.WHITE, position)
+    for position in (("B", 1), ("C", 1), ("C", 3), ("D", 2), ("D", 3), ("I", 5), ("I", 6)):
+        board.set_tile(PieceType.BLACK, position)
+    return Board(tiles=board.get_tiles_values(), white_marbles=9, black_marbles=9)
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_engine_plays_capture(seed):
+    board = capture_board()
+    # A fixed number of playouts, so the search does not depend on how fast the machine is
+    engine = grow_tree(board, PieceType.BLACK, CAPTURE_PLAYOUTS, seed)
+    statistics = engine.root_statistics()
+    best_move = engine._choose_move(statistics)
+
+    board.make_index_move(*MOVE_TABLE[encode_notation(best_move)])
+    assert board.white_marbles == 8
+    assert board.has_won() == PieceType.BLACK
+    # Every playout through the capture ends in a win
+    visits, wins = statistics[encode_notation(best_move)]
+    assert wins == visits
@@ -0,0 +1,69 @@
+import pytest
+
+from board import Board
+from enums import InitialBoardState
+from moveencoding import (MOVE_DIRECTIONS, MOVE_TABLE, create_move_list, decode_move, decode_to_notation, encode_move,
+                          encode_notation)
+from statespacegenerator import StateSpaceGenerator
+
+from conftest import random_positions
+
+LAYOUTS = [InitialBoardState.DEFAULT, InitialBoardState.BELGIAN, InitialBoardState.GERMAN]
+
+# Random games played from each layout, and the most plies played in each
+SEEDS = [1, 2, 3]
+PLIES = 60
+
+
+def sample_positions():
+    """
+    Yields the board and team to move of every position of the random games, see random_positions().
+    """
+    for layout in LAYOUTS:
+        for seed in SEEDS:
+            yield from random_positions(layout, PLIES, seed)
+
+
+def test_codes_round_trip():
+    for board, team in sample_positions():
+        move_codes = StateSpaceGenerator.build_state_space_generator(board, team).generate_move_codes()
+        assert create_move_list(move_codes) == move_codes
+        for move_code in move_codes:
+            assert encode_move(*decode_move(move_code)) == move_code
+            assert encode_notation(decode_to_notation(move_code)) == move_code
+
+
+def test_codes_agree_with_move_table():
+    for board, team in sample_positions():
+        for move_code in StateSpaceGenerator.build_state_space_generator(board, team).generate_move_codes():
+            notation = decode_to_notation(move_code)
+            direction, marbles = MOVE_TABLE[move_code]
+            assert direction == notation[-1] == MOVE_DIRECTIONS[decode_move(move_code)[3]]
+            assert marbles == tuple(Board.position_to_index(position) for position in notation[:-1])
+
+
+def test_codes_match_list_moves():
+    for board, team in sample_positions():
+        move_codes = StateSpaceGenerator.build_state_space_generator(board, team).generate_move_codes()
+        list_moves = StateSpaceGenerator.build_state_space_generator(board, team).generate_all_legal_moves()
+        staged_moves = StateSpaceGenerator.build_state_space_generator(board, team).generate_staged_moves()
+
+        # The same moves as the list of move notations, each once, in the staged order
+        assert len(set(move_codes)) == len(move_codes) == len(list_moves)
+        assert set(move_codes) == {encode_notation(move) for move in list_moves}
+        assert [decode_to_notation(move_code) for move_code in move_codes] == list(staged_moves)
+
+
+@pytest.mark.parametrize("layout", LAYOUTS)
+def test_codes_make_same_moves(layout):
+    for board, team in random_positions(layout, PLIES, SEEDS[0]):
+        state = board.get_tiles_values()
+        for move in StateSpaceGenerator.build_state_space_generator(board, team).generate_all_legal_moves():
+            undo_record = board.make_move(move)
+            moved = board.get_tiles_values(), board.white_marbles, board.black_marbles, board.zobrist_hash
+            board.unmake_move(undo_record)
+
+            undo_record = board.make_index_move(*MOVE_TABLE[encode_notation(move)])
+            assert (board.get_tiles_values(), board.white_marbles, board.black_marbles, board.zobrist_hash) == moved
+            board.unmake_move(undo_record)
+        assert board.get_tiles_values() == state
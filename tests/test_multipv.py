@@ -0,0 +1,85 @@
+import functools
+import time
+
+import pytest
+
+from board import Board
+from enums import SearchMode
+from moveencoding import MOVE_TABLE, encode_notation
+from statespacegenerator import StateSpaceGenerator
+
+from conftest import midgame_board, other_team
+
+# Number of lines asked for
+LINES = 5
+
+
+@functools.lru_cache
+def root_move_scores(seed, depth):
+    """
+    Scores every root move of a midgame_board() on its own with a full window minimax search and an empty
+    transposition table, to check find_best_moves() against. Cached, as every search mode is checked against it.
+    :param seed: the seed of the midgame_board() as an int
+    :param depth: the depth to search below each root move as an int
+    :return: a Dictionary of each root move code to its score
+    """
+    board, team = midgame_board(seed, 12)
+    state_space_gen = StateSpaceGenerator.build_state_space_generator(board, team)
+    root_moves = state_space_gen._prepare_search(time.time(), depth, None, SearchMode.MINIMAX, None, None)
+    state_space_gen._in_null_move = False
+    scores = {}
+    for move in root_moves:
+        StateSpaceGenerator.TRANSPOSITION_TABLE.clear()
+        state_space_gen._reset_move_ordering()
+        state_space_gen._start_iteration(depth)
+        undo_record = board.make_index_move(*MOVE_TABLE[move])
+        scores[move] = state_space_gen.minimax(board, depth, StateSpaceGenerator.MIN, StateSpaceGenerator.MAX,
+                                               other_team(team))
+        board.unmake_move(undo_record)
+    return scores
+
+
+@pytest.mark.parametrize("seed, depth", [(1, 1), (1, 2)])
+@pytest.mark.parametrize("search_mode", [SearchMode.MINIMAX, SearchMode.PRINCIPAL_VARIATION])
+def test_lines_are_best_root_moves_in_order(seed, depth, search_mode):
+    board, team = midgame_board(seed, 12)
+    scores = root_move_scores(seed, depth)
+
+    StateSpaceGenerator.TRANSPOSITION_TABLE.clear()
+    state_space_gen = StateSpaceGenerator.build_state_space_generator(Board(board=board), team)
+    analysis = state_space_gen.find_best_moves(LINES, depth, None, search_mode)
+
+    values = [value for move, value, principal_variation in analysis]
+    assert values == sorted(values, reverse=True)
+    assert values == sorted(scores.values(), reverse=True)[:LINES]
+    # Each line is scored exactly, not just as a bound
+    for move, value, principal_variation in analysis:
+        assert scores[encode_notation(move)] == value
+    assert len({tuple(move) for move, value, principal_variation in analysis}) == LINES
+
+
+def test_principal_variations_are_legal():
+    board, team = midgame_board(3, 12)
+    analysis = StateSpaceGenerator.build_state_space_generator(Board(board=board), team) \
+        .find_best_moves(LINES, 2, None, SearchMode.PRINCIPAL_VARIATION)
+
+    for move, value, principal_variation in analysis:
+        assert principal_variation[0] == move
+        # The root move and the best reply of each ply searched, quiescence moves are not part of the line
+        assert 1 <= len(principal_variation) <= 3
+        line_board = Board(board=board)
+        line_team = team
+        for line_move in principal_variation:
+            move_code = encode_notation(line_move)
+            assert move_code in StateSpaceGenerator.build_state_space_generator(line_board, line_team) \
+                .generate_move_codes()
+            line_board.make_index_move(*MOVE_TABLE[move_code])
+            line_team = other_team(line_team)
+
+
+def test_more_lines_than_moves():
+    board, team = midgame_board(2, 12)
+    move_count = len(StateSpaceGenerator.build_state_space_generator(board, team).generate_move_codes())
+    analysis = StateSpaceGenerator.build_state_space_generator(Board(board=board), team) \
+        .find_best_moves(move_count + 10, 1, None)
+    assert len(analysis) == move_count
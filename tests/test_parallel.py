@@ -0,0 +1,40 @@
+import atexit
+
+import pytest
+
+from board import Board
+from enums import InitialBoardState, PieceType, SearchMode
+from exceptions import InvalidParameterException
+from statespacegenerator import StateSpaceGenerator
+
+
+@pytest.fixture
+def state_space_gen():
+    yield StateSpaceGenerator.build_state_space_generator(Board(InitialBoardState.BELGIAN), PieceType.BLACK)
+    StateSpaceGenerator.shutdown_workers()
+
+
+def test_restarting_pool_does_not_register_more_exit_hooks(state_space_gen):
+    callbacks = atexit._ncallbacks()
+    StateSpaceGenerator._get_workers(1)
+    StateSpaceGenerator._get_workers(2)
+    StateSpaceGenerator._get_workers(1)
+    assert atexit._ncallbacks() == callbacks
+
+
+@pytest.mark.parametrize("search", ["find_best_move_parallel", "find_best_move_lazy_smp"])
+def test_parallel_search_uses_search_mode(state_space_gen, search):
+    # A principal variation search left its mode behind, the next search must not reuse it
+    state_space_gen.find_best_move(1, None, SearchMode.PRINCIPAL_VARIATION)
+    move = getattr(state_space_gen, search)(1, 60, SearchMode.MINIMAX, workers=2)
+    assert move is not None
+    assert not state_space_gen._principal_variation
+
+    move = getattr(state_space_gen, search)(1, 60, SearchMode.PRINCIPAL_VARIATION, workers=2)
+    assert move is not None
+    assert state_space_gen._principal_variation
+
+
+def test_parallel_search_rejects_bitboard_mode(state_space_gen):
+    with pytest.raises(InvalidParameterException):
+        state_space_gen.find_best_move_parallel(1, 60, SearchMode.BITBOARD, workers=2)
@@ -0,0 +1,35 @@
+import pytest
+
+from board import Board
+from enums import InitialBoardState, PieceType
+from exceptions import InvalidParameterException
+from perft import REFERENCE_COUNTS, divide, perft, run
+
+
+@pytest.mark.parametrize("layout", list(REFERENCE_COUNTS))
+@pytest.mark.parametrize("depth", [1, 2])
+def test_perft_matches_reference_counts(layout, depth):
+    board = Board(layout)
+    assert perft(board, PieceType.BLACK, depth) == REFERENCE_COUNTS[layout][depth - 1]
+
+
+def test_perft_depth_3_leaves_board_unchanged():
+    board = Board(InitialBoardState.BELGIAN)
+    zobrist_hash = board.zobrist_hash
+    assert perft(board, PieceType.BLACK, 3) == REFERENCE_COUNTS[InitialBoardState.BELGIAN][2]
+    assert board.zobrist_hash == zobrist_hash
+
+
+def test_divide_sums_to_perft():
+    results = divide(Board(InitialBoardState.DEFAULT), PieceType.BLACK, 2)
+    assert sum(count for move, count in results) == REFERENCE_COUNTS[InitialBoardState.DEFAULT][1]
+
+
+def test_perft_depth_0_counts_the_board():
+    assert perft(Board(InitialBoardState.DEFAULT), PieceType.BLACK, 0) == 1
+
+
+@pytest.mark.parametrize("show_divide", [False, True])
+def test_run_rejects_depth_below_1(show_divide):
+    with pytest.raises(InvalidParameterException):
+        run(InitialBoardState.DEFAULT, 0, show_divide)
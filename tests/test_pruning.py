@@ -0,0 +1,78 @@
+import functools
+import time
+
+import pytest
+
+from board import Board
+from enums import SearchMode
+from moveencoding import decode_to_notation
+from statespacegenerator import StateSpaceGenerator
+
+from conftest import midgame_board
+
+
+@functools.lru_cache
+def search(seed, depth, search_mode=SearchMode.PRINCIPAL_VARIATION, null_move=False, late_move_reductions=False,
+           **settings):
+    """
+    Searches a midgame_board() from an empty transposition table, overriding the pruning settings given.
+    :param seed: the seed of the midgame_board() as an int
+    :param depth: the depth to search below the root moves as an int
+    :param search_mode: a SearchMode enum for the search algorithm to use
+    :param null_move: True to prune with null moves
+    :param late_move_reductions: True to reduce late moves
+    :param settings: StateSpaceGenerator settings to set on the instance, eg. NULL_MOVE_MIN_DEPTH=1
+    :return: a Tuple of the best move code, its score, the depth completed, the nodes searched and the best
+             line as Move Notations
+    """
+    board, team = midgame_board(seed, 12)
+    StateSpaceGenerator.TRANSPOSITION_TABLE.clear()
+    state_space_gen = StateSpaceGenerator.build_state_space_generator(board, team)
+    state_space_gen.null_move_enabled = null_move
+    state_space_gen.late_move_reductions_enabled = late_move_reductions
+    for name, value in settings.items():
+        setattr(state_space_gen, name, value)
+    start_time = time.time()
+    root_moves = state_space_gen._prepare_search(start_time, depth, None, search_mode, None, None)
+    best_move, best_value, completed_depth = state_space_gen._iterative_deepening(
+        Board(board=board), root_moves, range(depth + 1), start_time, report=False)
+    return best_move, best_value, completed_depth, state_space_gen.nodes_searched, state_space_gen.best_line
+
+
+@pytest.mark.parametrize("switch", ["null_move", "late_move_reductions"])
+def test_pruning_waits_for_min_depth(switch):
+    # Depth 2 is below both min depths, so nothing is pruned or reduced
+    assert search(1, 2, **{switch: True}) == search(1, 2)
+
+
+@pytest.mark.parametrize("switch", ["null_move", "late_move_reductions"])
+def test_pruning_switch_searches_fewer_nodes(switch):
+    best_move, best_value, completed_depth, nodes, best_line = search(1, 3)
+    pruned_move, pruned_value, pruned_depth, pruned_nodes, pruned_line = search(1, 3, **{switch: True})
+    assert pruned_depth == completed_depth == 3
+    assert pruned_nodes < nodes
+    assert pruned_move == best_move
+    assert len(pruned_line) == 4
+
+
+@pytest.mark.parametrize("depth, search_mode", [(1, SearchMode.MINIMAX), (1, SearchMode.PRINCIPAL_VARIATION),
+                                                (2, SearchMode.PRINCIPAL_VARIATION)])
+@pytest.mark.parametrize("settings", [{"null_move": True, "NULL_MOVE_MIN_DEPTH": 1, "NULL_MOVE_REDUCTION": 3},
+                                      {"null_move": True, "NULL_MOVE_MIN_DEPTH": 2},
+                                      {"late_move_reductions": True, "LATE_MOVE_MIN_DEPTH": 1},
+                                      {"late_move_reductions": True, "LATE_MOVE_MIN_DEPTH": 1,
+                                       "LATE_MOVE_REDUCTION": 2, "LATE_MOVE_MIN_NUMBER": 1}])
+def test_lowered_settings_stop_at_leaves(settings, depth, search_mode):
+    # Reductions deeper than the depth left end the search at a leaf instead of running past it
+    best_move, best_value, completed_depth, nodes, best_line = search(1, depth, search_mode, **settings)
+    assert completed_depth == depth
+    assert best_line[0] == decode_to_notation(best_move)
+    assert len(best_line) == depth + 1
+
+
+@pytest.mark.parametrize("depth, search_mode", [(1, SearchMode.MINIMAX), (2, SearchMode.PRINCIPAL_VARIATION)])
+def test_late_moves_without_reduction_match_full_search(depth, search_mode):
+    # With no plies taken off, the null window search of a late move only decides whether to search it again
+    reduced = search(1, depth, search_mode, late_move_reductions=True, LATE_MOVE_MIN_DEPTH=1,
+                     LATE_MOVE_REDUCTION=0)
+    assert reduced[:3] == search(1, depth, search_mode)[:3]
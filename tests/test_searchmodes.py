@@ -0,0 +1,160 @@
+import functools
+import time
+
+import pytest
+
+from bitboard import BitBoard
+from board import Board
+from enums import InitialBoardState, PieceType, SearchMode
+from moveencoding import MOVE_TABLE
+from statespacegenerator import StateSpaceGenerator
+
+from conftest import midgame_board, other_team
+
+
+def push_off_board():
+    """
+    Builds a board where black can push white's marble on A1 off with the marbles on B1 and C1, and the marble is
+    boxed in by black marbles so white cannot move it away. No other marbles are close enough to sumito. Both teams
+    are down to nine marbles, so the push wins the game.
+    :return: a Tuple of the Board and the team to move as a PieceType enum, white to move
+    """
+    board = Board()
+    for position in (("A", 1), ("E", 5), ("E", 6), ("F", 5), ("F", 6), ("F", 7), ("G", 5), ("G", 6), ("G", 7)):
+        board.set_tile(PieceType.WHITE, position)
+    for position in (("A", 2), ("B", 1), ("B", 2), ("C", 1), ("C", 3), ("D", 2), ("I", 5), ("I", 6), ("I", 7)):
+        board.set_tile(PieceType.BLACK, position)
+    # Count the marbles from the tiles, like BitBoard.from_board()
+    return Board(tiles=board.get_tiles_values()), PieceType.WHITE
+
+
+# Boards the searches are compared on, by name: the start of some layouts, a random midgame board and a push off
+POSITIONS = {
+    "belgian": lambda: (Board(InitialBoardState.BELGIAN), PieceType.BLACK),
+    "german": lambda: (Board(InitialBoardState.GERMAN), PieceType.BLACK),
+    "default white": lambda: (Board(InitialBoardState.DEFAULT), PieceType.WHITE),
+    "belgian midgame": lambda: midgame_board(3, 12),
+    "push off": push_off_board,
+}
+
+
+def get_position(name):
+    """
+    Builds one of the POSITIONS, a new Board every time.
+    :return: a Tuple of the Board and the team to move as a PieceType enum
+    """
+    board, team = POSITIONS[name]()
+    return Board(board=board), team
+
+
+def baseline_minimax(board, depth, alpha, beta, team, player, leaf_score):
+    """
+    Plain alpha-beta search with the full window at the root, no transposition table, move ordering or pruning
+    besides alpha-beta, so its score is exactly the minimax score.
+    :param leaf_score: a function of the board and the team to move giving the score of a leaf for the player
+    """
+    if depth == 0:
+        return leaf_score(board, team)
+    move_codes = StateSpaceGenerator.build_state_space_generator(board, team).generate_move_codes()
+    best_eval = StateSpaceGenerator.MIN if team == player else StateSpaceGenerator.MAX
+    for move in move_codes:
+        undo_record = board.make_index_move(*MOVE_TABLE[move])
+        eval = baseline_minimax(board, depth - 1, alpha, beta, other_team(team), player, leaf_score)
+        board.unmake_move(undo_record)
+        if team == player:
+            best_eval = max(best_eval, eval)
+            alpha = max(alpha, eval)
+        else:
+            best_eval = min(best_eval, eval)
+            beta = min(beta, eval)
+        if beta <= alpha:
+            break
+    return best_eval
+
+
+def played_out_score(board, team, player):
+    """
+    Scores a board after playing out every sumito, with no cut-offs or node limit. The team to move can always stop
+    pushing, so the board's own score counts as one of its choices.
+    """
+    state_space_gen = StateSpaceGenerator.build_state_space_generator(board, team)
+    # Sumitos are generated first
+    move_codes = state_space_gen.generate_move_codes()[:state_space_gen.num_sumito]
+    scores = [StateSpaceGenerator.evaluate(board, player)]
+    for move in move_codes:
+        undo_record = board.make_index_move(*MOVE_TABLE[move])
+        scores.append(played_out_score(board, other_team(team), player))
+        board.unmake_move(undo_record)
+    return max(scores) if team == player else min(scores)
+
+
+@functools.lru_cache
+def baseline_value(name, depth, quiescence):
+    """
+    Finds the score of the best root move of a position with baseline_minimax(), searching depth plies below the
+    root moves like find_best_move().
+    :param quiescence: True to score the leaves with played_out_score(), False to evaluate them as they are
+    """
+    board, team = get_position(name)
+    if quiescence:
+        def leaf_score(leaf, leaf_team):
+            return played_out_score(leaf, leaf_team, team)
+    else:
+        def leaf_score(leaf, leaf_team):
+            return StateSpaceGenerator.evaluate(leaf, team)
+    return baseline_minimax(board, depth + 1, StateSpaceGenerator.MIN, StateSpaceGenerator.MAX, team, team,
+                            leaf_score)
+
+
+def search_value(name, depth, search_mode, quiescence):
+    """
+    Searches a position to the depth given from an empty transposition table.
+    :return: the score of the best root move
+    """
+    board, team = get_position(name)
+    StateSpaceGenerator.TRANSPOSITION_TABLE.clear()
+    state_space_gen = StateSpaceGenerator.build_state_space_generator(board, team)
+    state_space_gen.quiescence_enabled = quiescence
+    start_time = time.time()
+    root_moves = state_space_gen._prepare_search(start_time, depth, None, search_mode, None, None)
+    if search_mode == SearchMode.BITBOARD:
+        result = state_space_gen._iterative_deepening_bitboard(BitBoard.from_board(board), range(depth + 1),
+                                                               start_time)
+    else:
+        result = state_space_gen._iterative_deepening(board, root_moves, range(depth + 1), start_time, report=False)
+    best_move, best_value, completed_depth = result
+    assert completed_depth == depth
+    return best_value
+
+
+@pytest.mark.parametrize("search_mode", list(SearchMode))
+@pytest.mark.parametrize("depth", [1, 2])
+@pytest.mark.parametrize("name", list(POSITIONS))
+def test_search_modes_match_baseline(name, depth, search_mode):
+    assert search_value(name, depth, search_mode, False) == baseline_value(name, depth, False)
+
+
+def test_quiescence_setting_keeps_scores_apart():
+    # A warm table from a search with quiescence must not change the scores of a search without it. Depth 2 is the
+    # first to reach boards whose played out sumitos change their score.
+    depth = 2
+    board, team = get_position("belgian")
+    StateSpaceGenerator.TRANSPOSITION_TABLE.clear()
+    for quiescence in (True, False):
+        state_space_gen = StateSpaceGenerator.build_state_space_generator(board, team)
+        state_space_gen.quiescence_enabled = quiescence
+        start_time = time.time()
+        root_moves = state_space_gen._prepare_search(start_time, depth, None, SearchMode.MINIMAX, None, None)
+        best_move, best_value, completed_depth = state_space_gen._iterative_deepening(
+            board, root_moves, range(depth + 1), start_time, report=False)
+    assert best_value == baseline_value("belgian", depth, False)
+
+
+@pytest.mark.parametrize("search_mode", [SearchMode.MINIMAX, SearchMode.PRINCIPAL_VARIATION])
+def test_quiescence_sees_push_off_past_horizon(search_mode, monkeypatch):
+    # Every white move at the root leaves black a push off at the leaves, which only the quiescence search sees. The
+    # sumitos run out after the push, so without the node limit the search has to match the played out score.
+    monkeypatch.setattr(StateSpaceGenerator, "QUIESCENCE_NODE_LIMIT", 10 ** 6)
+    played_out_value = baseline_value("push off", 0, True)
+    assert search_value("push off", 0, search_mode, True) == played_out_value
+    assert played_out_value < search_value("push off", 0, search_mode, False) == baseline_value("push off", 0, False)
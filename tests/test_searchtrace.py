@@ -0,0 +1,161 @@
+import json
+import re
+
+import pytest
+
+from board import Board
+from enums import InitialBoardState, PieceType, SearchMode
+from moveencoding import MOVE_TABLE, encode_notation
+from searchtrace import CUTOFF_ALPHA_BETA, CUTOFF_NULL_MOVE, CUTOFF_TRANSPOSITION, SearchTrace
+from statespacegenerator import StateSpaceGenerator
+from transpositiontable import EXACT
+
+from conftest import midgame_board, other_team
+
+NODE_KEYS = {"ply", "depth", "move", "alpha", "beta", "score", "cutoff"}
+ITERATION_KEYS = {"iteration", "score", "pv", "nodes"}
+# A move as written in the trace, eg. "C3B2A1 UP_RIGHT" (the to position is empty for a marble pushed off)
+MOVE_PATTERN = re.compile(r"([A-I][1-9])+ ([A-I][1-9])* ?[A-Z_]+")
+
+
+def assert_legal_line(board, team, line):
+    """
+    Checks that a line of Move Notations can be played from a board, leaving the board unchanged.
+    """
+    board = Board(board=board)
+    for move in line:
+        move_code = encode_notation(move)
+        assert move_code in StateSpaceGenerator.build_state_space_generator(board, team).generate_move_codes()
+        board.make_index_move(*MOVE_TABLE[move_code])
+        team = other_team(team)
+
+
+@pytest.mark.parametrize("search_mode", [SearchMode.MINIMAX, SearchMode.PRINCIPAL_VARIATION])
+@pytest.mark.parametrize("depth", [1, 2])
+def test_best_line_has_searched_length(depth, search_mode):
+    board, team = midgame_board(4, 10)
+    StateSpaceGenerator.TRANSPOSITION_TABLE.clear()
+    # The later searches are mostly cut off by the transposition table entries of the first
+    for _ in range(3):
+        state_space_gen = StateSpaceGenerator.build_state_space_generator(Board(board=board), team)
+        best_move = state_space_gen.find_best_move(depth, None, search_mode)
+        assert len(state_space_gen.best_line) == depth + 1
+        assert state_space_gen.best_line[0] == best_move
+        assert_legal_line(board, team, state_space_gen.best_line)
+
+
+def test_analysis_lines_have_searched_length():
+    board, team = midgame_board(4, 10)
+    StateSpaceGenerator.TRANSPOSITION_TABLE.clear()
+    for _ in range(2):
+        analysis = StateSpaceGenerator.build_state_space_generator(Board(board=board), team) \
+            .find_best_moves(3, 2, None, SearchMode.PRINCIPAL_VARIATION)
+        for move, value, principal_variation in analysis:
+            assert len(principal_variation) == 3
+            assert_legal_line(board, team, principal_variation)
+
+
+def store_move(board, team, move):
+    # Black is searching, so the keys are not combined with WHITE_SCORES_KEY
+    StateSpaceGenerator.TRANSPOSITION_TABLE.store(board.get_transposition_key(team), 1, EXACT, 0, move)
+
+
+def reverse_move(board, team):
+    """
+    Finds a move of one marble and the move that takes it back.
+    :return: a Tuple of the two move codes
+    """
+    zobrist_hash = board.zobrist_hash
+    for move in StateSpaceGenerator.build_state_space_generator(board, team).generate_move_codes():
+        if len(MOVE_TABLE[move][1]) != 1:
+            continue
+        undo_record = board.make_index_move(*MOVE_TABLE[move])
+        for back_move in StateSpaceGenerator.build_state_space_generator(board, team).generate_move_codes():
+            back_undo_record = board.make_index_move(*MOVE_TABLE[back_move])
+            returned = board.zobrist_hash == zobrist_hash
+            board.unmake_move(back_undo_record)
+            if returned:
+                board.unmake_move(undo_record)
+                return move, back_move
+        board.unmake_move(undo_record)
+    raise AssertionError("No move can be taken back")
+
+
+def test_extended_line_stops_before_repeat():
+    board = Board(InitialBoardState.BELGIAN)
+    state_space_gen = StateSpaceGenerator.build_state_space_generator(board, PieceType.BLACK)
+    StateSpaceGenerator.TRANSPOSITION_TABLE.clear()
+
+    # Black moves a marble, white moves one, then both take their moves back to the root board
+    black_move, black_back = reverse_move(board, PieceType.BLACK)
+    black_undo = board.make_index_move(*MOVE_TABLE[black_move])
+    white_move, white_back = reverse_move(board, PieceType.WHITE)
+    store_move(board, PieceType.WHITE, white_move)
+    white_undo = board.make_index_move(*MOVE_TABLE[white_move])
+    store_move(board, PieceType.BLACK, black_back)
+    black_back_undo = board.make_index_move(*MOVE_TABLE[black_back])
+    store_move(board, PieceType.WHITE, white_back)
+    for undo_record in (black_back_undo, white_undo, black_undo):
+        board.unmake_move(undo_record)
+    zobrist_hash = board.zobrist_hash
+
+    assert state_space_gen._extend_line(board, (black_move,), 6) == (black_move, white_move, black_back)
+    assert board.zobrist_hash == zobrist_hash
+
+
+def test_extended_line_stops_at_illegal_move():
+    board = Board(InitialBoardState.BELGIAN)
+    state_space_gen = StateSpaceGenerator.build_state_space_generator(board, PieceType.BLACK)
+    StateSpaceGenerator.TRANSPOSITION_TABLE.clear()
+    black_move = state_space_gen.generate_move_codes()[0]
+    undo_record = board.make_index_move(*MOVE_TABLE[black_move])
+    # A black move stored for white to move, as a key collision could leave
+    store_move(board, PieceType.WHITE, black_move)
+    board.unmake_move(undo_record)
+    assert state_space_gen._extend_line(board, (black_move,), 3) == (black_move,)
+
+
+@pytest.mark.parametrize("search_mode, null_move", [(SearchMode.MINIMAX, False), (SearchMode.PRINCIPAL_VARIATION, True)])
+def test_trace_records_are_well_formed(tmp_path, search_mode, null_move):
+    depth = 3 if null_move else 2
+    trace_file = tmp_path / "trace.jsonl"
+    StateSpaceGenerator.TRANSPOSITION_TABLE.clear()
+    state_space_gen = StateSpaceGenerator.build_state_space_generator(Board(InitialBoardState.BELGIAN),
+                                                                      PieceType.BLACK)
+    state_space_gen.null_move_enabled = null_move
+    with SearchTrace(str(trace_file)) as search_trace:
+        state_space_gen.trace = search_trace
+        state_space_gen.find_best_move(depth, None, search_mode)
+        state_space_gen.trace = None
+
+    with open(trace_file, mode='r', encoding='utf-8') as trace_input:
+        records = [json.loads(line) for line in trace_input]
+    node_records = [record for record in records if "ply" in record]
+    iteration_records = [record for record in records if "iteration" in record]
+    assert len(node_records) + len(iteration_records) == len(records)
+    assert len(node_records) == search_trace.nodes
+
+    cutoffs = set()
+    for record in node_records:
+        assert set(record) == NODE_KEYS
+        assert all(isinstance(record[key], int) for key in ("ply", "depth", "alpha", "beta", "score"))
+        assert 1 <= record["ply"] <= depth + 1
+        assert 0 <= record["depth"] <= depth
+        assert record["alpha"] < record["beta"]
+        assert record["cutoff"] in (None, CUTOFF_ALPHA_BETA, CUTOFF_TRANSPOSITION, CUTOFF_NULL_MOVE)
+        assert record["move"] is None or MOVE_PATTERN.fullmatch(record["move"])
+        if record["cutoff"] == CUTOFF_ALPHA_BETA:
+            assert record["move"] is not None
+        cutoffs.add(record["cutoff"])
+    assert CUTOFF_ALPHA_BETA in cutoffs
+    assert (CUTOFF_NULL_MOVE in cutoffs) == null_move
+
+    # One record for every iteration, in order, each with a full line and the nodes searched so far
+    assert [record["iteration"] for record in iteration_records] == list(range(depth + 1))
+    for record in iteration_records:
+        assert set(record) == ITERATION_KEYS
+        assert len(record["pv"]) == record["iteration"] + 1
+        assert all(MOVE_PATTERN.fullmatch(move) for move in record["pv"])
+    assert [record["nodes"] for record in iteration_records] == sorted(record["nodes"] for record in iteration_records)
+    assert iteration_records[-1]["nodes"] == state_space_gen.nodes_searched
+    assert iteration_records[-1]["pv"] == [SearchTrace.move_to_string(move) for move in state_space_gen._best_line]
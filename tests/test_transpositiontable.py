@@ -0,0 +1,164 @@
+import pickle
+import random
+
+import pytest
+
+from transpositiontable import EXACT, LOWER_BOUND, NO_MOVE, UPPER_BOUND
+from transpositiontable import SharedTranspositionTable, TranspositionTable
+
+# Small enough for every bucket to be filled by a few keys
+TABLE_SIZE = 1024
+
+
+@pytest.fixture(params=[TranspositionTable, SharedTranspositionTable])
+def table(request):
+    transposition_table = request.param(TABLE_SIZE)
+    yield transposition_table
+    if isinstance(transposition_table, SharedTranspositionTable):
+        transposition_table.unlink()
+
+
+@pytest.fixture
+def shared_table():
+    transposition_table = SharedTranspositionTable(TABLE_SIZE)
+    yield transposition_table
+    transposition_table.unlink()
+
+
+def same_bucket_keys(table, count):
+    """
+    Makes keys that all fall in the same bucket of the table.
+    :param table: the table the keys are for
+    :param count: the number of keys as an int
+    :return: a List of int keys
+    """
+    buckets = table.slots // 2
+    return [0x1234_5678_9ABC_0005 + i * buckets for i in range(count)]
+
+
+def test_probe_empty_table(table):
+    assert table.probe(0x1234_5678_9ABC_DEF0) is None
+
+
+@pytest.mark.parametrize("depth, bound, score, move", [(0, EXACT, 0, NO_MOVE), (3, LOWER_BOUND, 12345, 77),
+                                                       (1, UPPER_BOUND, -30000, 4321), (100, EXACT, 30000, 65535)])
+def test_store_then_probe(table, depth, bound, score, move):
+    key = random.Random(depth).getrandbits(64)
+    table.store(key, depth, bound, score, move)
+    assert table.probe(key) == (depth, bound, score, move)
+
+
+def test_probe_other_key_in_bucket(table):
+    key, other_key = same_bucket_keys(table, 2)
+    table.store(key, 2, EXACT, 10, 5)
+    assert table.probe(other_key) is None
+
+
+def test_store_same_key_replaces_entry(table):
+    key = same_bucket_keys(table, 1)[0]
+    table.store(key, 5, LOWER_BOUND, 10, 5)
+    table.store(key, 1, UPPER_BOUND, -10, 6)
+    assert table.probe(key) == (1, UPPER_BOUND, -10, 6)
+
+
+def test_store_without_move_keeps_move(table):
+    key = same_bucket_keys(table, 1)[0]
+    table.store(key, 2, EXACT, 10, 42)
+    table.store(key, 3, UPPER_BOUND, -5)
+    assert table.probe(key) == (3, UPPER_BOUND, -5, 42)
+
+
+def test_deep_entry_kept_in_same_search(table):
+    deep_key, shallow_key, newer_key = same_bucket_keys(table, 3)
+    table.store(deep_key, 6, EXACT, 1, 1)
+    # Shallower entries only replace the always replaced slot
+    table.store(shallow_key, 2, EXACT, 2, 2)
+    assert table.probe(deep_key) == (6, EXACT, 1, 1)
+    assert table.probe(shallow_key) == (2, EXACT, 2, 2)
+    table.store(newer_key, 1, EXACT, 3, 3)
+    assert table.probe(deep_key) == (6, EXACT, 1, 1)
+    assert table.probe(shallow_key) is None
+    assert table.probe(newer_key) == (1, EXACT, 3, 3)
+
+
+def test_deeper_entry_replaces_depth_preferred_slot(table):
+    shallow_key, deep_key = same_bucket_keys(table, 2)
+    table.store(shallow_key, 2, EXACT, 1, 1)
+    table.store(deep_key, 4, EXACT, 2, 2)
+    assert table.probe(shallow_key) is None
+    assert table.probe(deep_key) == (4, EXACT, 2, 2)
+
+
+def test_new_search_ages_deep_entry(table):
+    old_key, new_key = same_bucket_keys(table, 2)
+    table.store(old_key, 6, EXACT, 1, 1)
+    table.new_search()
+    table.store(new_key, 1, EXACT, 2, 2)
+    assert table.probe(old_key) is None
+    assert table.probe(new_key) == (1, EXACT, 2, 2)
+
+
+def test_clear(table):
+    keys = same_bucket_keys(table, 2)
+    for depth, key in enumerate(keys):
+        table.store(key, depth, EXACT, 0, 1)
+    table.clear()
+    assert all(table.probe(key) is None for key in keys)
+
+
+def test_shared_table_attached_by_name(shared_table):
+    attached_table = SharedTranspositionTable(TABLE_SIZE, shared_table.name)
+    try:
+        shared_table.store(11, 3, LOWER_BOUND, 7, 9)
+        assert attached_table.probe(11) == (3, LOWER_BOUND, 7, 9)
+        attached_table.store(12, 2, UPPER_BOUND, -7, 8)
+        assert shared_table.probe(12) == (2, UPPER_BOUND, -7, 8)
+        # The age of the search is shared too
+        attached_table.new_search()
+        shared_table.store(13, 1, EXACT, 0, 1)
+        assert attached_table._words[0] == shared_table._words[0] == 1
+    finally:
+        attached_table.close()
+
+
+def test_shared_table_pickles_to_same_memory(shared_table):
+    unpickled_table = pickle.loads(pickle.dumps(shared_table))
+    try:
+        assert unpickled_table.name == shared_table.name
+        assert unpickled_table.slots == shared_table.slots
+        shared_table.store(21, 4, EXACT, 100, 3)
+        assert unpickled_table.probe(21) == (4, EXACT, 100, 3)
+    finally:
+        unpickled_table.close()
+
+
+def test_shared_table_torn_entry_is_missing(shared_table):
+    key, other_key = same_bucket_keys(shared_table, 2)
+    word = ((key & shared_table._mask) << 2) + 1
+    words = shared_table._words
+    shared_table.store(key, 3, EXACT, 50, 7)
+    key_word, entry = words[word], words[word + 1]
+    shared_table.clear()
+    shared_table.store(other_key, 3, LOWER_BOUND, -50, 8)
+    other_key_word, other_entry = words[word], words[word + 1]
+
+    # Two processes wrote the slot at once, leaving the key word of one entry with the other entry
+    words[word], words[word + 1] = key_word, other_entry
+    assert shared_table.probe(key) is None
+    assert shared_table.probe(other_key) is None
+
+    words[word], words[word + 1] = other_key_word, entry
+    assert shared_table.probe(key) is None
+    assert shared_table.probe(other_key) is None
+
+    # A torn entry is replaced like any other
+    shared_table.store(key, 3, EXACT, 50, 7)
+    assert shared_table.probe(key) == (3, EXACT, 50, 7)
+
+
+def test_shared_table_unlink_frees_memory():
+    shared_table = SharedTranspositionTable(TABLE_SIZE)
+    name = shared_table.name
+    shared_table.unlink()
+    with pytest.raises(FileNotFoundError):
+        SharedTranspositionTable(TABLE_SIZE, name)